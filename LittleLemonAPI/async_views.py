@@ -0,0 +1,111 @@
+"""
+Async-native read endpoints for the menu and bookings.
+
+These are plain Django ``async def`` views, so under ASGI they run on the
+event loop instead of being handed to a worker thread like the DRF viewsets.
+They read ``values()`` rows with the async ORM and render them through
+``representation``, returning the same JSON as the DRF endpoints. Only token
+authentication is supported. Note that Django 4.2's async ORM still executes
+the query itself in a thread; no other sync work is done per request.
+"""
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import APIException
+from restaurant.models import Menu, Booking
+from .authentication import get_token_cache
+from .filters import filter_date_range
+from .pagination import BookingPagination
+from . import representation
+from .representation import MENU_FIELDS, BOOKING_FIELDS, menu_row, booking_row, booking_rows, render_json
+
+
+def json_response(data, status=200, headers=None):
+    return representation.json_response(render_json(data), status=status, headers=headers)
+
+
+def method_not_allowed(request):
+    return json_response(
+        {'detail': f'Method "{request.method}" not allowed.'}, status=405, headers={'Allow': 'GET, HEAD'}
+    )
+
+
+def not_found():
+    return json_response({'detail': 'Not found.'}, status=404)
+
+
+def not_authenticated():
+    return json_response(
+        {'detail': 'Authentication credentials were not provided.'},
+        status=401,
+        headers={'WWW-Authenticate': 'Token'},
+    )
+
+
+async def authenticate(request):
+    """Resolve ``Authorization: Token <key>`` to an active user, or ``None``."""
+    auth = request.headers.get('Authorization', '').split()
+    if len(auth) != 2 or auth[0].lower() != 'token':
+        return None
+    key = auth[1]
+    token_cache = get_token_cache()
+    entry = token_cache.get(key)
+    if entry is None:
+        generation = token_cache.generation(key)
+        try:
+            token = await Token.objects.select_related('user').aget(key=key)
+        except Token.DoesNotExist:
+            return None
+        if not token.user.is_active:
+            return None
+        entry = (token.user, token)
+        token_cache.set(key, entry, generation)
+    return entry[0]
+
+
+async def menu_list(request):
+    if request.method not in ('GET', 'HEAD'):
+        return method_not_allowed(request)
+    rows = [menu_row(row) async for row in Menu.objects.values(*MENU_FIELDS)]
+    return json_response(rows)
+
+
+async def menu_detail(request, pk):
+    if request.method not in ('GET', 'HEAD'):
+        return method_not_allowed(request)
+    try:
+        row = await Menu.objects.values(*MENU_FIELDS).aget(pk=pk)
+    except Menu.DoesNotExist:
+        return not_found()
+    return json_response(menu_row(row))
+
+
+async def booking_list(request):
+    if request.method not in ('GET', 'HEAD'):
+        return method_not_allowed(request)
+    user = await authenticate(request)
+    if user is None:
+        return not_authenticated()
+    paginator = BookingPagination()
+    try:
+        queryset = filter_date_range(Booking.objects.filter(user=user), request.GET)
+        page = paginator.page_queryset(queryset.values(*BOOKING_FIELDS), request)
+    except APIException as exc:
+        # Bad date filters (400) and cursors (404), as the viewset reports them
+        detail = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+        return json_response(detail, status=exc.status_code)
+    rows = paginator.page_rows([row async for row in page])
+    # The cursor is built from the raw booking_date, so convert afterwards
+    headers = paginator.get_headers()
+    return json_response(booking_rows(rows), headers=headers)
+
+
+async def booking_detail(request, pk):
+    if request.method not in ('GET', 'HEAD'):
+        return method_not_allowed(request)
+    user = await authenticate(request)
+    if user is None:
+        return not_authenticated()
+    try:
+        row = await Booking.objects.values(*BOOKING_FIELDS).aget(pk=pk, user=user)
+    except Booking.DoesNotExist:
+        return not_found()
+    return json_response(booking_row(row))
@@ -0,0 +1,150 @@
+import copy
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.authentication import TokenAuthentication
+from littlelemon import db
+from . import cache
+from .cache import TTLCache
+
+
+def token_scope(key):
+    return f'token:{key}'
+
+
+def user_token_scope(user_id):
+    return f'token:user:{user_id}'
+
+
+class TokenCache:
+    """
+    Two-tier cache of token key -> ``(user, token)``, and of user id -> the
+    key of their token (``user_key``).
+
+    The first tier is a bounded in-process ``TTLCache``. The optional second
+    tier is a shared Django cache (``TOKEN_CACHE['SHARED_ALIAS']``) so that
+    workers can warm each other.
+
+    Entries are stored with the token's version token from the API cache
+    (see ``cache.get_version``), read before the database was, and are only
+    served while it is unchanged. ``revoke`` bumps it, so with a shared API
+    cache a revocation reaches every worker on its next lookup; with local
+    memory, other workers drop the entry once their version token expires
+    (``API_VERSION_TTL``). ``revoke_user`` does the same for a user's key.
+    """
+
+    def __init__(self, max_size, ttl, shared_alias=None):
+        self.local = TTLCache(max_size, ttl)
+        self.ttl = ttl
+        self.shared_alias = shared_alias
+
+    @property
+    def stats(self):
+        return self.local.stats
+
+    def _shared(self):
+        return caches[self.shared_alias] if self.shared_alias else None
+
+    def generation(self, key):
+        """The version to pass to ``set``; read it before reading the token from the database."""
+        return cache.get_version(token_scope(key))
+
+    def get(self, key):
+        return self._get(key, f'token:{key}', self.generation(key))
+
+    def set(self, key, entry, generation):
+        self._set(key, f'token:{key}', (generation, entry))
+
+    def revoke(self, key):
+        self._revoke(key, f'token:{key}', token_scope(key))
+
+    def user_key(self, user_id):
+        """The key of ``user_id``'s token, or None if they have none, read from the primary on a miss."""
+        scope = user_token_scope(user_id)
+        generation = cache.get_version(scope)
+        stored = self._lookup(f'user:{user_id}', scope)
+        if stored is not None and stored[0] == generation:
+            return stored[1]
+        from rest_framework.authtoken.models import Token
+
+        with db.primary():
+            key = Token.objects.filter(user_id=user_id).values_list('key', flat=True).first()
+        self._set(f'user:{user_id}', scope, (generation, key))
+        return key
+
+    def revoke_user(self, user_id):
+        scope = user_token_scope(user_id)
+        self._revoke(f'user:{user_id}', scope, scope)
+
+    def _lookup(self, local_key, shared_key):
+        stored = self.local.get(local_key)
+        if stored is None and self.shared_alias:
+            stored = self._shared().get(shared_key)
+            if stored is not None:
+                self.local.set(local_key, stored)
+        return stored
+
+    def _get(self, local_key, shared_key, generation):
+        stored = self._lookup(local_key, shared_key)
+        if stored is None or stored[0] != generation:
+            return None
+        return stored[1]
+
+    def _set(self, local_key, shared_key, stored):
+        self.local.set(local_key, stored)
+        if self.shared_alias:
+            self._shared().set(shared_key, stored, self.ttl)
+
+    def _revoke(self, local_key, shared_key, scope):
+        cache.bump_version(scope)
+        self.local.delete(local_key)
+        if self.shared_alias:
+            self._shared().delete(shared_key)
+
+    def clear(self):
+        self.local.clear()
+
+
+_token_cache = None
+_token_cache_lock = threading.Lock()
+
+
+def get_token_cache():
+    global _token_cache
+    if _token_cache is None:
+        with _token_cache_lock:
+            if _token_cache is None:
+                options = settings.TOKEN_CACHE
+                _token_cache = TokenCache(options['MAX_SIZE'], options['TTL'], options.get('SHARED_ALIAS'))
+    return _token_cache
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    ``TokenAuthentication`` that caches the token -> user lookup.
+
+    Replaces the ``Token``/``User`` join on every authenticated request with
+    a version token lookup. Cached entries are revoked when the token is
+    deleted (e.g. djoser's ``token/logout``) or the user is saved or deleted
+    (see ``signals.py``), in every worker sharing the API cache.
+    """
+
+    def authenticate_credentials(self, key):
+        token_cache = get_token_cache()
+        entry = token_cache.get(key)
+        if entry is None:
+            generation = token_cache.generation(key)
+            # Raises AuthenticationFailed for unknown tokens and inactive users,
+            # which are never cached. Read from the primary: a new token may
+            # not have reached the replicas, and a revoked one must not be
+            # cached again from them
+            with db.primary():
+                entry = super().authenticate_credentials(key)
+            token_cache.set(key, entry, generation)
+        user, token = entry
+        # Hand each request its own copies so per-request mutations don't
+        # leak into the shared cached objects
+        token = copy.copy(token)
+        token.user = user = copy.copy(user)
+        return (user, token)
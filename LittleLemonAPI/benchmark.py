@@ -0,0 +1,205 @@
+"""
+In-process API benchmark.
+
+Drives the API and the restaurant pages through Django's test ``Client`` (no
+network, no server) and reports throughput, latency percentiles and SQL
+queries per request for each endpoint. See the ``benchmark_api`` command.
+
+``compare_formats`` measures the response formats themselves: size on the
+wire (raw and gzipped) and encode time of list payloads, see the
+``benchmark_formats`` command.
+
+Both commands run inside ``isolated_caches``: the datasets are loaded with
+bulk inserts and then timed from cold, against local-memory caches created
+for the run, so the configured cache backends are neither read nor written.
+"""
+import datetime
+import gzip
+import math
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.conf import settings
+from django.db import connection
+from django.test import Client, override_settings
+from rest_framework.authtoken.models import Token
+from restaurant import availability, synthetic
+from restaurant.models import Menu, Booking
+from . import cache as api_cache, search
+from .authentication import get_token_cache
+from .representation import BOOKING_FIELDS, PRERENDERED_FORMATS, booking_rows, menu_rows, render
+
+BENCH_USERNAME = 'benchmark'
+BENCH_PASSWORD = 'benchmark-password'
+
+
+class Endpoint:
+    def __init__(self, name, method, path, auth=False, data=None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.auth = auth
+        self.data = data
+
+    def request(self, client, token):
+        headers = {'HTTP_AUTHORIZATION': f'Token {token}'} if self.auth else {}
+        if self.method == 'post':
+            return client.post(self.path, self.data, content_type='application/json', **headers)
+        return client.get(self.path, **headers)
+
+
+def default_endpoints(menu_id):
+    return [
+        Endpoint('menu_list', 'get', '/api/menu/'),
+        Endpoint('menu_detail', 'get', f'/api/menu/{menu_id}/'),
+        Endpoint('bookings_list', 'get', '/api/tables/', auth=True),
+        Endpoint(
+            'token_auth', 'post', '/api-token-auth/',
+            data={'username': BENCH_USERNAME, 'password': BENCH_PASSWORD},
+        ),
+        Endpoint('page_index', 'get', '/restaurant/'),
+        Endpoint('page_about', 'get', '/restaurant/about/'),
+        Endpoint('page_menu', 'get', '/restaurant/menu/'),
+        Endpoint('page_book', 'get', '/restaurant/book/'),
+    ]
+
+
+def isolated_caches():
+    """Settings override pointing every cache alias at a new, empty local-memory cache."""
+    run = uuid.uuid4().hex
+    return override_settings(CACHES={
+        alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'benchmark-{run}-{alias}'}
+        for alias in settings.CACHES
+    })
+
+
+def load_dataset(size, seed=42, batch_size=5000):
+    """Replace the menu and bookings with ``size`` synthetic rows each.
+
+    Returns ``(token_key, first_menu_id)``.
+    """
+    Booking.objects.all().delete()
+    Menu.objects.all().delete()
+    User.objects.filter(username=BENCH_USERNAME).delete()
+    user = User.objects.create_user(username=BENCH_USERNAME, password=BENCH_PASSWORD)
+    token = Token.objects.create(user=user)
+
+    rng = random.Random(seed)
+    synthetic.generate_menu(size, rng, batch_size)
+    synthetic.generate_bookings(size, [user.pk], datetime.date.today(), 365, rng, batch_size)
+    availability.rebuild()
+    # bulk_create skipped the signals that keep these up to date
+    api_cache.invalidate_menu()
+    search.invalidate()
+    get_token_cache().clear()
+    return token.key, Menu.objects.order_by('id').values_list('id', flat=True).first()
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def run_endpoint(endpoint, token, requests, concurrency, warmup=1):
+    """Issue ``requests`` calls to ``endpoint`` spread over ``concurrency`` threads."""
+    latencies = []
+    queries = []
+    errors = 0
+    lock = threading.Lock()
+    main_thread = threading.current_thread()
+    # Connections are per thread, so a thread-local counter is enough
+    state = threading.local()
+
+    def count_queries(execute, sql, params, many, context):
+        state.queries += 1
+        return execute(sql, params, many, context)
+
+    def worker(count):
+        nonlocal errors
+        client = Client()
+        local_latencies, local_queries, local_errors = [], [], 0
+        try:
+            for _ in range(warmup):
+                endpoint.request(client, token)
+            for _ in range(count):
+                state.queries = 0
+                with connection.execute_wrapper(count_queries):
+                    started = time.perf_counter()
+                    response = endpoint.request(client, token)
+                    elapsed = time.perf_counter() - started
+                local_latencies.append(elapsed * 1000)
+                local_queries.append(state.queries)
+                if response.status_code >= 400:
+                    local_errors += 1
+        finally:
+            if threading.current_thread() is not main_thread:
+                connection.close()
+        with lock:
+            latencies.extend(local_latencies)
+            queries.extend(local_queries)
+            errors += local_errors
+
+    shares = [requests // concurrency + (1 if i < requests % concurrency else 0) for i in range(concurrency)]
+    started = time.perf_counter()
+    if concurrency == 1:
+        worker(requests)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(worker, shares))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'endpoint': endpoint.name,
+        'method': endpoint.method.upper(),
+        'path': endpoint.path,
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput_rps': round(len(latencies) / wall, 2),
+        'latency_ms': {
+            'p50': round(percentile(latencies, 50), 3),
+            'p95': round(percentile(latencies, 95), 3),
+            'p99': round(percentile(latencies, 99), 3),
+            'mean': round(sum(latencies) / len(latencies), 3),
+            'max': round(latencies[-1], 3),
+        },
+        'queries_per_request': round(sum(queries) / len(queries), 2),
+    }
+
+
+def format_payloads(page_size=500):
+    """The full menu list and one bookings page, as the API represents them."""
+    bookings = Booking.objects.order_by('booking_date', 'id').values(*BOOKING_FIELDS)[:page_size]
+    return {
+        'menu_list': menu_rows(Menu.objects.order_by('id')),
+        'bookings_page': booking_rows(bookings),
+    }
+
+
+def compare_formats(name, data, repeats=5):
+    """Encode ``data`` in every pre-renderable format, reporting bytes and encode time."""
+    results = []
+    for fmt in PRERENDERED_FORMATS:
+        timings = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            content = render(data, fmt)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        results.append({
+            'payload': name,
+            'format': fmt,
+            'rows': len(data),
+            'bytes': len(content),
+            'gzip_bytes': len(gzip.compress(content, compresslevel=6, mtime=0)),
+            'encode_ms': {'p50': round(percentile(timings, 50), 3), 'min': round(timings[0], 3)},
+        })
+    return results
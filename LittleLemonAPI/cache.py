@@ -0,0 +1,176 @@
+"""
+Cache helpers for the API.
+
+Cached payloads are stored under keys that embed a per-scope version token.
+Writing to a scope (e.g. any change to a ``Menu`` row) bumps its token, so
+readers never see a stale payload and the old entries simply age out of the
+backend. The backend itself is whatever ``settings.API_CACHE_ALIAS`` points
+at: local memory by default, or a shared Redis/Memcached cache in production.
+
+A per-process backend cannot carry one worker's bump to the others, so
+there version tokens expire after ``API_VERSION_TTL`` seconds: other workers
+serve stale payloads and ETags for at most that long. The
+``LittleLemonAPI.W001`` system check warns about such a backend.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from littlelemon import db
+
+MENU_SCOPE = 'menu'
+
+
+def bookings_scope(user_id):
+    return f'bookings:{user_id}'
+
+
+class CacheStats:
+    """Thread-safe hit/miss counters for a cache lookup site."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def snapshot(self):
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / total if total else 0.0,
+        }
+
+
+class TTLCache:
+    """
+    Bounded, thread-safe in-process LRU cache whose entries expire after
+    ``ttl`` seconds. Lookups record hits and misses on ``stats``.
+    """
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.stats.hit()
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+        self.stats.miss()
+        return None
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+menu_stats = CacheStats()
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def is_process_local():
+    """Whether the API cache lives in each process, so workers never see each other's writes."""
+    return isinstance(get_cache(), LocMemCache)
+
+
+def version_timeout():
+    return settings.API_VERSION_TTL if is_process_local() else None
+
+
+def _version_key(scope):
+    return f'version:{scope}'
+
+
+def get_version(scope):
+    """Return the current version token for ``scope``, creating one if needed.
+
+    Tokens are random rather than incrementing so that a token evicted from
+    the cache can never be re-issued for different content.
+    """
+    cache = get_cache()
+    version = cache.get(_version_key(scope))
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(_version_key(scope), version, timeout=version_timeout()):
+            version = cache.get(_version_key(scope), version)
+    return version
+
+
+def bump_version(scope):
+    version = uuid.uuid4().hex
+    get_cache().set(_version_key(scope), version, timeout=version_timeout())
+    return version
+
+
+def bump_versions(scopes):
+    """Bump several scopes with a single ``set_many``, e.g. after a bulk write."""
+    get_cache().set_many({_version_key(scope): uuid.uuid4().hex for scope in scopes}, timeout=version_timeout())
+
+
+def get_menu_list(build, fmt='json'):
+    """Return the cached menu list for the current version, calling ``build()`` on a miss.
+
+    The cached value is whatever ``build()`` returns; the menu view stores
+    the rendered bytes (one entry per format), which are cheap to
+    (un)pickle and need no serialization on a hit.
+    """
+    cache = get_cache()
+    key = f'menu:list:{fmt}:{get_version(MENU_SCOPE)}'
+    data = cache.get(key)
+    if data is None:
+        menu_stats.miss()
+        # A lagging replica would be cached under the new version
+        with db.primary():
+            data = build()
+        cache.set(key, data, settings.MENU_CACHE_TIMEOUT)
+    else:
+        menu_stats.hit()
+    return data
+
+
+def invalidate_menu():
+    bump_version(MENU_SCOPE)
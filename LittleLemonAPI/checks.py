@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core import checks
+from . import cache
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_api_cache(app_configs, **kwargs):
+    # Development servers run one process, where local memory is enough
+    if settings.DEBUG or not cache.is_process_local():
+        return []
+    return [checks.Warning(
+        f'The API cache ("{settings.API_CACHE_ALIAS}") is local memory, so a write handled by one worker '
+        f'only reaches the others when their version tokens expire, after API_VERSION_TTL '
+        f'({settings.API_VERSION_TTL}) seconds.',
+        hint='Set REDIS_URL, or point API_CACHE_ALIAS at a shared cache, when running several workers.',
+        id='LittleLemonAPI.W001',
+    )]
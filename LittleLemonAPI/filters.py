@@ -0,0 +1,104 @@
+import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db.models.functions import Lower
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from restaurant.functions import filter_prefix
+
+
+def parse_date_param(params, name):
+    """
+    Parse an ISO date or datetime query parameter.
+
+    Returns ``(value, is_date)`` or ``(None, False)`` when absent. Naive
+    datetimes are interpreted in the current time zone.
+    """
+    raw = params.get(name)
+    if not raw:
+        return None, False
+    try:
+        # Dates first: parse_datetime would also accept a bare date as midnight
+        value = parse_date(raw)
+        if value is not None:
+            return value, True
+        value = parse_datetime(raw)
+    except ValueError:
+        value = None
+    if value is None:
+        raise ValidationError({name: 'Enter a valid date (YYYY-MM-DD) or ISO datetime.'})
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value, False
+
+
+def filter_date_range(queryset, params, field='booking_date'):
+    """
+    Apply ``?from=``/``?to=`` bounds to ``field``.
+
+    Both bounds are inclusive; a bare date for ``to`` covers that whole day.
+    Bounds are expressed as plain range comparisons so they can use an index.
+    """
+    start, start_is_date = parse_date_param(params, 'from')
+    if start is not None:
+        if start_is_date:
+            start = timezone.make_aware(datetime.datetime.combine(start, datetime.time.min))
+        queryset = queryset.filter(**{f'{field}__gte': start})
+
+    end, end_is_date = parse_date_param(params, 'to')
+    if end is not None:
+        if end_is_date:
+            end = timezone.make_aware(datetime.datetime.combine(end + datetime.timedelta(days=1), datetime.time.min))
+            queryset = queryset.filter(**{f'{field}__lt': end})
+        else:
+            queryset = queryset.filter(**{f'{field}__lte': end})
+    return queryset
+
+
+MENU_FILTER_PARAMS = ('search', 'prefix', 'min_price', 'max_price', 'in_stock')
+BOOLEANS = {'true': True, '1': True, 'false': False, '0': False}
+
+
+def parse_price_param(params, name):
+    raw = params.get(name)
+    if not raw:
+        return None
+    try:
+        value = Decimal(raw)
+    except InvalidOperation:
+        value = None
+    if value is None or not value.is_finite():
+        raise ValidationError({name: 'Enter a valid number.'})
+    return value
+
+
+def filter_menu(queryset, params):
+    """
+    Apply ``?prefix=``, ``?min_price=``/``?max_price=`` and ``?in_stock=`` to menu items.
+
+    The title prefix is matched case-insensitively as a range on
+    ``LOWER(title)`` in code point order, which the ``menu_title_lower_idx``
+    expression index serves (see ``restaurant.functions``); price bounds
+    are inclusive and use ``menu_price_idx``.
+    ``?search=`` (substring) is left to the caller, see ``search``.
+    """
+    prefix = params.get('prefix')
+    if prefix:
+        queryset = filter_prefix(queryset, Lower('title'), prefix.lower())
+
+    min_price = parse_price_param(params, 'min_price')
+    max_price = parse_price_param(params, 'max_price')
+    if min_price is not None and max_price is not None and max_price < min_price:
+        raise ValidationError({'max_price': 'Must not be less than min_price.'})
+    if min_price is not None:
+        queryset = queryset.filter(price__gte=min_price)
+    if max_price is not None:
+        queryset = queryset.filter(price__lte=max_price)
+
+    in_stock = params.get('in_stock')
+    if in_stock:
+        if in_stock.lower() not in BOOLEANS:
+            raise ValidationError({'in_stock': 'Enter true or false.'})
+        queryset = queryset.filter(inventory__gt=0) if BOOLEANS[in_stock.lower()] else queryset.filter(inventory__lte=0)
+    return queryset
@@ -0,0 +1,117 @@
+"""
+Django management command to benchmark the API and pages in-process.
+
+Usage:
+    python manage.py benchmark_api
+    python manage.py benchmark_api --sizes 100,10000 --concurrency 1,8 --requests 500
+    python manage.py benchmark_api --endpoints menu_list,bookings_list --output bench.json
+
+Runs against a throwaway test database (in memory for SQLite), so it never
+touches real data and works offline:
+    LITTLELEMON_DB=sqlite python manage.py benchmark_api
+"""
+
+import json
+import platform
+import sys
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from django.utils import timezone
+from LittleLemonAPI import benchmark
+
+
+def int_list(value):
+    try:
+        values = [int(part) for part in value.split(',') if part]
+    except ValueError:
+        raise CommandError(f'Expected a comma-separated list of integers, got "{value}"')
+    if not values or min(values) < 1:
+        raise CommandError(f'Expected positive integers, got "{value}"')
+    return values
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks API endpoints and pages in-process, reporting throughput, latency percentiles and SQL queries'
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='100,1000', help='Comma-separated dataset sizes (default "100,1000")')
+        parser.add_argument('--concurrency', default='1,4', help='Comma-separated thread counts (default "1,4")')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per endpoint and run (default 200)')
+        parser.add_argument(
+            '--token-auth-requests',
+            type=int,
+            default=20,
+            help='Requests for /api-token-auth/, which is dominated by password hashing (default 20)',
+        )
+        parser.add_argument('--endpoints', default='', help='Comma-separated endpoint names to run (default all)')
+        parser.add_argument('--seed', type=int, default=42, help='Dataset random seed (default 42)')
+        parser.add_argument('--output', help='Write results as JSON to this file')
+
+    def handle(self, *args, **options):
+        sizes = int_list(options['sizes'])
+        concurrency_levels = int_list(options['concurrency'])
+        if options['requests'] < 1 or options['token_auth_requests'] < 1:
+            raise CommandError('Request counts must be positive')
+        selected = {name for name in options['endpoints'].split(',') if name}
+
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            results = self.run(sizes, concurrency_levels, selected, options)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            'meta': {
+                'timestamp': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'sizes': sizes,
+                'concurrency': concurrency_levels,
+                'requests': options['requests'],
+                'seed': options['seed'],
+            },
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Wrote {len(results)} result(s) to {options["output"]}'))
+
+    def run(self, sizes, concurrency_levels, selected, options):
+        results = []
+        self.stdout.write(
+            f'{"endpoint":<16}{"size":>8}{"conc":>6}{"req/s":>10}{"p50 ms":>10}'
+            f'{"p95 ms":>10}{"p99 ms":>10}{"queries":>9}{"errors":>8}'
+        )
+        for size in sizes:
+            # Fresh local-memory caches per dataset; the configured ones are never touched
+            with benchmark.isolated_caches():
+                self.stderr.write(f'Loading dataset of {size} rows...')
+                token, menu_id = benchmark.load_dataset(size, seed=options['seed'])
+                endpoints = benchmark.default_endpoints(menu_id)
+                unknown = selected - {endpoint.name for endpoint in endpoints}
+                if unknown:
+                    raise CommandError(f'Unknown endpoint(s): {", ".join(sorted(unknown))}')
+                for endpoint in endpoints:
+                    if selected and endpoint.name not in selected:
+                        continue
+                    requests = options['token_auth_requests'] if endpoint.name == 'token_auth' else options['requests']
+                    for concurrency in concurrency_levels:
+                        result = benchmark.run_endpoint(endpoint, token, requests, concurrency)
+                        result['size'] = size
+                        results.append(result)
+                        latency = result['latency_ms']
+                        self.stdout.write(
+                            f'{endpoint.name:<16}{size:>8}{concurrency:>6}{result["throughput_rps"]:>10.1f}'
+                            f'{latency["p50"]:>10.2f}{latency["p95"]:>10.2f}{latency["p99"]:>10.2f}'
+                            f'{result["queries_per_request"]:>9.1f}{result["errors"]:>8}'
+                        )
+                        sys.stdout.flush()
+        return results
@@ -0,0 +1,71 @@
+"""
+Django management command to compare API response formats.
+
+Usage:
+    python manage.py benchmark_formats
+    python manage.py benchmark_formats --sizes 1000,100000 --page-size 500 --repeats 10
+    python manage.py benchmark_formats --output formats.json
+
+For each dataset size, encodes the full menu list and one bookings page as
+JSON and as MessagePack, and reports bytes on the wire (raw and gzipped) and
+the median encode time. Runs against a throwaway test database, like
+benchmark_api:
+    LITTLELEMON_DB=sqlite python manage.py benchmark_formats
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from LittleLemonAPI import benchmark
+from .benchmark_api import int_list
+
+
+class Command(BaseCommand):
+    help = 'Compares JSON and MessagePack size and encode time for the menu and bookings lists'
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,10000', help='Comma-separated dataset sizes (default "1000,10000")')
+        parser.add_argument('--page-size', type=int, default=500, help='Rows in the bookings page (default 500)')
+        parser.add_argument('--repeats', type=int, default=5, help='Encodes per payload and format (default 5)')
+        parser.add_argument('--seed', type=int, default=42, help='Dataset random seed (default 42)')
+        parser.add_argument('--output', help='Write results as JSON to this file')
+
+    def handle(self, *args, **options):
+        sizes = int_list(options['sizes'])
+        if options['page_size'] < 1 or options['repeats'] < 1:
+            raise CommandError('--page-size and --repeats must be positive')
+
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            results = self.run(sizes, options)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump({'results': results}, output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Wrote {len(results)} result(s) to {options["output"]}'))
+
+    def run(self, sizes, options):
+        results = []
+        self.stdout.write(
+            f'{"payload":<15}{"size":>8}{"format":>9}{"rows":>8}{"bytes":>12}{"gzip bytes":>12}{"encode ms":>11}'
+        )
+        for size in sizes:
+            # Fresh local-memory caches per dataset; the configured ones are never touched
+            with benchmark.isolated_caches():
+                self.stderr.write(f'Loading dataset of {size} rows...')
+                benchmark.load_dataset(size, seed=options['seed'])
+                for name, data in benchmark.format_payloads(options['page_size']).items():
+                    for result in benchmark.compare_formats(name, data, options['repeats']):
+                        result['size'] = size
+                        results.append(result)
+                        self.stdout.write(
+                            f'{name:<15}{size:>8}{result["format"]:>9}{result["rows"]:>8}{result["bytes"]:>12}'
+                            f'{result["gzip_bytes"]:>12}{result["encode_ms"]["p50"]:>11.2f}'
+                        )
+        return results
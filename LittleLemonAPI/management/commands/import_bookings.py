@@ -0,0 +1,82 @@
+"""
+Django management command to bulk import bookings from NDJSON or CSV.
+
+Usage:
+    python manage.py import_bookings bookings.ndjson
+    python manage.py import_bookings legacy.csv --user frontdesk --rejects legacy.rejects.ndjson
+    python manage.py import_bookings export.csv --batch-size 5000
+
+Rows are validated like ``POST /api/tables/`` and inserted in batched
+transactions. Rejected rows are written, one JSON object per line with their
+line number and errors, to the rejects file (default: ``<file>.rejects.ndjson``).
+"""
+
+import json
+import os
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from LittleLemonAPI.importer import FORMATS, BookingImporter, guess_format, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Bulk imports bookings from an NDJSON or CSV file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import')
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            default=None,
+            help='File format (default: from the file extension)',
+        )
+        parser.add_argument(
+            '--user',
+            default=None,
+            help='Username owning rows without a username/user_id column',
+        )
+        parser.add_argument('--batch-size', type=int, default=None, help='Rows per transaction (default IMPORT_BATCH_SIZE)')
+        parser.add_argument('--rejects', default=None, help='Where to write rejected rows')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or guess_format(path)
+        if fmt is None:
+            raise CommandError(f'Cannot tell the format of "{path}"; pass --format {"/".join(FORMATS)}')
+        if options['batch_size'] is not None and options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+
+        default_user = None
+        if options['user']:
+            default_user = User.objects.filter(username=options['user']).first()
+            if default_user is None:
+                raise CommandError(f'Unknown user "{options["user"]}"')
+
+        rejects_path = options['rejects'] or f'{path}.rejects.ndjson'
+        started = time.monotonic()
+        try:
+            with open(path, newline='', encoding='utf-8') as source, \
+                    open(rejects_path, 'w', encoding='utf-8') as rejects:
+                importer = BookingImporter(
+                    default_user=default_user,
+                    batch_size=options['batch_size'],
+                    reject=lambda record: rejects.write(json.dumps(record, ensure_ascii=False) + '\n'),
+                )
+                result = importer.run(read_rows(source, fmt))
+        except OSError as exc:
+            raise CommandError(str(exc))
+        except UnicodeDecodeError:
+            raise CommandError(f'{path} is not valid UTF-8; stopped after importing {importer.imported} row(s)')
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        rows = result['imported'] + result['rejected']
+        self.stdout.write(
+            f'Imported {result["imported"]} booking(s), rejected {result["rejected"]} '
+            f'in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s).'
+        )
+        if result['rejected']:
+            self.stdout.write(self.style.WARNING(f'Rejected rows written to {rejects_path}'))
+        else:
+            os.remove(rejects_path)
+            self.stdout.write(self.style.SUCCESS('No rows rejected.'))
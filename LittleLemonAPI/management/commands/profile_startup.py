@@ -0,0 +1,78 @@
+"""
+Django management command to measure cold-start time.
+
+Usage:
+    python manage.py profile_startup
+    python manage.py profile_startup --path /api/tables/ --startup lazy --runs 5 --top 20
+    python manage.py profile_startup --budget 500 --output startup.json
+
+Starts fresh interpreters that import ``littlelemon.wsgi`` and serve one GET
+request, as a serverless function does on a cold start. Reports the import
+time (``django.setup()`` included), the time to the end of the first
+response and their sum, as medians over ``--runs``, then the slowest module
+imports of each phase from one more run under ``python -X importtime``.
+
+Exits with an error when the median total exceeds ``--budget`` milliseconds,
+so CI can keep cold starts within a budget.
+"""
+
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from littlelemon import startup
+
+
+class Command(BaseCommand):
+    help = 'Measures cold-start time from importing littlelemon.wsgi to the first response, with per-module import times'
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/menu/', help='Path of the first request (default /api/menu/)')
+        parser.add_argument('--host', default='127.0.0.1', help='Host header of the request (default 127.0.0.1)')
+        parser.add_argument(
+            '--startup',
+            choices=settings.STARTUP_MODES,
+            help='Startup mode of the measured process (default LITTLELEMON_STARTUP or the settings default)',
+        )
+        parser.add_argument('--runs', type=int, default=3, help='Timed cold starts (default 3)')
+        parser.add_argument('--top', type=int, default=15, help='Modules and packages listed per phase (default 15)')
+        parser.add_argument('--budget', type=float, help='Fail if the median total exceeds this many milliseconds')
+        parser.add_argument('--output', help='Write results as JSON to this file')
+
+    def handle(self, *args, **options):
+        if options['runs'] < 1 or options['top'] < 1:
+            raise CommandError('--runs and --top must be positive')
+        try:
+            report = startup.profile(
+                options['path'], options['host'], options['runs'], options['top'], options['startup'],
+            )
+        except RuntimeError as exc:
+            raise CommandError(exc)
+
+        self.stdout.write(f'GET {report["path"]} -> {report["status"]} ({report["startup_mode"]} startup)')
+        self.stdout.write(f'{"import littlelemon.wsgi":<28}{report["import_ms"]:>9.1f} ms')
+        self.stdout.write(f'{"first response":<28}{report["first_response_ms"]:>9.1f} ms')
+        self.stdout.write(f'{"total":<28}{report["total_ms"]:>9.1f} ms')
+        for phase, imports in report['imports'].items():
+            self.stdout.write(f'\n{phase}: {imports["count"]} modules, {imports["total_ms"]:.1f} ms importing')
+            self.stdout.write(f'  {"module":<48}{"self ms":>9}{"cumul. ms":>11}')
+            for entry in imports['modules']:
+                self.stdout.write(
+                    f'  {entry["module"]:<48}{entry["self_ms"]:>9.1f}{entry["cumulative_ms"]:>11.1f}'
+                )
+            self.stdout.write(f'  {"package":<48}{"self ms":>9}')
+            for entry in imports['packages']:
+                self.stdout.write(f'  {entry["package"]:<48}{entry["self_ms"]:>9.1f}')
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Wrote results to {options["output"]}'))
+
+        if report['status'] >= 500:
+            raise CommandError(f'The first request failed with status {report["status"]}')
+        if options['budget'] is not None and report['total_ms'] > options['budget']:
+            raise CommandError(
+                f'Cold start took {report["total_ms"]:.1f} ms, over the {options["budget"]:.0f} ms budget'
+            )
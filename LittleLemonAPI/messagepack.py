@@ -0,0 +1,192 @@
+"""
+Minimal MessagePack (https://msgpack.org) encoder and decoder.
+
+Covers what API responses need: nil, booleans, integers, floats, strings,
+binary, arrays and maps; extension types are not supported. Other values
+are first converted the way DRF's JSON encoder converts them (datetimes to
+ISO 8601 strings, UUIDs to strings, ...), so the MessagePack and JSON
+renderings of a response carry the same values.
+"""
+import struct
+
+from rest_framework.utils.encoders import JSONEncoder
+
+_json_default = JSONEncoder().default
+
+_pack_uint8 = struct.Struct('>B').pack
+_pack_uint16 = struct.Struct('>H').pack
+_pack_uint32 = struct.Struct('>I').pack
+_pack_uint64 = struct.Struct('>Q').pack
+_pack_int8 = struct.Struct('>b').pack
+_pack_int16 = struct.Struct('>h').pack
+_pack_int32 = struct.Struct('>i').pack
+_pack_int64 = struct.Struct('>q').pack
+_pack_double = struct.Struct('>d').pack
+
+# Precomputed one-byte encodings: positive fixint values and fixstr headers
+_FIXINT = [bytes((value,)) for value in range(0x80)]
+_FIXSTR = [bytes((0xa0 | size,)) for size in range(32)]
+
+
+def _str_header(size):
+    if size < 32:
+        return _FIXSTR[size]
+    if size < 0x100:
+        return b'\xd9' + _pack_uint8(size)
+    if size < 0x10000:
+        return b'\xda' + _pack_uint16(size)
+    return b'\xdb' + _pack_uint32(size)
+
+
+def _bin_header(size):
+    if size < 0x100:
+        return b'\xc4' + _pack_uint8(size)
+    if size < 0x10000:
+        return b'\xc5' + _pack_uint16(size)
+    return b'\xc6' + _pack_uint32(size)
+
+
+def _container_header(size, fix, marker16, marker32):
+    if size < 16:
+        return bytes((fix | size,))
+    if size < 0x10000:
+        return marker16 + _pack_uint16(size)
+    return marker32 + _pack_uint32(size)
+
+
+def _int(value):
+    if 0 <= value < 0x80:
+        return _FIXINT[value]
+    if -32 <= value < 0:
+        return bytes((value & 0xff,))
+    if value >= 0:
+        if value < 0x100:
+            return b'\xcc' + _pack_uint8(value)
+        if value < 0x10000:
+            return b'\xcd' + _pack_uint16(value)
+        if value < 0x100000000:
+            return b'\xce' + _pack_uint32(value)
+        if value < 0x10000000000000000:
+            return b'\xcf' + _pack_uint64(value)
+    elif value >= -0x80:
+        return b'\xd0' + _pack_int8(value)
+    elif value >= -0x8000:
+        return b'\xd1' + _pack_int16(value)
+    elif value >= -0x80000000:
+        return b'\xd2' + _pack_int32(value)
+    elif value >= -0x8000000000000000:
+        return b'\xd3' + _pack_int64(value)
+    raise ValueError(f'Integer out of MessagePack range: {value}')
+
+
+def packb(value):
+    """Encode ``value`` as MessagePack bytes."""
+    parts = []
+    write = parts.append
+    # Map keys repeat on every row of a list; encode each one once
+    keys = {}
+
+    def pack(value):
+        kind = type(value)
+        if kind is str:
+            data = value.encode()
+            size = len(data)
+            write(_FIXSTR[size] if size < 32 else _str_header(size))
+            write(data)
+        elif kind is int:
+            write(_FIXINT[value] if 0 <= value < 0x80 else _int(value))
+        elif kind is dict or isinstance(value, dict):
+            write(_container_header(len(value), 0x80, b'\xde', b'\xdf'))
+            for key, item in value.items():
+                if type(key) is str:
+                    encoded = keys.get(key)
+                    if encoded is None:
+                        encoded = keys[key] = packb(key)
+                    write(encoded)
+                else:
+                    pack(key)
+                pack(item)
+        elif kind is list or kind is tuple or isinstance(value, (list, tuple)):
+            write(_container_header(len(value), 0x90, b'\xdc', b'\xdd'))
+            for item in value:
+                pack(item)
+        elif value is None:
+            write(b'\xc0')
+        elif kind is bool:
+            write(b'\xc3' if value else b'\xc2')
+        elif kind is float:
+            write(b'\xcb' + _pack_double(value))
+        elif isinstance(value, str):
+            pack(str(value))
+        elif isinstance(value, int):
+            pack(int(value))
+        elif isinstance(value, (bytes, bytearray, memoryview)):
+            data = bytes(value)
+            write(_bin_header(len(data)))
+            write(data)
+        else:
+            pack(_json_default(value))
+
+    pack(value)
+    return b''.join(parts)
+
+
+_unpack_from = {
+    0xcc: struct.Struct('>B'), 0xcd: struct.Struct('>H'), 0xce: struct.Struct('>I'), 0xcf: struct.Struct('>Q'),
+    0xd0: struct.Struct('>b'), 0xd1: struct.Struct('>h'), 0xd2: struct.Struct('>i'), 0xd3: struct.Struct('>q'),
+    0xca: struct.Struct('>f'), 0xcb: struct.Struct('>d'),
+}
+_sizes = {
+    0xc4: 0xcc, 0xc5: 0xcd, 0xc6: 0xce,  # bin 8/16/32
+    0xd9: 0xcc, 0xda: 0xcd, 0xdb: 0xce,  # str 8/16/32
+    0xdc: 0xcd, 0xdd: 0xce,  # array 16/32
+    0xde: 0xcd, 0xdf: 0xce,  # map 16/32
+}
+
+
+def unpackb(data):
+    """Decode MessagePack bytes produced by ``packb`` (or any encoder, minus extension types)."""
+    data = memoryview(data)
+
+    def unpack(offset):
+        marker = data[offset]
+        offset += 1
+        if marker < 0x80:
+            return marker, offset
+        if marker >= 0xe0:
+            return marker - 0x100, offset
+        if marker in _unpack_from:
+            codec = _unpack_from[marker]
+            return codec.unpack_from(data, offset)[0], offset + codec.size
+        if marker in (0xc0, 0xc2, 0xc3):
+            return {0xc0: None, 0xc2: False, 0xc3: True}[marker], offset
+        if marker in _sizes:
+            codec = _unpack_from[_sizes[marker]]
+            size = codec.unpack_from(data, offset)[0]
+            offset += codec.size
+        elif 0xa0 <= marker < 0xc0:
+            size = marker & 0x1f
+        else:
+            size = marker & 0x0f
+        if marker in (0xc4, 0xc5, 0xc6):
+            return bytes(data[offset:offset + size]), offset + size
+        if 0xa0 <= marker < 0xc0 or marker in (0xd9, 0xda, 0xdb):
+            return str(data[offset:offset + size], 'utf-8'), offset + size
+        if 0x90 <= marker < 0xa0 or marker in (0xdc, 0xdd):
+            items = []
+            for _ in range(size):
+                item, offset = unpack(offset)
+                items.append(item)
+            return items, offset
+        if 0x80 <= marker < 0x90 or marker in (0xde, 0xdf):
+            mapping = {}
+            for _ in range(size):
+                key, offset = unpack(offset)
+                mapping[key], offset = unpack(offset)
+            return mapping, offset
+        raise ValueError(f'Unsupported MessagePack type 0x{marker:02x}')
+
+    value, offset = unpack(0)
+    if offset != len(data):
+        raise ValueError('Extra data after MessagePack value')
+    return value
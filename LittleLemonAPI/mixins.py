@@ -0,0 +1,62 @@
+import hashlib
+
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+from . import cache
+
+
+class ConditionalGetMixin:
+    """
+    Version-based ETags for ``list`` and ``retrieve``.
+
+    The ETag is derived from the scope's version token (bumped on every write,
+    see ``signals.py``) rather than from the response body, so a matching
+    ``If-None-Match`` is answered with 304 before any query or serialization.
+    """
+    cache_control = 'no-cache'
+
+    def get_etag_scope(self):
+        raise NotImplementedError('Subclasses must return a cache version scope')
+
+    def get_etag(self, request):
+        scope = self.get_etag_scope()
+        parts = [
+            scope,
+            cache.get_version(scope),
+            self.action,
+            str(self.kwargs.get(self.lookup_url_kwarg or self.lookup_field, '')),
+            request.accepted_renderer.format,
+            request.GET.urlencode(),
+        ]
+        return '"%s"' % hashlib.sha1('|'.join(parts).encode()).hexdigest()
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        """Return 304 if the client's ETag is current, else ``handler``'s response."""
+        etag = self.get_etag(request)
+        if etag_matches(request.headers.get('If-None-Match'), etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            response['Cache-Control'] = self.cache_control
+            patch_vary_headers(response, ['Accept'])
+        return response
+
+
+def etag_matches(header, etag):
+    """Weak comparison of an ``If-None-Match`` header against ``etag``."""
+    if not header:
+        return False
+    candidates = parse_etags(header)
+    if '*' in candidates:
+        return True
+    return any(candidate.removeprefix('W/') == etag for candidate in candidates)
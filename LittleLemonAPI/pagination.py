@@ -0,0 +1,146 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination that keeps the response body a plain list.
+
+    Rows are ordered by ``ordering`` (ascending; the last field must be
+    unique) and the cursor encodes the key of the last row served, so every
+    page is a single index range scan however deep the client scrolls. The
+    next page is advertised in a ``Link: <...>; rel="next"`` header, which
+    keeps existing clients that expect a JSON array working unchanged.
+    """
+    ordering = ('id',)
+    page_size = 50
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+    # Most ids looked up at once by ``paginate_ids``
+    max_id_batch = 500
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.page_rows(list(self.page_queryset(queryset, request)))
+
+    def page_queryset(self, queryset, request):
+        """Return the unevaluated queryset for the requested page.
+
+        Split from ``page_rows`` so async callers can evaluate it themselves.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.model = queryset.model
+        queryset = queryset.order_by(*self.ordering)
+
+        key = self.decode_cursor(request)
+        if key is not None:
+            queryset = queryset.filter(self.keyset_filter(key))
+
+        # Fetch one extra row to learn whether there is a next page
+        return queryset[:self.page_size + 1]
+
+    def paginate_ids(self, queryset, find_ids, request):
+        """
+        Paginate the rows of ``queryset`` whose ids ``find_ids(after, limit)`` returns.
+
+        ``find_ids`` (e.g. a search index) returns up to ``limit`` ids greater
+        than ``after``, ascending. Their rows are fetched by primary key, in
+        doubling batches while ``queryset``'s own filters reject some. Only
+        for ``ordering = ('id',)``.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.model = queryset.model
+        key = self.decode_cursor(request)
+        after = key[0] if key is not None else None
+
+        rows = []
+        batch = self.page_size + 1
+        while len(rows) <= self.page_size:
+            ids = find_ids(after, batch)
+            if ids:
+                rows.extend(queryset.filter(pk__in=ids).order_by('pk'))
+            if len(ids) < batch:
+                break
+            after = ids[-1]
+            batch = min(batch * 2, self.max_id_batch)
+        return self.page_rows(rows[:self.page_size + 1])
+
+    def page_rows(self, rows):
+        self.next_key = None
+        if len(rows) > self.page_size:
+            rows = rows[:self.page_size]
+            self.next_key = self.get_key(rows[-1])
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(data, headers=self.get_headers())
+
+    def get_headers(self):
+        next_link = self.get_next_link()
+        return {'Link': f'<{next_link}>; rel="next"'} if next_link else {}
+
+    def get_page_size(self, request):
+        try:
+            size = int(_query_params(request)[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_next_link(self):
+        if self.next_key is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_key))
+
+    def get_key(self, row):
+        # Rows may be model instances or ``values()`` dicts
+        if isinstance(row, dict):
+            return [row[name] for name in self.ordering]
+        return [getattr(row, name) for name in self.ordering]
+
+    def keyset_filter(self, key):
+        """Build ``(a, b, ...) > (ka, kb, ...)`` as an index-friendly OR of ANDs."""
+        condition = Q()
+        for position, name in enumerate(self.ordering):
+            equal = {prior: key[i] for i, prior in enumerate(self.ordering[:position])}
+            condition |= Q(**equal, **{f'{name}__gt': key[position]})
+        return condition
+
+    def encode_cursor(self, key):
+        values = [value.isoformat() if hasattr(value, 'isoformat') else value for value in key]
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = _query_params(request).get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            if len(values) != len(self.ordering):
+                raise ValueError
+            return [
+                self.model._meta.get_field(name).to_python(value)
+                for name, value in zip(self.ordering, values)
+            ]
+        except (TypeError, ValueError, binascii.Error, ValidationError) as exc:
+            raise NotFound(self.invalid_cursor_message) from exc
+
+
+class BookingPagination(KeysetPagination):
+    ordering = ('booking_date', 'id')
+
+
+def _query_params(request):
+    # Works with both DRF requests and plain Django requests (async views)
+    return getattr(request, 'query_params', request.GET)
@@ -0,0 +1,20 @@
+from rest_framework.renderers import BaseRenderer
+from . import messagepack
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Compact binary responses (MessagePack) for clients that opt in.
+
+    Selected with ``Accept: application/msgpack`` or ``?format=msgpack``;
+    the values are the same as in the JSON rendering.
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return messagepack.packb(data)
@@ -0,0 +1,111 @@
+"""
+Plain-Python equivalents of the API serializers' output.
+
+Code paths that skip ``ModelSerializer`` read ``values()`` rows and convert
+them here. The result must be identical to what ``MenuSerializer`` and
+``BookingSerializer`` produce, and ``render_json`` must match the bytes of
+DRF's ``JSONRenderer`` under the project's settings.
+"""
+import json
+
+from django.http import HttpResponse
+from django.utils import timezone
+from rest_framework.response import Response
+from . import messagepack
+
+MENU_FIELDS = ('id', 'title', 'price', 'inventory')
+BOOKING_FIELDS = ('id', 'name', 'no_of_guests', 'booking_date', 'user')
+
+
+def format_decimal(value):
+    # DRF's DecimalField renders with the column's decimal places (2)
+    return '{:f}'.format(value)
+
+
+def format_datetime(value, tz=None):
+    value = timezone.localtime(value, tz).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def menu_row(row):
+    row['price'] = format_decimal(row['price'])
+    return row
+
+
+def booking_row(row, tz=None):
+    row['booking_date'] = format_datetime(row['booking_date'], tz)
+    return row
+
+
+def menu_rows(queryset):
+    """Menu rows as the serializer would represent them, read with ``values()``."""
+    return [menu_row(row) for row in queryset.values(*MENU_FIELDS)]
+
+
+def booking_rows(rows):
+    """Convert many booking rows, resolving the current time zone only once."""
+    tz = timezone.get_current_timezone()
+    return [booking_row(row, tz) for row in rows]
+
+
+def render_json(data):
+    """Encode ``data`` exactly as DRF's ``JSONRenderer`` would."""
+    content = json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(',', ':'))
+    return content.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029').encode()
+
+
+# Formats that can be rendered ahead of time: (encode, decode)
+PRERENDERED_FORMATS = {
+    'json': (render_json, json.loads),
+    'msgpack': (messagepack.packb, messagepack.unpackb),
+}
+
+
+def render(data, fmt):
+    """Encode ``data`` as the renderer for ``fmt`` (a ``PRERENDERED_FORMATS`` key) would."""
+    return PRERENDERED_FORMATS[fmt][0](data)
+
+
+def json_response(content, status=200, headers=None):
+    """Wrap already-rendered JSON (see ``render_json``) in a response."""
+    return HttpResponse(content, status=status, headers=headers, content_type='application/json')
+
+
+class PrerenderedResponse(Response):
+    """
+    DRF response built from content rendered ahead of time (see ``render``).
+
+    When ``format`` is the negotiated format the bytes are sent as is, so
+    they can come straight from a cache. ``data`` is decoded from them only
+    when something asks for it, e.g. another renderer or a test.
+    """
+
+    def __init__(self, content, data=None, format='json', **kwargs):
+        self.prerendered_content = content
+        self.prerendered_format = format
+        super().__init__(data, **kwargs)
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = PRERENDERED_FORMATS[self.prerendered_format][1](self.prerendered_content)
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+
+    @property
+    def rendered_content(self):
+        renderer = getattr(self, 'accepted_renderer', None)
+        if renderer is None or renderer.format != self.prerendered_format:
+            return super().rendered_content
+        if self.content_type is not None:
+            self['Content-Type'] = self.content_type
+        elif renderer.charset is not None:
+            self['Content-Type'] = f'{renderer.media_type}; charset={renderer.charset}'
+        else:
+            self['Content-Type'] = renderer.media_type
+        return self.prerendered_content
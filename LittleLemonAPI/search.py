@@ -0,0 +1,350 @@
+"""
+In-process n-gram index for case-insensitive substring search on menu titles.
+
+``NgramIndex`` maps every trigram of every lowercased title to the items
+that contain it. Items are numbered by position in id order, and each
+trigram's postings are stored the cheaper of two ways: a sorted array of
+positions for rare trigrams, a bitset (a Python int) for common ones. A
+query intersects the postings of its trigrams (bitsets are ANDed in C) and
+checks the surviving titles, walking positions in id order and stopping as
+soon as it has a page: a search costs microseconds however many items
+match, and the database is only asked for the rows of that page.
+
+The index is built from the database on first use, then kept current
+incrementally. Menu writes bump a shared counter, ``SEARCH_VERSION_KEY``,
+and the process that made the write applies it to its own index (see
+``record_changes``, called by the ``Menu`` signals and the bulk endpoint).
+Any process whose index is behind the counter re-reads ``(id, title)`` on
+its next search and applies only the rows that differ. Inventory updates
+(``reserve``) never touch titles, so they leave the index alone.
+
+Queries shorter than ``NGRAM_SIZE`` have no trigram to look up; callers
+fall back to the database for those (see ``is_indexable``).
+"""
+import bisect
+import random
+import threading
+from array import array
+from collections import defaultdict
+
+from django.db import transaction
+from restaurant.models import Menu
+from littlelemon import db
+from . import cache
+
+NGRAM_SIZE = 3
+# A trigram found in more than one item in DENSE_RATIO is stored as a
+# bitset, which then takes less memory than an array of positions
+DENSE_RATIO = 32
+SEARCH_VERSION_KEY = 'version:menu:search'
+
+
+def normalize(text):
+    return text.lower()
+
+
+def ngrams(text):
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+def is_indexable(text):
+    return len(text) >= NGRAM_SIZE
+
+
+class NgramIndex:
+    """Trigram index over ``(id, title)`` pairs; not thread-safe on its own."""
+
+    def __init__(self, items=()):
+        self.ids = []  # position -> id, ascending; deleted items keep their slot
+        self.titles = []  # position -> normalized title, None once deleted
+        self.positions = {}  # id -> position
+        self.sparse = {}  # trigram -> array of positions, ascending
+        self.dense = {}  # trigram -> bitset of positions
+        self.deleted = 0
+
+        postings = defaultdict(list)
+        for pk, title in sorted(items):
+            position = len(self.ids)
+            title = normalize(title)
+            self.ids.append(pk)
+            self.titles.append(title)
+            self.positions[pk] = position
+            for gram in ngrams(title):
+                postings[gram].append(position)
+
+        dense_size = len(self.ids) // DENSE_RATIO
+        for gram, positions in postings.items():
+            if len(positions) > dense_size:
+                bits = bytearray(len(self.ids) // 8 + 1)
+                for position in positions:
+                    bits[position >> 3] |= 1 << (position & 7)
+                self.dense[gram] = int.from_bytes(bits, 'little')
+            else:
+                self.sparse[gram] = array('i', positions)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def can_add(self, pk):
+        """Whether ``pk`` is indexed, or larger than every indexed id (new items get the next position)."""
+        return pk in self.positions or not self.ids or pk > self.ids[-1]
+
+    def add(self, pk, title):
+        """Index a new item or re-index a renamed one; see ``can_add``."""
+        title = normalize(title)
+        position = self.positions.get(pk)
+        if position is None:
+            position = len(self.ids)
+            self.ids.append(pk)
+            self.titles.append(title)
+            self.positions[pk] = position
+            old = set()
+        else:
+            old = ngrams(self.titles[position])
+            self.titles[position] = title
+        new = ngrams(title)
+        for gram in old - new:
+            self._unpost(gram, position)
+        for gram in new - old:
+            if gram in self.dense:
+                self.dense[gram] |= 1 << position
+            elif gram in self.sparse:
+                bisect.insort(self.sparse[gram], position)
+            else:
+                self.sparse[gram] = array('i', [position])
+
+    def remove(self, pk):
+        position = self.positions.pop(pk, None)
+        if position is None:
+            return
+        for gram in ngrams(self.titles[position]):
+            self._unpost(gram, position)
+        self.titles[position] = None
+        self.deleted += 1
+
+    def _unpost(self, gram, position):
+        if gram in self.dense:
+            self.dense[gram] &= ~(1 << position)
+            if not self.dense[gram]:
+                del self.dense[gram]
+        else:
+            positions = self.sparse[gram]
+            positions.remove(position)
+            if not positions:
+                del self.sparse[gram]
+
+    def title(self, pk):
+        position = self.positions.get(pk)
+        return None if position is None else self.titles[position]
+
+    def search(self, text, after=None, limit=50):
+        """Up to ``limit`` ids, ascending and greater than ``after``, of titles containing ``text``."""
+        text = normalize(text)
+        grams = ngrams(text)
+        if not grams:
+            raise ValueError(f'Search text must have at least {NGRAM_SIZE} characters')
+        start = 0 if after is None else bisect.bisect_right(self.ids, after)
+        if any(gram not in self.dense and gram not in self.sparse for gram in grams):
+            return []
+
+        mask = -1
+        for gram in grams:
+            if gram in self.dense:
+                mask &= self.dense[gram]
+        words = None if mask == -1 else self._words(mask)
+        sparse = sorted((self.sparse[gram] for gram in grams if gram in self.sparse), key=len)
+        if sparse:
+            candidates = self._walk_sparse(sparse, start, words)
+        else:
+            candidates = self._walk_bits(words, start)
+
+        titles, ids = self.titles, self.ids
+        found = []
+        for position in candidates:
+            if text in titles[position]:
+                found.append(ids[position])
+                if len(found) == limit:
+                    break
+        return found
+
+    def _words(self, bits):
+        # The bitset as 64-bit words: testing or scanning a word is cheap,
+        # while every shift of the whole int copies it
+        size = (len(self.ids) >> 6) + 1
+        return memoryview(bits.to_bytes(size * 8, 'little')).cast('Q')
+
+    def _walk_sparse(self, sparse, start, words):
+        # The rarest trigram's positions that the other trigrams share
+        others = [set(positions) for positions in sparse[1:]]
+        first = sparse[0]
+        for position in first[bisect.bisect_left(first, start):]:
+            if words is not None and not words[position >> 6] >> (position & 63) & 1:
+                continue
+            if all(position in positions for positions in others):
+                yield position
+
+    def _walk_bits(self, words, start):
+        index = start >> 6
+        word = words[index] >> (start & 63) << (start & 63) if index < len(words) else 0
+        while True:
+            while word:
+                low = word & -word
+                yield (index << 6) + low.bit_length() - 1
+                word ^= low
+            index += 1
+            if index >= len(words):
+                return
+            word = words[index]
+
+
+class SearchIndex:
+    """
+    The process-wide menu index: an ``NgramIndex`` kept in step with the
+    database and with ``SEARCH_VERSION_KEY``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index = None
+        self._version = None
+        self.builds = 0
+        self.refreshes = 0
+
+    def search(self, text, after=None, limit=50):
+        with self._lock:
+            self._sync()
+            return self._index.search(text, after, limit)
+
+    def _sync(self):
+        version = _current_version()
+        if self._index is not None and version == self._version:
+            return
+        # Read the version before the rows: a write committed meanwhile bumps
+        # it again, and is picked up by the next search
+        with db.primary():
+            rows = list(Menu.objects.order_by('pk').values_list('pk', 'title'))
+        if self._index is None or not self._refresh(rows):
+            self._index = NgramIndex(rows)
+            self.builds += 1
+        self._version = version
+
+    def _refresh(self, rows):
+        """Apply only the rows that changed; False if the index must be rebuilt instead."""
+        index = self._index
+        present = set()
+        changes = []
+        for pk, title in rows:
+            present.add(pk)
+            if index.title(pk) != normalize(title):
+                changes.append((pk, title))
+        changes.extend((pk, None) for pk in index.positions.keys() - present)
+        if not self._apply(changes):
+            return False
+        self.refreshes += 1
+        return True
+
+    def _apply(self, changes):
+        index = self._index
+        if not all(title is None or index.can_add(pk) for pk, title in changes):
+            return False
+        for pk, title in changes:
+            if title is None:
+                index.remove(pk)
+            else:
+                index.add(pk, title)
+        # Positions of deleted items are only reclaimed by a rebuild
+        return index.deleted <= len(index)
+
+    def record_changes(self, changes, since, version):
+        """
+        Apply ``[(id, title or None if deleted)]`` written by this process.
+
+        The write moved the counter from ``since`` to ``version`` with no
+        other write in between, so an index at ``since`` (or at a value the
+        write bumped to earlier) moves to ``version``; any other index is
+        left for the next search to re-read.
+        """
+        with self._lock:
+            if self._index is None or self._version is None or not since <= self._version < version:
+                return
+            if self._apply(changes):
+                self._version = version
+            else:
+                self._index = None
+
+    def snapshot(self):
+        with self._lock:
+            index = self._index
+            return {
+                'items': len(index) if index is not None else 0,
+                'ngrams': len(index.dense) + len(index.sparse) if index is not None else 0,
+                'builds': self.builds,
+                'refreshes': self.refreshes,
+            }
+
+
+def _current_version():
+    version = cache.get_cache().get(SEARCH_VERSION_KEY)
+    if version is None:
+        _reset_version()
+        version = cache.get_cache().get(SEARCH_VERSION_KEY)
+    return version
+
+
+def _reset_version():
+    # A counter (unlike the other scopes' random tokens) tells a process
+    # whether a bump was the only write since its index was read. After an
+    # eviction or expiry it restarts from a random value, so old values are
+    # not reused.
+    cache.get_cache().add(SEARCH_VERSION_KEY, random.randrange(2 ** 62), timeout=cache.version_timeout())
+
+
+def _bump_version():
+    try:
+        return cache.get_cache().incr(SEARCH_VERSION_KEY)
+    except ValueError:
+        _reset_version()
+        return cache.get_cache().incr(SEARCH_VERSION_KEY)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = SearchIndex()
+    return _index
+
+
+def record_changes(changes, using=None):
+    """
+    Reflect ``[(id, title or None if deleted)]`` in the search index.
+
+    Inside a transaction the version is bumped right away, so no process
+    trusts its index meanwhile, and the changes are applied on commit. Ids
+    of ``None`` (``bulk_create`` without ``RETURNING``) can only be picked
+    up by re-reading the table.
+    """
+    if any(pk is None for pk, _ in changes):
+        _bump_version()
+    elif transaction.get_connection(using).in_atomic_block:
+        bumped = _bump_version()
+        transaction.on_commit(lambda: _apply_changes(changes, bumped), using=using)
+    else:
+        _apply_changes(changes)
+
+
+def _apply_changes(changes, bumped=None):
+    version = _bump_version()
+    # Counting on the first bump only if nobody else bumped in between
+    since = bumped - 1 if bumped is not None and version == bumped + 1 else version - 1
+    get_index().record_changes(changes, since, version)
+
+
+def invalidate():
+    """Make every process re-read titles on its next search, e.g. after a raw bulk load."""
+    _bump_version()
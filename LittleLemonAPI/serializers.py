@@ -1,20 +1,75 @@
+from urllib.parse import quote
+
 from django.contrib.auth.models import User
 from rest_framework import serializers
-from restaurant.models import Menu, Booking
+from littlelemon import instrumentation
+from restaurant.models import MAX_INTEGER, Menu, Booking
+
+class TimedSerializerMixin:
+    """Report serialization time to the request instrumentation, when sampled."""
+    def to_representation(self, instance):
+        if not instrumentation.active():
+            return super().to_representation(instance)
+        with instrumentation.timed('serialize'):
+            return super().to_representation(instance)
+
+class CachedHyperlinkedIdentityField(serializers.HyperlinkedIdentityField):
+    """
+    Identity URL that runs ``reverse()`` once per serializer, not once per row.
+
+    The first object's URL is reversed with a marker as its lookup value and
+    split around it; later rows only splice their quoted lookup value in.
+    """
+    marker = 'LOOKUP-VALUE-MARKER'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.url_templates = {}
+
+    def get_url(self, obj, view_name, request, format):
+        if hasattr(obj, 'pk') and obj.pk in (None, ''):
+            return None
+        key = (view_name, format)
+        templates = self.url_templates
+        if key not in templates:
+            url = self.reverse(
+                view_name, kwargs={self.lookup_url_kwarg: self.marker}, request=request, format=format
+            )
+            templates[key] = url.rpartition(self.marker)[::2]
+        prefix, suffix = templates[key]
+        return prefix + quote(str(getattr(obj, self.lookup_field)), safe='') + suffix
+
+
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    serializer_url_field = CachedHyperlinkedIdentityField
 
-class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['url', 'username', 'email', 'groups']
 
-class MenuSerializer(serializers.ModelSerializer):
+class MenuSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Menu
         fields = ['id', 'title', 'price', 'inventory']
 
-class BookingSerializer(serializers.ModelSerializer):
+class BookingSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Booking
         fields = "__all__"
         read_only_fields = ['user']
+        extra_kwargs = {'no_of_guests': {'min_value': 1}}
+
+class SlotAvailabilitySerializer(serializers.Serializer):
+    slot_start = serializers.DateTimeField()
+    capacity = serializers.IntegerField()
+    booked = serializers.IntegerField()
+    available = serializers.IntegerField()
+
+class ReservationLineSerializer(serializers.Serializer):
+    # Bounded like the columns, so the database never sees an out-of-range number
+    id = serializers.IntegerField(min_value=1, max_value=MAX_INTEGER)
+    quantity = serializers.IntegerField(min_value=1, max_value=MAX_INTEGER)
 
+class ReservationSerializer(serializers.Serializer):
+    items = ReservationLineSerializer(many=True, allow_empty=False, max_length=100)
+    all_or_nothing = serializers.BooleanField(default=False)
@@ -0,0 +1,73 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from restaurant.models import Menu, Booking
+from .authentication import get_token_cache
+from . import cache, search
+
+
+def _bump(scope, using):
+    # Bump now so this process stops serving the old payload, and again on
+    # commit in case a concurrent reader re-cached pre-commit rows meanwhile.
+    cache.bump_version(scope)
+    if transaction.get_connection(using).in_atomic_block:
+        transaction.on_commit(lambda: cache.bump_version(scope), using=using)
+
+
+@receiver([post_save, post_delete], sender=Menu)
+def invalidate_menu_cache(sender, using, **kwargs):
+    _bump(cache.MENU_SCOPE, using)
+
+
+@receiver(post_save, sender=Menu)
+def index_menu_item(sender, instance, using, update_fields, **kwargs):
+    # Saves of other fields (e.g. inventory) leave the title as it was
+    if update_fields is None or 'title' in update_fields:
+        search.record_changes([(instance.pk, instance.title)], using)
+
+
+@receiver(post_delete, sender=Menu)
+def unindex_menu_item(sender, instance, using, **kwargs):
+    search.record_changes([(instance.pk, None)], using)
+
+
+@receiver(pre_save, sender=Booking)
+def remember_booking_owner(sender, instance, raw, using, **kwargs):
+    # A reassigned booking leaves its previous owner's list too
+    instance._previous_user_id = None
+    if not raw and not instance._state.adding:
+        instance._previous_user_id = (
+            Booking.objects.using(using).filter(pk=instance.pk).values_list('user_id', flat=True).first()
+        )
+
+
+@receiver([post_save, post_delete], sender=Booking)
+def invalidate_user_bookings(sender, instance, using, **kwargs):
+    user_ids = {instance.user_id, getattr(instance, '_previous_user_id', None)} - {None}
+    for user_id in user_ids:
+        _bump(cache.bookings_scope(user_id), using)
+
+
+@receiver(post_delete, sender=Token)
+def revoke_cached_token(sender, instance, **kwargs):
+    get_token_cache().revoke(instance.key)
+    get_token_cache().revoke_user(instance.user_id)
+
+
+@receiver(post_save, sender=Token)
+def revoke_cached_user_key(sender, instance, **kwargs):
+    # A user's first token (e.g. from djoser's token/login) replaces a cached "no token"
+    get_token_cache().revoke_user(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def revoke_cached_user_tokens(sender, instance, update_fields, **kwargs):
+    # Deactivation, permission or profile changes must not be served from a
+    # stale cached user; last_login bumps on every login are harmless
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    token_cache = get_token_cache()
+    for key in Token.objects.filter(user_id=instance.pk).values_list('key', flat=True):
+        token_cache.revoke(key)
@@ -1,13 +1,41 @@
-from django.contrib.auth.models import User
+import gzip
+import json
+import os
+import sys
+import tempfile
+import types
+from io import StringIO
+from unittest import mock
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache as django_cache, caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connections, router
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
 from django.utils import timezone
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
-from restaurant.models import Menu, Booking
+from rest_framework.renderers import JSONRenderer
+from restaurant import export
+from restaurant.models import Menu, Booking, SlotOccupancy
+from asgiref.sync import iscoroutinefunction, sync_to_async
 from datetime import datetime
+from rest_framework.authtoken.models import Token
+from LittleLemonAPI import benchmark, cache, messagepack, search
+from LittleLemonAPI.authentication import get_token_cache
+from LittleLemonAPI.filters import filter_menu
+from LittleLemonAPI.serializers import BookingSerializer, MenuSerializer
+from LittleLemonAPI.views import UserViewSet
+from littlelemon import compression, startup
+from littlelemon.db import ReplicaRoutingMiddleware
+from littlelemon.instrumentation import RequestTimingMiddleware
 
 class MenuItemsAPITest(APITestCase):
     def setUp(self):
         """Set up test data"""
+        django_cache.clear()
         self.client = APIClient()
         self.menu_item = Menu.objects.create(
             title="Test Pizza",
@@ -95,6 +123,392 @@ class MenuItemsAPITest(APITestCase):
         response = self.client.post('/api/menu/', data, format='json')
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+class MenuCacheTest(APITestCase):
+    def setUp(self):
+        django_cache.clear()
+        cache.menu_stats.reset()
+        self.client = APIClient()
+        self.menu_item = Menu.objects.create(title="Greek Salad", price=12.99, inventory=50)
+
+    def test_menu_list_served_from_cache(self):
+        """Test repeated GET /api/menu/ hits the cache without querying"""
+        self.client.get('/api/menu/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/menu/')
+        self.assertEqual(response.data[0]['title'], 'Greek Salad')
+        self.assertEqual(cache.menu_stats.snapshot()['hits'], 1)
+        self.assertEqual(cache.menu_stats.snapshot()['misses'], 1)
+
+    def test_api_write_invalidates_cache(self):
+        """Test POST /api/menu/ makes the next list include the new item"""
+        self.client.get('/api/menu/')
+        self.client.post('/api/menu/', {'title': 'Baklava', 'price': '5.99', 'inventory': 10}, format='json')
+        response = self.client.get('/api/menu/')
+        self.assertEqual(len(response.data), 2)
+
+    def test_orm_write_invalidates_cache(self):
+        """Test saves outside the API (admin, populate_menu) invalidate the cache"""
+        self.client.get('/api/menu/')
+        self.menu_item.price = '13.49'
+        self.menu_item.save()
+        response = self.client.get('/api/menu/')
+        self.assertEqual(response.data[0]['price'], '13.49')
+        self.menu_item.delete()
+        response = self.client.get('/api/menu/')
+        self.assertEqual(response.data, [])
+
+    def test_metrics_requires_admin(self):
+        """Test GET /api/metrics/ is restricted to staff users"""
+        response = self.client.get('/api/metrics/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        admin = User.objects.create_user(username='admin', password='adminpass123', is_staff=True)
+        self.client.force_authenticate(user=admin)
+        response = self.client.get('/api/metrics/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('hit_rate', response.data['menu_cache'])
+
+    def test_local_version_tokens_expire(self):
+        """Test per-process caches give version tokens a TTL, so other workers catch up"""
+        with mock.patch.object(cache.get_cache(), 'set', wraps=cache.get_cache().set) as cache_set:
+            cache.bump_version(cache.MENU_SCOPE)
+        self.assertEqual(cache_set.call_args.kwargs['timeout'], 30)
+        with mock.patch.object(cache, 'is_process_local', return_value=False):
+            self.assertIsNone(cache.version_timeout())
+
+    def test_local_cache_check(self):
+        """Test the system check warns about a per-process API cache outside DEBUG"""
+        from LittleLemonAPI.checks import check_shared_api_cache
+        with override_settings(DEBUG=False):
+            self.assertEqual([error.id for error in check_shared_api_cache(None)], ['LittleLemonAPI.W001'])
+        with override_settings(DEBUG=True):
+            self.assertEqual(check_shared_api_cache(None), [])
+
+class MenuBulkAPITest(APITestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.client = APIClient()
+        self.pizza = Menu.objects.create(title="Pizza", price=12.50, inventory=50)
+        self.burger = Menu.objects.create(title="Burger", price=9.99, inventory=30)
+
+    def test_bulk_create_update_delete(self):
+        """Test POST /api/menu/bulk/ applies creates, updates and deletes together"""
+        self.client.get('/api/menu/')  # warm the cache
+        data = [
+            {'title': 'Baklava', 'price': '5.99', 'inventory': 50},
+            {'id': self.pizza.id, 'price': '13.50'},
+            {'id': self.burger.id, 'delete': True},
+        ]
+        # lookup, savepoint, insert, update, delete (collect + delete), release
+        with self.assertNumQueries(7):
+            response = self.client.post('/api/menu/bulk/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [result['status'] for result in response.data['results']],
+            ['created', 'updated', 'deleted']
+        )
+        self.pizza.refresh_from_db()
+        self.assertEqual(float(self.pizza.price), 13.50)
+        self.assertFalse(Menu.objects.filter(id=self.burger.id).exists())
+        titles = sorted(item['title'] for item in self.client.get('/api/menu/').data)
+        self.assertEqual(titles, ['Baklava', 'Pizza'])
+
+    def test_bulk_reports_errors_without_aborting_valid_items(self):
+        """Test invalid items are reported while valid items are still applied"""
+        data = [
+            {'title': '', 'price': '5.99', 'inventory': 50},
+            {'id': 999, 'price': '1.00'},
+            {'id': self.pizza.id, 'inventory': 10},
+            {'id': 10 ** 20, 'delete': True},
+        ]
+        response = self.client.post('/api/menu/bulk/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        results = response.data['results']
+        self.assertEqual(results[0]['status'], 'error')
+        self.assertIn('title', results[0]['errors'])
+        self.assertEqual(results[1]['errors'], {'id': ['Not found.']})
+        self.assertEqual(results[2]['status'], 'updated')
+        # Too large for the id column: no such item, rather than a database error
+        self.assertEqual(results[3]['errors'], {'id': ['Not found.']})
+        self.pizza.refresh_from_db()
+        self.assertEqual(self.pizza.inventory, 10)
+
+    def test_bulk_requires_list(self):
+        """Test a non-list body is rejected"""
+        response = self.client.post('/api/menu/bulk/', {'title': 'Pizza'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+class MenuReserveAPITest(APITestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.salad = Menu.objects.create(title="Greek Salad", price=12.99, inventory=5)
+        self.fish = Menu.objects.create(title="Grilled Fish", price=18.99, inventory=1)
+
+    def test_reserve_decrements_inventory(self):
+        """Test POST /api/menu/reserve/ decrements each line with one UPDATE"""
+        data = {'items': [{'id': self.salad.id, 'quantity': 2}, {'id': self.fish.id, 'quantity': 1}]}
+        with self.assertNumQueries(2):
+            response = self.client.post('/api/menu/reserve/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(all(result['reserved'] for result in response.data['results']))
+        self.salad.refresh_from_db()
+        self.assertEqual(self.salad.inventory, 3)
+
+    def test_reserve_never_goes_below_zero(self):
+        """Test lines exceeding stock fail while the others succeed"""
+        data = {'items': [{'id': self.salad.id, 'quantity': 2}, {'id': self.fish.id, 'quantity': 2}, {'id': 999, 'quantity': 1}]}
+        response = self.client.post('/api/menu/reserve/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        results = response.data['results']
+        self.assertTrue(results[0]['reserved'])
+        self.assertEqual(results[1]['error'], 'insufficient_inventory')
+        self.assertEqual(results[2]['error'], 'not_found')
+        self.fish.refresh_from_db()
+        self.assertEqual(self.fish.inventory, 1)
+
+    def test_reserve_all_or_nothing_rolls_back(self):
+        """Test all_or_nothing leaves inventory untouched when a line fails"""
+        data = {
+            'items': [{'id': self.salad.id, 'quantity': 2}, {'id': self.fish.id, 'quantity': 2}],
+            'all_or_nothing': True,
+        }
+        response = self.client.post('/api/menu/reserve/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.salad.refresh_from_db()
+        self.assertEqual(self.salad.inventory, 5)
+
+    def test_reserve_invalidates_menu_cache(self):
+        """Test the cached menu list reflects reserved inventory"""
+        self.client.get('/api/menu/')
+        self.client.post('/api/menu/reserve/', {'items': [{'id': self.fish.id, 'quantity': 1}]}, format='json')
+        inventory = {item['id']: item['inventory'] for item in self.client.get('/api/menu/').data}
+        self.assertEqual(inventory[self.fish.id], 0)
+
+    def test_reserve_rejects_out_of_range_numbers(self):
+        """Test ids and quantities too large for an integer column are a 400, not a database error"""
+        for line in ({'id': 10 ** 20, 'quantity': 1}, {'id': self.salad.id, 'quantity': 10 ** 20}):
+            response = self.client.post('/api/menu/reserve/', {'items': [line]}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.salad.refresh_from_db()
+        self.assertEqual(self.salad.inventory, 5)
+
+    def test_reserve_requires_authentication(self):
+        """Test anonymous clients cannot reserve inventory"""
+        self.client.force_authenticate(user=None)
+        response = self.client.post('/api/menu/reserve/', {'items': [{'id': self.salad.id, 'quantity': 1}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+class MenuSearchTest(APITestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.client = APIClient()
+        self.items = [
+            Menu.objects.create(title=title, price=price, inventory=inventory)
+            for title, price, inventory in [
+                ('Greek Salad', '12.50', 10),
+                ('Grilled Fish', '22.00', 0),
+                ('Lemon Dessert', '6.00', 5),
+                ('Bruschetta', '8.00', 20),
+                ('Greek Yogurt', '5.50', 3),
+            ]
+        ]
+
+    def titles(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item['title'] for item in response.data]
+
+    def test_prefix_ending_in_z(self):
+        """Test a prefix whose last letter is the last of the alphabet still matches"""
+        Menu.objects.create(title='Pizza Margherita', price='11.00', inventory=4)
+        Menu.objects.create(title='Pita Bread', price='3.00', inventory=9)
+        self.assertEqual(self.titles('/api/menu/?prefix=PIZ'), ['Pizza Margherita'])
+
+    def test_prefix_served_by_index(self):
+        """Test ?prefix= is a range that the LOWER(title) expression index serves"""
+        plan = filter_menu(Menu.objects.all(), {'prefix': 'Piz'}).explain()
+        self.assertIn('menu_title_lower_idx', plan)
+
+    def test_search_matches_substring_case_insensitively(self):
+        """Test ?search= matches anywhere in the title, ignoring case"""
+        self.assertEqual(self.titles('/api/menu/?search=GREEK'), ['Greek Salad', 'Greek Yogurt'])
+        self.assertEqual(self.titles('/api/menu/?search=ssert'), ['Lemon Dessert'])
+        self.assertEqual(self.titles('/api/menu/?search=k s'), ['Greek Salad'])
+        self.assertEqual(self.titles('/api/menu/?search=greek+fish'), [])
+
+    def test_short_search_uses_database(self):
+        """Test text shorter than a trigram is still matched"""
+        self.assertEqual(self.titles('/api/menu/?search=gr'), ['Greek Salad', 'Grilled Fish', 'Greek Yogurt'])
+
+    def test_prefix_and_filters(self):
+        """Test ?prefix=, the price range and ?in_stock= narrow the list"""
+        self.assertEqual(self.titles('/api/menu/?prefix=gr'), ['Greek Salad', 'Grilled Fish', 'Greek Yogurt'])
+        self.assertEqual(self.titles('/api/menu/?prefix=salad'), [])
+        self.assertEqual(self.titles('/api/menu/?min_price=6&max_price=12.50'), ['Greek Salad', 'Lemon Dessert', 'Bruschetta'])
+        self.assertEqual(self.titles('/api/menu/?prefix=gr&in_stock=true'), ['Greek Salad', 'Greek Yogurt'])
+        self.assertEqual(self.titles('/api/menu/?search=fish&in_stock=false'), ['Grilled Fish'])
+        self.assertEqual(self.titles('/api/menu/?search=greek&max_price=10'), ['Greek Yogurt'])
+
+    def test_invalid_filters_return_400(self):
+        """Test unparseable or contradictory filters are validation errors"""
+        for query in ('min_price=cheap', 'max_price=NaN', 'in_stock=maybe', 'min_price=10&max_price=5'):
+            response = self.client.get(f'/api/menu/?{query}')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, query)
+
+    def test_search_is_paginated(self):
+        """Test search results follow Link headers in id order, skipping filtered rows"""
+        for number in range(12):
+            Menu.objects.create(title=f'Lamb Kofta {number}', price='9.00', inventory=number % 3)
+        seen = []
+        url = '/api/menu/?search=lamb&in_stock=true&page_size=3'
+        while url:
+            response = self.client.get(url)
+            self.assertLessEqual(len(response.data), 3)
+            seen.extend(response.data)
+            link = response.get('Link')
+            url = link[1:link.index('>')] if link else None
+        self.assertEqual([item['title'] for item in seen], [f'Lamb Kofta {n}' for n in range(12) if n % 3])
+        self.assertNotIn('Link', self.client.get('/api/menu/'))
+
+    def test_index_follows_writes(self):
+        """Test the index picks up creates, renames and deletes, including bulk ones"""
+        self.assertEqual(self.titles('/api/menu/?search=salad'), ['Greek Salad'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.items[0].title = 'Horiatiki'
+            self.items[0].save()
+            Menu.objects.create(title='Caesar Salad', price='9.00', inventory=4)
+        self.assertEqual(self.titles('/api/menu/?search=salad'), ['Caesar Salad'])
+
+        self.client.force_authenticate(User.objects.create_user(username='admin', password='pw', is_staff=True))
+        response = self.client.post('/api/menu/bulk/', [
+            {'title': 'Lentil Salad', 'price': '7.00', 'inventory': 1},
+            {'id': self.items[3].id, 'title': 'Bruschetta Salad'},
+            {'id': self.items[1].id, 'delete': True},
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.titles('/api/menu/?search=salad'), ['Bruschetta Salad', 'Caesar Salad', 'Lentil Salad'])
+        self.assertEqual(self.titles('/api/menu/?search=fish'), [])
+
+    def test_local_writes_do_not_rebuild(self):
+        """Test a write by this process is applied to its index without re-reading the table"""
+        index = search.get_index()
+        self.titles('/api/menu/?search=salad')
+        builds, refreshes = index.builds, index.refreshes
+        with self.captureOnCommitCallbacks(execute=True):
+            self.items[0].title = 'Greek Horiatiki'
+            self.items[0].save()
+        self.assertEqual(index.search('horiatiki'), [self.items[0].id])
+        self.assertEqual((index.builds, index.refreshes), (builds, refreshes))
+
+
+class NgramIndexTest(SimpleTestCase):
+    def test_search(self):
+        """Test substring matches come back in id order after the cursor"""
+        index = search.NgramIndex([(3, 'Greek Salad'), (1, 'Salad Bowl'), (7, 'Grilled Fish')])
+        self.assertEqual(index.search('salad'), [1, 3])
+        self.assertEqual(index.search('SALAD', after=1), [3])
+        self.assertEqual(index.search('salad', limit=1), [1])
+        self.assertEqual(index.search('xyz'), [])
+        with self.assertRaises(ValueError):
+            index.search('sa')
+
+    def test_updates(self):
+        """Test adds, renames and removes across rare and common trigrams"""
+        # Enough items that the common trigrams are stored as bitsets
+        index = search.NgramIndex((pk, f'Dish {pk}') for pk in range(1, 101))
+        self.assertIn('dis', index.dense)
+        index.add(50, 'Soup 50')
+        index.add(200, 'Dish Soup')
+        index.remove(10)
+        self.assertEqual(index.search('soup'), [50, 200])
+        self.assertEqual(len(index.search('dish', limit=1000)), 99)
+        self.assertNotIn(10, index.search('dish', limit=1000))
+        self.assertFalse(index.can_add(150))
+        self.assertTrue(index.can_add(201))
+
+
+class ConditionalGetTest(APITestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.menu_item = Menu.objects.create(title="Bruschetta", price=8.99, inventory=40)
+        self.booking = Booking.objects.create(
+            user=self.user,
+            name="Test Booking",
+            no_of_guests=2,
+            booking_date=timezone.make_aware(datetime(2024, 12, 25, 19, 30))
+        )
+
+    def test_menu_list_not_modified(self):
+        """Test GET /api/menu/ with a current ETag returns 304 without queries"""
+        response = self.client.get('/api/menu/')
+        etag = response['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/menu/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+    def test_menu_detail_etag_changes_on_write(self):
+        """Test a menu write invalidates previously issued ETags"""
+        response = self.client.get(f'/api/menu/{self.menu_item.id}/')
+        etag = response['ETag']
+        self.client.patch(f'/api/menu/{self.menu_item.id}/', {'inventory': 39}, format='json')
+        response = self.client.get(f'/api/menu/{self.menu_item.id}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_weak_etag_matches(self):
+        """Test If-None-Match uses weak comparison"""
+        etag = self.client.get('/api/menu/')['ETag']
+        response = self.client.get('/api/menu/', HTTP_IF_NONE_MATCH=f'W/{etag}')
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_etag_differs_per_format(self):
+        """Test JSON and XML representations get different ETags"""
+        json_etag = self.client.get('/api/menu/', HTTP_ACCEPT='application/json')['ETag']
+        xml_etag = self.client.get('/api/menu/', HTTP_ACCEPT='application/xml')['ETag']
+        self.assertNotEqual(json_etag, xml_etag)
+
+    def test_booking_etag_is_per_user(self):
+        """Test one user's booking writes don't invalidate another user's ETag"""
+        other = User.objects.create_user(username='other', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        etag = self.client.get('/api/tables/')['ETag']
+        Booking.objects.create(
+            user=other,
+            name="Other Booking",
+            no_of_guests=4,
+            booking_date=timezone.make_aware(datetime(2024, 12, 26, 19, 30))
+        )
+        response = self.client.get('/api/tables/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertIn('private', response['Cache-Control'])
+        self.client.delete(f'/api/tables/{self.booking.id}/')
+        response = self.client.get('/api/tables/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [])
+
+    def test_reassigned_booking_leaves_previous_owners_list(self):
+        """Test reassigning a booking invalidates both the previous and the new owner's lists"""
+        other = User.objects.create_user(username='other', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        etag = self.client.get('/api/tables/')['ETag']
+        self.client.force_authenticate(user=other)
+        other_etag = self.client.get('/api/tables/')['ETag']
+        self.booking.user = other
+        self.booking.save()
+        response = self.client.get('/api/tables/', HTTP_IF_NONE_MATCH=other_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get('/api/tables/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [])
+
 class BookingAPITest(APITestCase):
     def setUp(self):
         """Set up test data with authenticated user"""
@@ -111,6 +525,16 @@ class BookingAPITest(APITestCase):
             booking_date=timezone.make_aware(datetime(2024, 12, 25, 19, 30))
         )
     
+    def test_create_booking_without_guests_returns_400(self):
+        """Test a booking must be for at least one guest"""
+        for guests in (0, -3):
+            response = self.client.post('/api/tables/', {
+                'name': 'Nobody', 'no_of_guests': guests, 'booking_date': '2024-12-25T19:00:00Z'
+            }, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('no_of_guests', response.data)
+        self.assertEqual(Booking.objects.count(), 1)
+
     def test_get_bookings_authenticated(self):
         """Test GET /api/tables/ requires authentication"""
         response = self.client.get('/api/tables/')
@@ -177,6 +601,673 @@ class BookingAPITest(APITestCase):
         response = self.client.post('/api/tables/', data, format='json')
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
+class BookingPaginationTest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        # Two bookings share each timestamp so the id tie-breaker is exercised
+        for day in range(1, 6):
+            for name in ('Lunch', 'Dinner'):
+                Booking.objects.create(
+                    user=self.user,
+                    name=f'{name} {day}',
+                    no_of_guests=2,
+                    booking_date=timezone.make_aware(datetime(2024, 12, day, 19, 0))
+                )
+
+    def test_cursor_walks_all_bookings_in_order(self):
+        """Test following Link headers returns every booking once, ordered"""
+        seen = []
+        url = '/api/tables/?page_size=3'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data), 3)
+            seen.extend(response.data)
+            link = response.get('Link')
+            url = link[1:link.index('>')] if link else None
+        self.assertEqual(len(seen), 10)
+        self.assertEqual(len({booking['id'] for booking in seen}), 10)
+        keys = [(booking['booking_date'], booking['id']) for booking in seen]
+        self.assertEqual(keys, sorted(keys))
+
+    def test_last_page_has_no_link(self):
+        """Test a page that fits everything has no next link"""
+        response = self.client.get('/api/tables/')
+        self.assertEqual(len(response.data), 10)
+        self.assertNotIn('Link', response)
+
+    def test_invalid_cursor_returns_404(self):
+        """Test a garbled cursor is rejected"""
+        response = self.client.get('/api/tables/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_date_range_filter(self):
+        """Test ?from= and ?to= bound the booking date inclusively"""
+        response = self.client.get('/api/tables/?from=2024-12-02&to=2024-12-03')
+        self.assertEqual(len(response.data), 4)
+        response = self.client.get('/api/tables/?from=2024-12-05T19:00:00Z')
+        self.assertEqual(len(response.data), 2)
+
+    def test_invalid_date_filter_returns_400(self):
+        """Test an unparseable date is a validation error"""
+        response = self.client.get('/api/tables/?from=tomorrow')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+@override_settings(BOOKING_SLOT_MINUTES=60, BOOKING_SLOT_CAPACITY=6, BOOKING_OPENING_HOURS=(18, 22))
+class AvailabilityAPITest(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+
+    def test_create_booking_rejected_when_slot_full(self):
+        """Test POST /api/tables/ returns 400 when the slot has no room"""
+        data = {'name': 'Big Party', 'no_of_guests': 4, 'booking_date': '2024-12-31T20:00:00Z'}
+        self.assertEqual(self.client.post('/api/tables/', data, format='json').status_code, status.HTTP_201_CREATED)
+        response = self.client.post('/api/tables/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('booking_date', response.data)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_update_booking_rejected_when_slot_full(self):
+        """Test PATCH /api/tables/<id>/ cannot grow a booking past capacity"""
+        data = {'name': 'Party', 'no_of_guests': 4, 'booking_date': '2024-12-31T20:00:00Z'}
+        booking_id = self.client.post('/api/tables/', data, format='json').data['id']
+        response = self.client.patch(f'/api/tables/{booking_id}/', {'no_of_guests': 7}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.patch(f'/api/tables/{booking_id}/', {'no_of_guests': 6}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_availability(self):
+        """Test GET /api/availability/ lists open slots for a date range"""
+        data = {'name': 'Party', 'no_of_guests': 6, 'booking_date': '2024-12-31T20:00:00Z'}
+        self.client.post('/api/tables/', data, format='json')
+        self.client.force_authenticate(user=None)
+        response = self.client.get('/api/availability/?from=2024-12-31&to=2025-01-01')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 7)
+        self.assertNotIn('2024-12-31T20:00:00Z', [slot['slot_start'] for slot in response.data])
+        self.assertEqual(response.data[0], {
+            'slot_start': '2024-12-31T18:00:00Z', 'capacity': 6, 'booked': 0, 'available': 6
+        })
+
+    def test_get_availability_rejects_long_range(self):
+        """Test the date range is bounded"""
+        response = self.client.get('/api/availability/?from=2024-01-01&to=2024-12-31')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+class CachedTokenAuthenticationTest(APITestCase):
+    def setUp(self):
+        get_token_cache().clear()
+        get_token_cache().stats.reset()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_token_lookup_is_cached(self):
+        """Test repeated token requests skip the token/user query"""
+        self.client.get('/api/secured-view/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/secured-view/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(get_token_cache().stats.snapshot()['hits'], 1)
+
+    def test_invalid_token_not_cached(self):
+        """Test unknown tokens are rejected every time"""
+        self.client.credentials(HTTP_AUTHORIZATION='Token invalid')
+        self.assertEqual(self.client.get('/api/secured-view/').status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(len(get_token_cache().local), 0)
+
+    def test_logout_revokes_cached_token(self):
+        """Test djoser token/logout invalidates the cached entry immediately"""
+        self.client.get('/api/secured-view/')
+        response = self.client.post('/auth/token/logout/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.client.get('/api/secured-view/').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivation_revokes_cached_token(self):
+        """Test deactivating a user invalidates their cached token"""
+        self.client.get('/api/secured-view/')
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/secured-view/').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revocation_reaches_other_workers(self):
+        """Test a token revoked in one worker is not served from another worker's cache"""
+        from LittleLemonAPI.authentication import TokenCache
+        other_worker = TokenCache(max_size=10, ttl=300)
+        other_worker.set(self.token.key, (self.user, self.token), other_worker.generation(self.token.key))
+        self.assertIsNotNone(other_worker.get(self.token.key))
+        self.token.delete()
+        self.assertIsNone(other_worker.get(self.token.key))
+
+    def test_cache_entries_expire_and_are_bounded(self):
+        """Test the in-process tier evicts by TTL and size"""
+        ttl_cache = cache.TTLCache(max_size=2, ttl=0)
+        ttl_cache.set('a', 1)
+        self.assertIsNone(ttl_cache.get('a'))
+        ttl_cache = cache.TTLCache(max_size=2, ttl=60)
+        for key in 'abc':
+            ttl_cache.set(key, key)
+        self.assertIsNone(ttl_cache.get('a'))
+        self.assertEqual(ttl_cache.get('c'), 'c')
+
+class AsyncEndpointsTest(APITestCase):
+    def setUp(self):
+        get_token_cache().clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.token = Token.objects.create(user=self.user)
+        self.menu_item = Menu.objects.create(title="Greek Salad \u2028", price='12.90', inventory=50)
+        self.booking = Booking.objects.create(
+            user=self.user,
+            name="Test Booking",
+            no_of_guests=2,
+            booking_date=timezone.make_aware(datetime(2024, 12, 25, 19, 30, 15, 250))
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.headers = {'Authorization': f'Token {self.token.key}'}
+
+    async def test_async_menu_matches_drf(self):
+        """Test the async menu endpoints return the same bytes as the viewset"""
+        expected_list = (await self.async_client.get('/api/async/menu/')).content
+        expected_detail = (await self.async_client.get(f'/api/async/menu/{self.menu_item.id}/')).content
+        self.assertEqual(expected_list, (await sync_get(self.client, '/api/menu/')).content)
+        self.assertEqual(expected_detail, (await sync_get(self.client, f'/api/menu/{self.menu_item.id}/')).content)
+
+    async def test_async_bookings_match_drf(self):
+        """Test the async booking endpoints return the same bytes as the viewset"""
+        response = await self.async_client.get('/api/async/tables/', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, (await sync_get(self.client, '/api/tables/')).content)
+        response = await self.async_client.get(f'/api/async/tables/{self.booking.id}/', headers=self.headers)
+        self.assertEqual(response.content, (await sync_get(self.client, f'/api/tables/{self.booking.id}/')).content)
+
+    async def test_async_bookings_require_token(self):
+        """Test the async booking endpoints reject anonymous requests"""
+        response = await self.async_client.get('/api/async/tables/')
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.get('/api/async/tables/', headers={'Authorization': 'Token nope'})
+        self.assertEqual(response.status_code, 401)
+
+    async def test_async_bookings_report_bad_parameters(self):
+        """Test a garbled cursor or date gets the viewset's error response"""
+        for query, expected_status in (('cursor=garbage', 404), ('from=tomorrow', 400)):
+            response = await self.async_client.get(f'/api/async/tables/?{query}', headers=self.headers)
+            self.assertEqual(response.status_code, expected_status)
+            self.assertEqual(response.content, (await sync_get(self.client, f'/api/tables/?{query}')).content)
+
+    async def test_async_endpoints_are_read_only(self):
+        """Test writes are refused by the async endpoints"""
+        response = await self.async_client.post('/api/async/menu/', {})
+        self.assertEqual(response.status_code, 405)
+
+class BookingExportAPITest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other = User.objects.create_user(username='otheruser', password='testpass123')
+        self.staff = User.objects.create_user(username='staff', password='testpass123', is_staff=True)
+        for user in (self.user, self.other):
+            for day in (1, 2, 3):
+                Booking.objects.create(
+                    user=user,
+                    name=f'{user.username} {day}',
+                    no_of_guests=2,
+                    booking_date=timezone.make_aware(datetime(2024, 12, day, 19, 0))
+                )
+
+    def export(self, user, url):
+        self.client.force_authenticate(user=user)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b''.join(response.streaming_content).decode().splitlines()
+
+    def test_user_exports_own_bookings(self):
+        """Test GET /api/tables/export/csv/ streams only the user's bookings"""
+        lines = self.export(self.user, '/api/tables/export/csv/?user=%d' % self.other.id)
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(all('otheruser' not in line for line in lines))
+
+    def test_staff_export_filters(self):
+        """Test staff can export everyone, filtered by user and date range"""
+        self.assertEqual(len(self.export(self.staff, '/api/tables/export/ndjson/')), 6)
+        lines = self.export(self.staff, f'/api/tables/export/ndjson/?user={self.other.id}&from=2024-12-02&to=2024-12-02')
+        self.assertEqual([json.loads(line)['name'] for line in lines], ['otheruser 2'])
+
+    def test_export_requires_authentication(self):
+        """Test anonymous export is rejected"""
+        response = self.client.get('/api/tables/export/csv/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+class BookingImportTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.staff = User.objects.create_user(username='staff', password='testpass123', is_staff=True)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write(self, name, lines):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        return path
+
+    def test_command_imports_and_writes_rejects(self):
+        """Test import_bookings inserts valid rows and writes bad ones to the rejects file"""
+        path = self.write('legacy.ndjson', [
+            json.dumps({'name': 'Ana', 'no_of_guests': 2, 'booking_date': '2024-12-25T19:00:00Z', 'username': 'testuser'}),
+            json.dumps({'name': 'Bo', 'no_of_guests': 'many', 'booking_date': '2024-12-25T19:00:00Z'}),
+            'not json',
+            json.dumps({'name': 'Cy', 'no_of_guests': 3, 'booking_date': '2024-12-25T19:30:00Z', 'username': 'nobody'}),
+            json.dumps({'name': 'Di', 'no_of_guests': 4, 'booking_date': '2024-12-25T20:00:00Z'}),
+        ])
+        call_command('import_bookings', path, user='staff', batch_size=2, stdout=StringIO())
+        self.assertEqual(
+            sorted(Booking.objects.values_list('name', 'user__username')),
+            [('Ana', 'testuser'), ('Di', 'staff')],
+        )
+        with open(path + '.rejects.ndjson') as f:
+            rejects = [json.loads(line) for line in f]
+        self.assertEqual([reject['line'] for reject in rejects], [2, 3, 4])
+        self.assertIn('no_of_guests', rejects[0]['errors'])
+        self.assertEqual(rejects[2]['errors'], {'username': ['Unknown user.']})
+
+    def test_command_keeps_slot_capacity(self):
+        """Test imported rows reserve covers and rows over capacity are rejected"""
+        date = timezone.make_aware(datetime(2024, 12, 25, 19, 0))
+        Booking.objects.create(user=self.user, name='Existing', no_of_guests=30, booking_date=date)
+        path = self.write('full.csv', [
+            'name,no_of_guests,booking_date',
+            'Ana,6,2024-12-25T19:15:00Z',
+            'Bo,6,2024-12-25T19:30:00Z',
+            'Cy,4,2024-12-25T19:45:00Z',
+        ])
+        call_command('import_bookings', path, user='testuser', stdout=StringIO())
+        self.assertEqual(sorted(Booking.objects.values_list('name', flat=True)), ['Ana', 'Cy', 'Existing'])
+        self.assertEqual(SlotOccupancy.objects.get(slot_start=date).covers, 40)
+
+    def test_import_without_upsert_conflict_target(self):
+        """Test slot totals are written on backends that cannot name an upsert target, like MySQL"""
+        date = timezone.make_aware(datetime(2024, 12, 25, 19, 0))
+        Booking.objects.create(user=self.user, name='Existing', no_of_guests=30, booking_date=date)
+        path = self.write('mysql.csv', ['name,no_of_guests,booking_date', 'Ana,6,2024-12-25T19:15:00Z'])
+        features = connections['default'].features
+        with mock.patch.object(features, 'supports_update_conflicts_with_target', False):
+            call_command('import_bookings', path, user='testuser', stdout=StringIO())
+        self.assertEqual(SlotOccupancy.objects.get(slot_start=date).covers, 36)
+
+    def test_export_round_trip(self):
+        """Test a CSV export can be imported again"""
+        Booking.objects.create(
+            user=self.user, name='Ana, party of two', no_of_guests=2,
+            booking_date=timezone.make_aware(datetime(2024, 12, 25, 19, 0))
+        )
+        path = self.write('export.csv', [])
+        with open(path, 'w', newline='') as f:
+            f.writelines(export.csv_lines(export.iter_rows(Booking.objects.all())))
+        call_command('import_bookings', path, stdout=StringIO())
+        self.assertEqual(Booking.objects.filter(user=self.user, name='Ana, party of two').count(), 2)
+
+    def test_upload_owned_by_uploader(self):
+        """Test POST /api/tables/import/ assigns rows to the uploader and lists rejects"""
+        self.client.force_authenticate(user=self.user)
+        etag = self.client.get('/api/tables/')['ETag']
+        content = '\n'.join([
+            json.dumps({'name': 'Ana', 'no_of_guests': 2, 'booking_date': '2024-12-25T19:00:00Z', 'username': 'staff'}),
+            json.dumps({'name': 'Bo', 'booking_date': '2024-12-25T19:00:00Z'}),
+        ]).encode()
+        upload = SimpleUploadedFile('bookings.ndjson', content)
+        response = self.client.post('/api/tables/import/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual((response.data['imported'], response.data['rejected']), (1, 1))
+        self.assertEqual(response.data['errors'][0]['errors'], {'no_of_guests': ['This field is required.']})
+        self.assertEqual(Booking.objects.get().user, self.user)
+        self.assertNotEqual(self.client.get('/api/tables/')['ETag'], etag)
+
+    def test_upload_rejects_unknown_format(self):
+        """Test an upload whose format cannot be told is rejected"""
+        self.client.force_authenticate(user=self.user)
+        upload = SimpleUploadedFile('bookings.txt', b'')
+        response = self.client.post('/api/tables/import/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+class FastReadPathTest(APITestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        Menu.objects.create(title="Greek Salad \u2028", price='12.90', inventory=50)
+        Menu.objects.create(title="Bruschetta", price=7, inventory=0)
+        for minute in (0, 30):
+            Booking.objects.create(
+                user=self.user,
+                name="Test Booking",
+                no_of_guests=2,
+                booking_date=timezone.make_aware(datetime(2024, 12, 25, 19, minute, 15, 250))
+            )
+        self.client.force_authenticate(user=self.user)
+
+    def test_menu_list_matches_serializer(self):
+        """Test GET /api/menu/ renders the same bytes as MenuSerializer"""
+        serializer = MenuSerializer(Menu.objects.all(), many=True)
+        response = self.client.get('/api/menu/')
+        self.assertEqual(response.content, JSONRenderer().render(serializer.data))
+        self.assertEqual(response['Content-Type'], 'application/json')
+
+    def test_booking_list_matches_serializer(self):
+        """Test GET /api/tables/ renders the same bytes as BookingSerializer"""
+        serializer = BookingSerializer(Booking.objects.order_by('booking_date', 'id'), many=True)
+        response = self.client.get('/api/tables/')
+        self.assertEqual(response.content, JSONRenderer().render(serializer.data))
+
+    def test_other_formats_still_render(self):
+        """Test non-JSON formats are rendered from the same rows"""
+        response = self.client.get('/api/menu/?format=xml')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'<title>Bruschetta</title>', response.content)
+        response = self.client.get('/api/tables/?format=xml&page_size=1')
+        self.assertIn(b'<name>Test Booking</name>', response.content)
+        self.assertIn('rel="next"', response['Link'])
+
+class MessagePackTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='pos', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        Menu.objects.create(title='Greek salad', price='12.50', inventory=5)
+        Booking.objects.create(
+            user=self.user, name='Till 3', no_of_guests=2,
+            booking_date=timezone.make_aware(datetime(2024, 12, 24, 19, 0)),
+        )
+        cache.get_cache().clear()
+        cache.menu_stats.reset()
+
+    def test_encoding(self):
+        """Test the encoder's output for each type, and that it decodes back"""
+        self.assertEqual(messagepack.packb({'a': [1, None, True]}), b'\x81\xa1a\x93\x01\xc0\xc3')
+        self.assertEqual(messagepack.packb(300), b'\xcd\x01\x2c')
+        self.assertEqual(messagepack.packb(-100), b'\xd0\x9c')
+        self.assertEqual(messagepack.packb('x' * 40), b'\xd9\x28' + b'x' * 40)
+        self.assertEqual(messagepack.packb(list(range(20)))[:3], b'\xdc\x00\x14')
+        value = {'n': -2 ** 40, 'f': 0.25, 'b': b'\x00\x01', 's': 'caf\u00e9', 'l': [False, {}]}
+        self.assertEqual(messagepack.unpackb(messagepack.packb(value)), value)
+
+    def test_lists_match_json(self):
+        """Test menu and booking lists carry the same values as JSON"""
+        for url in ('/api/menu/', '/api/tables/'):
+            expected = self.client.get(url).json()
+            response = self.client.get(url, HTTP_ACCEPT='application/msgpack')
+            self.assertEqual(response['Content-Type'], 'application/msgpack')
+            self.assertEqual(messagepack.unpackb(response.content), expected)
+
+    def test_menu_list_cached_per_format(self):
+        """Test the menu list keeps a separate cached rendering per format"""
+        self.client.get('/api/menu/?format=msgpack')
+        self.client.get('/api/menu/')
+        response = self.client.get('/api/menu/?format=msgpack')
+        self.assertEqual(cache.menu_stats.snapshot(), {'hits': 1, 'misses': 2, 'hit_rate': 1 / 3})
+        self.assertEqual(response.data[0]['title'], 'Greek salad')
+
+    def test_format_benchmark(self):
+        """Test the format comparison reports each format for each payload"""
+        results = benchmark.compare_formats('menu_list', benchmark.format_payloads()['menu_list'], repeats=1)
+        self.assertEqual([result['format'] for result in results], ['json', 'msgpack'])
+        self.assertLess(results[1]['bytes'], results[0]['bytes'])
+
+
+class BenchmarkTest(APITestCase):
+    def test_run_endpoint_reports_percentiles_and_queries(self):
+        """Test the benchmark runner measures an endpoint against a loaded dataset"""
+        token, menu_id = benchmark.load_dataset(20)
+        self.assertEqual(Menu.objects.count(), 20)
+        endpoint = benchmark.Endpoint('bookings_list', 'get', '/api/tables/', auth=True)
+        result = benchmark.run_endpoint(endpoint, token, requests=10, concurrency=1)
+        self.assertEqual(result['requests'], 10)
+        self.assertEqual(result['errors'], 0)
+        self.assertLessEqual(result['latency_ms']['p50'], result['latency_ms']['p99'])
+        self.assertEqual(result['queries_per_request'], 1)
+
+    def test_isolated_caches_leave_configured_caches_alone(self):
+        """Test the benchmarks' caches are separate from, and never flush, the configured ones"""
+        django_cache.set('kept', 1)
+        with benchmark.isolated_caches():
+            benchmark.load_dataset(5)
+            self.assertIsNone(caches['default'].get('kept'))
+            caches['default'].set('benchmark', 1)
+        self.assertEqual(django_cache.get('kept'), 1)
+        self.assertIsNone(django_cache.get('benchmark'))
+
+    def test_percentile_nearest_rank(self):
+        """Test nearest-rank percentiles"""
+        values = list(range(1, 101))
+        self.assertEqual(benchmark.percentile(values, 50), 50)
+        self.assertEqual(benchmark.percentile(values, 99), 99)
+        self.assertEqual(benchmark.percentile([7], 95), 7)
+
+TIMING_ON = {'SAMPLE_RATE': 1.0, 'HEADER': True, 'DUPLICATE_QUERY_THRESHOLD': 3}
+
+@override_settings(REQUEST_TIMING=TIMING_ON)
+class RequestTimingTest(APITestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.client = APIClient()
+        Menu.objects.create(title="Greek Salad", price=12.99, inventory=50)
+
+    def test_server_timing_header(self):
+        """Test sampled API requests report db, serializer and renderer time"""
+        with self.assertLogs('littlelemon.timing', 'INFO') as logs:
+            response = self.client.get(f'/api/menu/{Menu.objects.get().id}/')
+        header = response['Server-Timing']
+        self.assertIn('db;dur=', header)
+        self.assertIn('desc="1 queries"', header)
+        self.assertIn('serialize;dur=', header)
+        self.assertIn('renderer;dur=', header)
+        self.assertIn('"queries": 1', logs.output[0])
+
+    def test_duplicate_queries_flagged(self):
+        """Test a statement repeated per row is logged as a likely N+1"""
+        for i in range(3):
+            User.objects.create_user(username=f'user{i}', password='testpass123')
+        # Without the prefetch, each user's groups are fetched separately
+        with mock.patch.object(UserViewSet, 'queryset', User.objects.order_by('id')), \
+                self.assertLogs('littlelemon.timing', 'WARNING') as logs:
+            self.client.get('/api/users/')
+        self.assertIn('duplicate_queries', logs.output[0])
+
+    @override_settings(REQUEST_TIMING={**TIMING_ON, 'SAMPLE_RATE': 0})
+    def test_unsampled_requests_untouched(self):
+        """Test requests outside the sample get no header"""
+        response = self.client.get('/api/menu/')
+        self.assertNotIn('Server-Timing', response)
+
+    async def test_async_requests_timed_natively(self):
+        """Test the middleware runs as a coroutine under an async stack and still counts queries"""
+        async def view(request):
+            return HttpResponse()
+        self.assertTrue(iscoroutinefunction(RequestTimingMiddleware(view)))
+        with self.assertLogs('littlelemon.timing', 'INFO'):
+            response = await self.async_client.get('/api/async/menu/')
+        self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="1 queries"')
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+class ReplicaRoutingTest(SimpleTestCase):
+    def route(self, method, cookies=None, write=False, status=200):
+        """Return the alias a read would use inside a request, and the response"""
+        request = RequestFactory().generic(method, '/api/menu/')
+        request.COOKIES.update(cookies or {})
+        aliases = []
+        def view(request):
+            if write:
+                router.db_for_write(Booking)
+            aliases.append(router.db_for_read(Menu))
+            return HttpResponse(status=status)
+        response = ReplicaRoutingMiddleware(view)(request)
+        return aliases[0], response
+
+    def test_safe_requests_read_replica(self):
+        """Test GET reads go to a replica and set no pin cookie"""
+        alias, response = self.route('GET')
+        self.assertEqual(alias, 'replica1')
+        self.assertNotIn('primary_pin', response.cookies)
+
+    def test_writes_pin_client_to_primary(self):
+        """Test a successful POST reads the primary and pins later requests"""
+        alias, response = self.route('POST', write=True)
+        self.assertEqual(alias, 'default')
+        self.assertIn('primary_pin', response.cookies)
+        self.assertEqual(self.route('GET', cookies={'primary_pin': '1'})[0], 'default')
+        self.assertNotIn('primary_pin', self.route('POST', status=400)[1].cookies)
+
+    def test_reads_after_write_use_primary(self):
+        """Test reads after a write in the same request, or in a transaction, use the primary"""
+        self.assertEqual(self.route('GET', write=True)[0], 'default')
+        with mock.patch.object(connections['default'], 'in_atomic_block', True):
+            self.assertEqual(self.route('GET')[0], 'default')
+
+    def test_outside_requests_use_primary(self):
+        """Test reads outside a request, or with no replicas, use the primary"""
+        self.assertEqual(router.db_for_read(Menu), 'default')
+        with override_settings(DATABASE_REPLICAS=[]):
+            self.assertEqual(self.route('GET')[0], 'default')
+
+    async def test_async_requests_routed_natively(self):
+        """Test the middleware runs as a coroutine under an async stack and pins async writers"""
+        aliases = []
+        async def view(request):
+            aliases.append(router.db_for_read(Menu))
+            return HttpResponse()
+        middleware = ReplicaRoutingMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        await middleware(RequestFactory().get('/api/menu/'))
+        response = await middleware(RequestFactory().post('/api/menu/'))
+        self.assertEqual(aliases, ['replica1', 'default'])
+        self.assertIn('primary_pin', response.cookies)
+
+
+class CompressionTest(APITestCase):
+    def setUp(self):
+        for i in range(30):
+            Menu.objects.create(title=f'Dish number {i}', price='9.99', inventory=10)
+        cache.get_cache().clear()
+        compression.get_body_cache().clear()
+
+    def test_negotiation(self):
+        """Test q-values decide the coding, ties go to the server's preference"""
+        self.assertEqual(compression.negotiate('gzip;q=0.5, zstd', ('zstd', 'gzip')), 'zstd')
+        self.assertEqual(compression.negotiate('zstd;q=0.2, gzip', ('zstd', 'gzip')), 'gzip')
+        self.assertEqual(compression.negotiate('*', ('zstd', 'gzip')), 'zstd')
+        self.assertIsNone(compression.negotiate('gzip;q=0, br', ('zstd', 'gzip')))
+        self.assertIsNone(compression.negotiate('', ('gzip',)))
+
+    def test_menu_list_compressed_once(self):
+        """Test the menu list is gzipped, with a weak ETag, and compressed once per version"""
+        plain = self.client.get('/api/menu/')
+        response = self.client.get('/api/menu/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertEqual(response['ETag'], 'W/' + plain['ETag'])
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.client.get('/api/menu/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(compression.get_body_cache().stats.snapshot()['hits'], 1)
+        response = self.client.get('/api/menu/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_async_responses_compressed_natively(self):
+        """Test the middleware runs as a coroutine under an async stack and compresses async views"""
+        async def view(request):
+            return HttpResponse()
+        self.assertTrue(iscoroutinefunction(compression.CompressionMiddleware(view)))
+        plain = await self.async_client.get('/api/async/menu/')
+        response = await self.async_client.get('/api/async/menu/', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+
+    def test_small_or_unaccepted_bodies_untouched(self):
+        """Test bodies under MIN_SIZE and clients without gzip get identity responses"""
+        item = Menu.objects.first()
+        self.assertNotIn('Content-Encoding', self.client.get(f'/api/menu/{item.id}/', HTTP_ACCEPT_ENCODING='gzip'))
+        self.assertNotIn('Content-Encoding', self.client.get('/api/menu/', HTTP_ACCEPT_ENCODING='identity'))
+
+    def test_streaming_export_compressed(self):
+        """Test streamed exports are gzipped on the fly"""
+        user = User.objects.create_user(username='streamer', password='testpass123')
+        for day in range(1, 21):
+            Booking.objects.create(
+                user=user, name=f'Party {day}', no_of_guests=2,
+                booking_date=timezone.make_aware(datetime(2024, 12, day, 19, 0)),
+            )
+        self.client.force_authenticate(user=user)
+        response = self.client.get('/api/tables/export/csv/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(len(gzip.decompress(b''.join(response.streaming_content)).splitlines()), 21)
+
+    def test_cookie_responses_not_cached(self):
+        """Test responses that vary on Cookie are compressed per request and never cached"""
+        response = self.client.get('/restaurant/book/', HTTP_ACCEPT_ENCODING='zstd, gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn(b'<html', gzip.decompress(response.content).lower())
+        self.assertEqual(len(compression.get_body_cache()), 0)
+
+
+
+class StartupTest(SimpleTestCase):
+    def test_parse_importtime(self):
+        """Test -X importtime output is split into phases, dropping interpreter startup"""
+        stderr = '\n'.join([
+            'import time: self [us] | cumulative | imported package',
+            'import time:       100 |        100 | site',
+            startup.PHASE_MARKER + 'setup',
+            'import time:       300 |        300 |   django.utils',
+            'import time:       200 |        500 | django',
+            startup.PHASE_MARKER + 'first_request',
+            'import time:      1500 |       1500 | rest_framework.views',
+        ])
+        phases = startup.parse_importtime(stderr)
+        self.assertEqual(phases['setup'], [('django.utils', 300, 300, 1), ('django', 200, 500, 0)])
+        summary = startup.summarize_imports(phases['setup'], top=1)
+        self.assertEqual(summary['modules'], [{'module': 'django.utils', 'self_ms': 0.3, 'cumulative_ms': 0.3}])
+        self.assertEqual(summary['packages'], [{'package': 'django', 'self_ms': 0.5}])
+        self.assertEqual(phases['first_request'][0][0], 'rest_framework.views')
+
+    def test_deferred_imports(self):
+        """Test deferred modules survive import statements and load on first attribute access"""
+        with mock.patch.dict(sys.modules):
+            sys.modules.pop('colorsys', None)
+            startup.defer_imports(['colorsys', 'no_such_module_installed'])
+            self.assertNotIn('no_such_module_installed', sys.modules)
+            import colorsys
+            self.assertIs(type(colorsys), startup.DeferredModule)
+            self.assertEqual(colorsys.rgb_to_hsv(1.0, 0.0, 0.0), (0.0, 1.0, 1.0))
+            self.assertIs(type(colorsys), types.ModuleType)
+
+    def test_lazy_cold_start(self):
+        """Test a lazy cold start of an API request skips djoser, the admin URLs and requests"""
+        env = {**os.environ, 'LITTLELEMON_STARTUP': 'lazy'}
+        # An anonymous bookings request needs no database
+        result = startup.run_cold_start('/api/tables/', '127.0.0.1', env, importtime=True)
+        self.assertEqual((result['startup_mode'], result['status']), ('lazy', 401))
+        self.assertGreater(result['total_ms'], result['import_ms'])
+        modules = {entry[0] for phase in result['imports'].values() for entry in phase}
+        self.assertIn('LittleLemonAPI.views', modules)
+        for module in ('djoser.views', 'littlelemon.admin_urls', 'restaurant.admin', 'urllib3'):
+            self.assertNotIn(module, modules)
+
+    def test_profile_startup_budget(self):
+        """Test profile_startup reports the timings and fails over budget"""
+        imports = startup.summarize_imports([('django', 2000, 2000, 0)])
+        report = {
+            'path': '/api/menu/', 'startup_mode': 'lazy', 'status': 200, 'runs': 3,
+            'import_ms': 300.0, 'first_response_ms': 150.0, 'total_ms': 450.0,
+            'imports': {'setup': imports, 'first_request': imports},
+        }
+        out = StringIO()
+        with mock.patch.object(startup, 'profile', return_value=report):
+            call_command('profile_startup', budget=500, stdout=out)
+            with self.assertRaisesMessage(CommandError, 'over the 400 ms budget'):
+                call_command('profile_startup', budget=400, stdout=StringIO())
+        self.assertIn('total                           450.0 ms', out.getvalue())
+
+
 class SecuredViewTest(APITestCase):
     def setUp(self):
         self.client = APIClient()
@@ -229,3 +1320,33 @@ class UserViewSetTest(APITestCase):
         # Note: User creation might require special handling depending on serializer
         # This test may need adjustment based on your UserSerializer implementation
         self.assertIn(response.status_code, [status.HTTP_201_CREATED, status.HTTP_400_BAD_REQUEST])
+
+    def test_list_query_count_is_constant(self):
+        """Test listing users costs the same queries for 5 or 50 users"""
+        group = Group.objects.create(name='Diners')
+        def add_users(count):
+            start = User.objects.count()
+            for i in range(start, start + count):
+                User.objects.create_user(username=f'diner{i}').groups.add(group)
+        add_users(4)
+        with self.assertNumQueries(2):
+            self.client.get('/api/users/')
+        add_users(45)
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/users/')
+        self.assertEqual(len(response.data), 50)
+        self.assertEqual(response.data[1]['groups'], [group.pk])
+
+    def test_list_urls_and_pagination(self):
+        """Test user URLs match the detail route and lists are paginated"""
+        User.objects.create_user(username='second')
+        response = self.client.get('/api/users/?page_size=1')
+        self.assertEqual(response.data[0]['url'], f'http://testserver/api/users/{self.user.id}/')
+        self.assertIn('rel="next"', response['Link'])
+        response = self.client.get(response['Link'][1:response['Link'].index('>')])
+        self.assertEqual([row['username'] for row in response.data], ['second'])
+        self.assertNotIn('Link', response)
+
+
+def sync_get(client, url):
+    return sync_to_async(client.get)(url)
@@ -1,7 +1,7 @@
 from django.urls import path, include
 from rest_framework import routers
 from rest_framework.authtoken.views import obtain_auth_token
-from . import views
+from . import views, async_views
 
 router = routers.DefaultRouter()
 router.register(r'users', views.UserViewSet)
@@ -11,6 +11,13 @@ router.register(r'menu', views.MenuViewSet, basename='menu')
 urlpatterns = [
     path('api/', include(router.urls)),
     path('api/secured-view/', views.secured_view, name='secured_view'),
+    path('api/availability/', views.slot_availability, name='availability'),
+    path('api/metrics/', views.metrics, name='metrics'),
     path('api-token-auth/', obtain_auth_token),
+    # Async-native read endpoints, for ASGI deployments
+    path('api/async/menu/', async_views.menu_list, name='async-menu-list'),
+    path('api/async/menu/<int:pk>/', async_views.menu_detail, name='async-menu-detail'),
+    path('api/async/tables/', async_views.booking_list, name='async-booking-list'),
+    path('api/async/tables/<int:pk>/', async_views.booking_detail, name='async-booking-detail'),
 ]
 
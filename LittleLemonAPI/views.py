@@ -1,33 +1,359 @@
+import codecs
+import datetime
+from functools import partial
+
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import F
 from rest_framework import viewsets
 from rest_framework import permissions
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework import status
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
-from restaurant.models import Menu, Booking
-from .serializers import UserSerializer, MenuSerializer, BookingSerializer
+from restaurant.models import MAX_INTEGER, Menu, Booking
+from restaurant import availability, export
+from littlelemon import compression, instrumentation, pagecache
+from .serializers import (
+    UserSerializer, MenuSerializer, BookingSerializer, ReservationSerializer, SlotAvailabilitySerializer
+)
+from .authentication import get_token_cache
+from .mixins import ConditionalGetMixin
+from .pagination import BookingPagination, KeysetPagination
+from .representation import (
+    BOOKING_FIELDS, MENU_FIELDS, PRERENDERED_FORMATS, PrerenderedResponse, booking_rows, menu_row, menu_rows, render
+)
+from .filters import MENU_FILTER_PARAMS, filter_date_range, filter_menu, parse_date_param
+from . import cache, importer, search
 
 class UserViewSet(viewsets.ModelViewSet):
-    queryset = User.objects.all()
+    # Groups are prefetched for the whole page: two queries however many users
+    queryset = User.objects.order_by('id').prefetch_related('groups')
     serializer_class = UserSerializer
+    pagination_class = KeysetPagination
 
-class MenuViewSet(viewsets.ModelViewSet):
+class MenuViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Menu.objects.all()
     serializer_class = MenuSerializer
+    # Only searches and filtered lists are paginated; the full menu is one list
+    pagination_class = KeysetPagination
+
+    def get_etag_scope(self):
+        return cache.MENU_SCOPE
+
+    def list(self, request, *args, **kwargs):
+        if any(request.query_params.get(name) for name in MENU_FILTER_PARAMS):
+            return self.conditional_response(self.filtered_list, request, *args, **kwargs)
+        return self.conditional_response(self.cached_list, request, *args, **kwargs)
+
+    def filtered_list(self, request, *args, **kwargs):
+        # ?search= is a case-insensitive substring match: the n-gram index
+        # finds the page's ids, and the rows are read by primary key. Text
+        # too short to have a trigram is matched by the database.
+        queryset = filter_menu(self.get_queryset(), request.query_params).values(*MENU_FIELDS)
+        text = request.query_params.get('search')
+        if text and search.is_indexable(text):
+            page = self.paginator.paginate_ids(queryset, partial(search.get_index().search, text), request)
+        else:
+            if text:
+                queryset = queryset.filter(title__icontains=text)
+            page = self.paginate_queryset(queryset)
+        rows = [menu_row(row) for row in page]
+        fmt = request.accepted_renderer.format
+        if fmt in PRERENDERED_FORMATS:
+            return PrerenderedResponse(render(rows, fmt), rows, format=fmt, headers=self.paginator.get_headers())
+        return self.get_paginated_response(rows)
+
+    def cached_list(self, request, *args, **kwargs):
+        # The full menu is the hottest read: cache it as rendered bytes,
+        # built from values() rows rather than per-object serialization.
+        # Formats without a pre-renderer (XML, browsable) render from JSON.
+        fmt = request.accepted_renderer.format
+        if fmt not in PRERENDERED_FORMATS:
+            fmt = 'json'
+        content = cache.get_menu_list(lambda: render(menu_rows(self.get_queryset()), fmt), fmt)
+        return PrerenderedResponse(content, format=fmt)
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Create, update or delete many items in one transaction.
+
+        Takes a list of items. Items without an ``id`` are created, items with
+        an ``id`` are partially updated, and ``{"id": ..., "delete": true}``
+        deletes. Every item is validated by ``MenuSerializer``; invalid items
+        are reported and skipped while the valid ones are written with
+        ``bulk_create``/``bulk_update``. Responds 207 if any item failed.
+        """
+        items = request.data
+        if not isinstance(items, list):
+            raise ValidationError({'non_field_errors': ['Expected a list of items.']})
+        if len(items) > settings.MENU_BULK_MAX_ITEMS:
+            raise ValidationError({'non_field_errors': [
+                f'Ensure this list has no more than {settings.MENU_BULK_MAX_ITEMS} items.'
+            ]})
+
+        def is_id(pk):
+            # Out-of-range ids would overflow the lookup and fail the whole batch
+            return isinstance(pk, int) and not isinstance(pk, bool) and 1 <= pk <= MAX_INTEGER
+
+        existing = Menu.objects.in_bulk(
+            [item['id'] for item in items if isinstance(item, dict) and is_id(item.get('id'))]
+        )
+        results = []
+        to_create, to_update, to_delete = [], [], []
+        seen_ids = set()
+        for index, item in enumerate(items):
+            result = {'index': index}
+            results.append(result)
+            if not isinstance(item, dict):
+                result.update(status='error', errors={'non_field_errors': ['Expected an object.']})
+                continue
+            pk = item.get('id')
+            if pk is None:
+                serializer = self.get_serializer(data=item)
+                if serializer.is_valid():
+                    to_create.append((result, Menu(**serializer.validated_data)))
+                else:
+                    result.update(status='error', errors=serializer.errors)
+                continue
+
+            result['id'] = pk
+            if not isinstance(pk, int) or isinstance(pk, bool):
+                result.update(status='error', errors={'id': ['A valid integer is required.']})
+            elif not is_id(pk) or pk not in existing:
+                result.update(status='error', errors={'id': ['Not found.']})
+            elif pk in seen_ids:
+                result.update(status='error', errors={'id': ['Duplicate id in batch.']})
+            elif item.get('delete'):
+                seen_ids.add(pk)
+                to_delete.append((result, pk))
+            else:
+                seen_ids.add(pk)
+                instance = existing[pk]
+                serializer = self.get_serializer(instance, data=item, partial=True)
+                if serializer.is_valid():
+                    for field, value in serializer.validated_data.items():
+                        setattr(instance, field, value)
+                    to_update.append((result, instance))
+                else:
+                    result.update(status='error', errors=serializer.errors)
+
+        batch_size = settings.MENU_BULK_BATCH_SIZE
+        with transaction.atomic():
+            # bulk_create only fills in primary keys on backends that support
+            # RETURNING (SQLite, PostgreSQL, MariaDB 10.5+); elsewhere id is null
+            Menu.objects.bulk_create([obj for _, obj in to_create], batch_size=batch_size)
+            Menu.objects.bulk_update(
+                [obj for _, obj in to_update], ['title', 'price', 'inventory'], batch_size=batch_size
+            )
+            Menu.objects.filter(pk__in=[pk for _, pk in to_delete]).delete()
+
+        for result, obj in to_create:
+            result.update(status='created', id=obj.pk)
+        for result, _ in to_update:
+            result['status'] = 'updated'
+        for result, _ in to_delete:
+            result['status'] = 'deleted'
+
+        # bulk_create/bulk_update bypass the model signals that invalidate the
+        # cache and keep the search index current
+        if to_create or to_update or to_delete:
+            cache.invalidate_menu()
+            search.record_changes(
+                [(obj.pk, obj.title) for _, obj in to_create + to_update] + [(pk, None) for _, pk in to_delete]
+            )
+
+        failed = any(result['status'] == 'error' for result in results)
+        return Response(
+            {'results': results},
+            status=status.HTTP_207_MULTI_STATUS if failed else status.HTTP_200_OK,
+        )
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated])
+    def reserve(self, request):
+        """
+        Decrement inventory for the ordered items.
+
+        Each line is one conditional ``UPDATE ... SET inventory = inventory - n
+        WHERE id = ... AND inventory >= n``, so concurrent orders never lose
+        updates or drive inventory negative, and no row is read or locked
+        beyond that single statement. By default lines succeed or fail
+        independently; with ``all_or_nothing`` they run in one transaction
+        (in id order, to avoid deadlocks) and are rolled back if any fails.
+        """
+        serializer = ReservationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        lines = serializer.validated_data['items']
+        all_or_nothing = serializer.validated_data['all_or_nothing']
+
+        if all_or_nothing:
+            with transaction.atomic():
+                results = [self._reserve_line(line) for line in sorted(lines, key=lambda line: line['id'])]
+                failed = not all(result['reserved'] for result in results)
+                if failed:
+                    transaction.set_rollback(True)
+                    for result in results:
+                        result['reserved'] = False
+        else:
+            results = [self._reserve_line(line) for line in lines]
+            failed = not all(result['reserved'] for result in results)
+
+        # Queryset updates bypass the model signals that invalidate the cache
+        if any(result['reserved'] for result in results):
+            cache.invalidate_menu()
 
-class BookingViewSet(viewsets.ModelViewSet):
+        if not failed:
+            response_status = status.HTTP_200_OK
+        elif all_or_nothing:
+            response_status = status.HTTP_409_CONFLICT
+        else:
+            response_status = status.HTTP_207_MULTI_STATUS
+        return Response({'results': results}, status=response_status)
+
+    def _reserve_line(self, line):
+        reserved = Menu.objects.filter(
+            pk=line['id'], inventory__gte=line['quantity']
+        ).update(inventory=F('inventory') - line['quantity'])
+        result = {'id': line['id'], 'quantity': line['quantity'], 'reserved': bool(reserved)}
+        if not reserved:
+            exists = Menu.objects.filter(pk=line['id']).exists()
+            result['error'] = 'insufficient_inventory' if exists else 'not_found'
+        return result
+
+class BookingViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = BookingSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = BookingPagination
+    cache_control = 'private, no-cache'
+
+    def get_etag_scope(self):
+        # Bookings are private, so each user has their own version token
+        return cache.bookings_scope(self.request.user.pk)
     
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(self.values_list, request, *args, **kwargs)
+
+    def values_list(self, request, *args, **kwargs):
+        # Read only the serialized columns with values() and convert them in
+        # bulk instead of building a BookingSerializer per row
+        queryset = self.filter_queryset(self.get_queryset()).values(*BOOKING_FIELDS)
+        page = self.paginate_queryset(queryset)
+        with instrumentation.timed('serialize'):
+            rows = booking_rows(page)
+        fmt = request.accepted_renderer.format
+        if fmt in PRERENDERED_FORMATS:
+            return PrerenderedResponse(render(rows, fmt), rows, format=fmt, headers=self.paginator.get_headers())
+        return self.get_paginated_response(rows)
+
     def get_queryset(self):
-        # Return only bookings for the authenticated user
-        return Booking.objects.filter(user=self.request.user)
+        # Return only bookings for the authenticated user, optionally narrowed
+        # to a date range; both predicates are served by the (user, booking_date, id) index
+        queryset = Booking.objects.filter(user=self.request.user)
+        return filter_date_range(queryset, self.request.query_params)
     
+    @action(detail=False, url_path=r'export/(?P<fmt>csv|ndjson)')
+    def export(self, request, fmt):
+        """
+        Stream bookings as CSV or NDJSON, honouring ``?from=``/``?to=``.
+
+        Users export their own bookings. Staff export everyone's, or one
+        user's with ``?user=<id>``.
+        """
+        user = request.user
+        if user.is_staff:
+            queryset = filter_date_range(Booking.objects.all(), request.query_params)
+            user_id = request.query_params.get('user')
+            if user_id:
+                if not user_id.isdigit():
+                    raise ValidationError({'user': ['Expected a user id.']})
+                queryset = queryset.filter(user_id=user_id)
+        else:
+            queryset = self.get_queryset()
+        return export.streaming_response(queryset, fmt)
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def bulk_import(self, request):
+        """
+        Import bookings from an uploaded NDJSON or CSV ``file``.
+
+        The format comes from the file name, or a ``format`` form field. Rows
+        are validated like a POST and inserted in batches; rows belong to the
+        uploader, while staff may name an owner per row. Rejected rows are
+        listed, up to ``IMPORT_MAX_REPORTED_ERRORS``, under ``errors``.
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValidationError({'file': ['No file was submitted.']})
+        fmt = request.data.get('format') or importer.guess_format(upload.name)
+        if fmt not in importer.FORMATS:
+            raise ValidationError({'format': [f'Expected one of: {", ".join(importer.FORMATS)}.']})
+
+        errors = []
+        def reject(record):
+            if len(errors) < settings.IMPORT_MAX_REPORTED_ERRORS:
+                errors.append(record)
+
+        bookings = importer.BookingImporter(
+            default_user=request.user, allow_user_column=request.user.is_staff, reject=reject
+        )
+        try:
+            result = bookings.run(importer.read_rows(codecs.iterdecode(upload, 'utf-8'), fmt))
+        except UnicodeDecodeError:
+            raise ValidationError({'file': [f'Not valid UTF-8; stopped after importing {bookings.imported} row(s).']})
+        result['errors'] = errors
+        return Response(result, status=status.HTTP_207_MULTI_STATUS if result['rejected'] else status.HTTP_200_OK)
+
     def perform_create(self, serializer):
         # Automatically set the user to the authenticated user when creating a booking
-        serializer.save(user=self.request.user)
+        self._save_within_capacity(serializer, user=self.request.user)
+
+    def perform_update(self, serializer):
+        self._save_within_capacity(serializer)
+
+    def _save_within_capacity(self, serializer, **kwargs):
+        # Slot covers are reserved by a pre_save signal; the transaction makes
+        # the reservation and the booking row commit or roll back together
+        try:
+            with transaction.atomic():
+                serializer.save(**kwargs)
+        except availability.SlotFull as exc:
+            raise ValidationError({'booking_date': [str(exc)]})
 
 @api_view()
 @permission_classes([IsAuthenticated])
 def secured_view(request):
-    return Response({"message":"This view is protected"})
\ No newline at end of file
+    return Response({"message":"This view is protected"})
+
+@api_view()
+def slot_availability(request):
+    """List bookable slots between ``?from=`` and ``?to=`` (dates, default today)."""
+    first_day = _query_date(request, 'from') or datetime.date.today()
+    last_day = _query_date(request, 'to') or first_day
+    if last_day < first_day:
+        raise ValidationError({'to': ['Must not be before "from".']})
+    if (last_day - first_day).days >= settings.AVAILABILITY_MAX_DAYS:
+        raise ValidationError({'to': [f'Date range must not exceed {settings.AVAILABILITY_MAX_DAYS} days.']})
+    slots = availability.open_slots(first_day, last_day)
+    return Response(SlotAvailabilitySerializer(slots, many=True).data)
+
+def _query_date(request, name):
+    value, is_date = parse_date_param(request.query_params, name)
+    if value is not None and not is_date:
+        value = value.date()
+    return value
+
+@api_view()
+@permission_classes([IsAdminUser])
+def metrics(request):
+    # Counters are per process; each worker reports its own
+    return Response({
+        "menu_cache": cache.menu_stats.snapshot(),
+        "token_cache": get_token_cache().stats.snapshot(),
+        "compression_cache": compression.get_body_cache().stats.snapshot(),
+        "page_cache": pagecache.page_stats.snapshot(),
+        "search_index": search.get_index().snapshot(),
+    })
@@ -0,0 +1,11 @@
+"""
+Admin URLconf for the lazy startup mode.
+
+Models are registered with the admin when this module is first imported,
+instead of by ``django.contrib.admin``'s ``ready()`` during startup.
+"""
+from django.contrib import admin
+
+admin.autodiscover()
+
+urlpatterns = admin.site.get_urls()
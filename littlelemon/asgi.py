@@ -10,7 +10,10 @@ https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 import os
 
 from django.core.asgi import get_asgi_application
+from littlelemon import startup
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'littlelemon.settings')
 
+startup.configure()
+
 application = get_asgi_application()
@@ -0,0 +1,186 @@
+"""
+Content-negotiated response compression.
+
+``CompressionMiddleware`` takes the place of Django's ``GZipMiddleware``.
+It picks gzip or, on Python 3.14+ (``compression.zstd``), zstd from the
+request's ``Accept-Encoding``, honouring q-values and preferring zstd on a
+tie. Text-like bodies of at least ``COMPRESSION['MIN_SIZE']`` bytes are
+compressed, and streaming responses such as the booking export are
+compressed as they stream.
+
+Compressed bodies of shareable responses are kept in an in-process cache.
+The key is the response's ETag when it has one (the API's version ETags),
+otherwise a hash of the body. Hot responses like the cached menu list are
+then compressed once per version, not once per request.
+
+Other responses that set cookies or vary on ``Cookie`` (pages with CSRF
+tokens or session data) are never cached, and are gzipped with Django's
+random-length padding to blunt BREACH-style attacks. API responses vary on
+``Cookie`` because of session authentication; those with a strong ETag are
+versioned data and still count as shareable.
+"""
+import gzip
+import hashlib
+import threading
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import has_vary_header, patch_vary_headers
+from django.utils.text import compress_string
+from LittleLemonAPI.cache import TTLCache
+from . import instrumentation
+
+try:
+    from compression import zstd
+except ImportError:
+    zstd = None
+
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/json',
+    'application/xml',
+    'application/javascript',
+    'application/x-ndjson',
+    'application/msgpack',
+    'image/svg+xml',
+)
+
+# Server preference, best first
+CODINGS = ('zstd', 'gzip') if zstd else ('gzip',)
+
+
+def parse_accept_encoding(header):
+    """Return ``{coding: q}`` for an ``Accept-Encoding`` header."""
+    weights = {}
+    for part in header.split(','):
+        coding, _, params = part.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding] = weight
+    return weights
+
+
+def negotiate(header, codings=CODINGS):
+    """The accepted coding with the highest q-value, ties going to the order of ``codings``."""
+    if not header:
+        return None
+    weights = parse_accept_encoding(header)
+    best, best_weight = None, 0.0
+    for coding in codings:
+        weight = weights.get(coding, weights.get('*', 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def compress(data, coding, options):
+    if coding == 'zstd':
+        return zstd.compress(data, level=options['ZSTD_LEVEL'])
+    return gzip.compress(data, compresslevel=options['GZIP_LEVEL'], mtime=0)
+
+
+def compress_stream(chunks, coding, options):
+    if coding == 'zstd':
+        compressor = zstd.ZstdCompressor(level=options['ZSTD_LEVEL'])
+    else:
+        compressor = zlib.compressobj(options['GZIP_LEVEL'], zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+_body_cache = None
+_body_cache_lock = threading.Lock()
+
+
+def get_body_cache():
+    global _body_cache
+    if _body_cache is None:
+        with _body_cache_lock:
+            if _body_cache is None:
+                options = settings.COMPRESSION
+                _body_cache = TTLCache(options['CACHE_SIZE'], options['CACHE_TTL'])
+    return _body_cache
+
+
+def is_compressible(response):
+    content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.compress(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.compress(request, await self.get_response(request))
+
+    def compress(self, request, response):
+        if response.has_header('Content-Encoding') or not is_compressible(response):
+            return response
+        options = settings.COMPRESSION
+        if response.streaming:
+            if response.is_async:
+                return response
+        elif len(response.content) < options['MIN_SIZE']:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        etag = response.get('ETag', '')
+        versioned = etag.startswith('"')
+        shareable = not response.cookies and (versioned or not has_vary_header(response, 'Cookie'))
+        coding = negotiate(request.headers.get('Accept-Encoding', ''), CODINGS if shareable else ('gzip',))
+        if coding is None:
+            return response
+
+        with instrumentation.timed('compress'):
+            if response.streaming:
+                response.streaming_content = compress_stream(response.streaming_content, coding, options)
+                del response.headers['Content-Length']
+            else:
+                body = self.compressed_body(response, coding, shareable, versioned and etag, options)
+                if len(body) >= len(response.content):
+                    return response
+                response.content = body
+                response.headers['Content-Length'] = str(len(body))
+
+        # The compressed bytes differ from the identity ones, so a strong
+        # ETag must become weak (as GZipMiddleware does)
+        if versioned:
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = coding
+        return response
+
+    def compressed_body(self, response, coding, shareable, etag, options):
+        if not shareable:
+            return compress_string(response.content, max_random_bytes=100)
+        identity = etag or hashlib.sha1(response.content).hexdigest()
+        key = (coding, identity, len(response.content))
+        cache = get_body_cache()
+        body = cache.get(key)
+        if body is None:
+            body = compress(response.content, coding, options)
+            cache.set(key, body)
+        return body
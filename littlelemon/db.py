@@ -0,0 +1,112 @@
+"""
+Primary/replica database routing.
+
+``DATABASE_REPLICAS`` lists the aliases of read replicas of ``default`` (see
+``LITTLELEMON_DB_REPLICAS`` in settings). Reads go to a random replica only
+while serving a safe request (GET, HEAD, OPTIONS) from a client that has not
+written recently; everything else uses the primary:
+
+- writes, and every read after the first write in the same request
+- reads inside a transaction
+- any request from a client pinned by ``ReplicaRoutingMiddleware`` after a
+  successful write, so users read their own writes despite replication lag
+- code outside a request (management commands, the shell, tests)
+
+``primary()`` forces the primary for a block, e.g. for reads that fill a
+shared cache and must not store a lagging replica's view of the data.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PRIMARY = DEFAULT_DB_ALIAS
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_use_replica = ContextVar('use_replica', default=False)
+
+
+@contextmanager
+def primary():
+    """Send all reads in the block to the primary."""
+    token = _use_replica.set(False)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas or not _use_replica.get() or connections[PRIMARY].in_atomic_block:
+            return PRIMARY
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        # Read your own write for the rest of the request
+        _use_replica.set(False)
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema through replication
+        return db == PRIMARY
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Let safe requests read from replicas, and pin writers to the primary.
+
+    A successful unsafe request sets the ``DATABASE_PRIMARY_PIN_COOKIE``
+    cookie; requests carrying it read from the primary. The cookie lasts
+    ``DATABASE_PRIMARY_PIN_SECONDS``, or the browser session if that is None.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+
+        pinned = settings.DATABASE_PRIMARY_PIN_COOKIE in request.COOKIES
+        token = _use_replica.set(request.method in SAFE_METHODS and not pinned)
+        try:
+            response = self.get_response(request)
+        finally:
+            _use_replica.reset(token)
+        return self.pin(request, response, pinned)
+
+    async def __acall__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+
+        pinned = settings.DATABASE_PRIMARY_PIN_COOKIE in request.COOKIES
+        token = _use_replica.set(request.method in SAFE_METHODS and not pinned)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _use_replica.reset(token)
+        return self.pin(request, response, pinned)
+
+    def pin(self, request, response, pinned):
+        if request.method not in SAFE_METHODS and not pinned and response.status_code < 400:
+            response.set_cookie(
+                settings.DATABASE_PRIMARY_PIN_COOKIE, '1',
+                max_age=settings.DATABASE_PRIMARY_PIN_SECONDS, httponly=True, samesite='Lax',
+            )
+        return response
@@ -0,0 +1,180 @@
+"""
+Opt-in per-request instrumentation.
+
+``RequestTimingMiddleware`` samples a fraction of requests
+(``REQUEST_TIMING['SAMPLE_RATE']``) and, for those, records the SQL query
+count, total DB time, serializer time, renderer time, template render
+time and compression time. The numbers are returned in a ``Server-Timing``
+header and logged as one JSON line on the ``littlelemon.timing`` logger. Statements that repeat
+within one request (the signature of an N+1 pattern) are flagged.
+
+Unsampled requests only pay for a random number draw, so the middleware can
+stay enabled in production at a low sample rate. It is both sync and async
+capable, so under ASGI the async views are not forced through a thread.
+"""
+import json
+import logging
+import random
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('littlelemon.timing')
+
+_current = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.total = 0.0
+        self.db_time = 0.0
+        self.queries = 0
+        self.statements = Counter()
+        self.spans = Counter()
+        self._open = Counter()
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+            # Parameters are kept out of ``sql``, so the same statement run
+            # for different rows collapses to one key
+            self.statements[sql] += 1
+
+    def wrap_queries(self):
+        """Record the queries of this thread's connections until the returned stack is closed."""
+        stack = ExitStack()
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(self.record_query))
+        return stack
+
+    def add(self, name, seconds):
+        self.spans[name] += seconds
+
+    def duplicates(self, threshold):
+        return [(sql, count) for sql, count in self.statements.most_common() if count >= threshold]
+
+    def server_timing(self):
+        entries = [f'db;dur={self.db_time * 1000:.2f};desc="{self.queries} queries"']
+        for name in ('serialize', 'renderer', 'template', 'compress'):
+            if name in self.spans:
+                entries.append(f'{name};dur={self.spans[name] * 1000:.2f}')
+        entries.append(f'total;dur={self.total * 1000:.2f}')
+        return ', '.join(entries)
+
+
+def active():
+    """Return True if the current request is being instrumented."""
+    return _current.get() is not None
+
+
+@contextmanager
+def timed(name):
+    """Add the enclosed block's duration to span ``name`` of the current request.
+
+    Nested blocks of the same name (e.g. a list serializer calling its
+    child) are only counted once.
+    """
+    timings = _current.get()
+    if timings is None or timings._open[name]:
+        yield
+        return
+    timings._open[name] += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+        timings._open[name] -= 1
+
+
+def sampled(options):
+    return options['SAMPLE_RATE'] and random.random() < options['SAMPLE_RATE']
+
+
+class RequestTimingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        options = settings.REQUEST_TIMING
+        if not sampled(options):
+            return self.get_response(request)
+        with self.timing() as timings, timings.wrap_queries():
+            response = self.get_response(request)
+        return self.finish(request, response, timings, options)
+
+    async def __acall__(self, request):
+        options = settings.REQUEST_TIMING
+        if not sampled(options):
+            return await self.get_response(request)
+        with self.timing() as timings:
+            # Queries run in the thread that sync_to_async reserves for the
+            # request, on that thread's connections
+            wrappers = await sync_to_async(timings.wrap_queries)()
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(wrappers.close)()
+        return self.finish(request, response, timings, options)
+
+    @contextmanager
+    def timing(self):
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            yield timings
+        finally:
+            _current.reset(token)
+        timings.total = time.perf_counter() - timings.started
+
+    def finish(self, request, response, timings, options):
+        if options['HEADER']:
+            response['Server-Timing'] = timings.server_timing()
+        self.log(request, response, timings, options['DUPLICATE_QUERY_THRESHOLD'])
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered by a renderer, everything else by the
+        # template engine; either way rendering happens after this hook
+        timings = _current.get()
+        if timings is not None:
+            from rest_framework.response import Response
+            name = 'renderer' if isinstance(response, Response) else 'template'
+            started = time.perf_counter()
+            response.add_post_render_callback(lambda rendered: timings.add(name, time.perf_counter() - started))
+        return response
+
+    def log(self, request, response, timings, threshold):
+        duplicates = timings.duplicates(threshold)
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(timings.total * 1000, 2),
+            'db_ms': round(timings.db_time * 1000, 2),
+            'queries': timings.queries,
+        }
+        for name, seconds in timings.spans.items():
+            record[f'{name}_ms'] = round(seconds * 1000, 2)
+        if duplicates:
+            record['duplicate_queries'] = [{'sql': sql[:200], 'count': count} for sql, count in duplicates]
+            logger.warning(json.dumps(record))
+        else:
+            logger.info(json.dumps(record))
@@ -0,0 +1,125 @@
+"""
+Full-page cache for the static marketing pages.
+
+``PageCacheMiddleware`` answers GET and HEAD requests for the paths in
+``PAGE_CACHE['PATHS']`` (the home and about pages, whose views render a
+template with an empty context) from the API cache. It sits ahead of the
+session, CSRF, authentication and messages middleware, so a hit runs no
+template, context processor or query: it costs two cache lookups.
+
+A miss goes through the whole stack and the response is stored with a
+strong ETag and ``Cache-Control: public, max-age=PAGE_CACHE['MAX_AGE']``.
+Responses that set cookies, vary on ``Cookie``, opt out of caching or are
+not a 200 are passed on and never stored, so a page that starts using the
+session or the user is simply not cached.
+
+Keys embed a version token (``purge()`` bumps it, see the
+``purge_page_cache`` command) and the static files manifest hash, so a
+deploy with new static files never serves pages linking to the old ones.
+``warm()`` renders every page into the cache ahead of the first visitor,
+see the ``warm_page_cache`` command.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, has_vary_header, patch_cache_control, set_response_etag
+from LittleLemonAPI import cache as api_cache
+
+PAGES_SCOPE = 'pages'
+SAFE_METHODS = ('GET', 'HEAD')
+UNCACHEABLE = ('private', 'no-cache', 'no-store')
+
+page_stats = api_cache.CacheStats()
+
+
+def page_key(path):
+    manifest_hash = getattr(staticfiles_storage, 'manifest_hash', '')
+    return f'page:{api_cache.get_version(PAGES_SCOPE)}:{manifest_hash}:{path}'
+
+
+def purge(paths=None):
+    """Drop the cached ``paths``, or every cached page; they are rendered again on their next request."""
+    if paths is None:
+        api_cache.bump_version(PAGES_SCOPE)
+    else:
+        api_cache.get_cache().delete_many([page_key(path) for path in paths])
+
+
+def is_cached_path(request):
+    return request.method in SAFE_METHODS and request.path_info in settings.PAGE_CACHE['PATHS']
+
+
+def is_cacheable(response):
+    cache_control = response.get('Cache-Control', '').lower()
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not has_vary_header(response, 'Cookie')
+        and not any(directive in cache_control for directive in UNCACHEABLE)
+    )
+
+
+def warm(host):
+    """Purge the page cache and render each page into it; returns ``{path: response}``."""
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.test import RequestFactory
+
+    purge()
+    # The same middleware and views as a served request, without a server
+    handler = WSGIHandler()
+    factory = RequestFactory(HTTP_HOST=host)
+    return {path: handler.get_response(factory.get(path)) for path in settings.PAGE_CACHE['PATHS']}
+
+
+class PageCacheMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not is_cached_path(request):
+            return self.get_response(request)
+        key = page_key(request.path_info)
+        response = self.lookup(request, key)
+        if response is None:
+            response = self.store(key, self.get_response(request))
+        return response
+
+    async def __acall__(self, request):
+        if not is_cached_path(request):
+            return await self.get_response(request)
+        key = page_key(request.path_info)
+        response = self.lookup(request, key)
+        if response is None:
+            response = self.store(key, await self.get_response(request))
+        return response
+
+    def lookup(self, request, key):
+        """The cached page answering ``request``, or None on a miss."""
+        # A hit skips CommonMiddleware, which would reject unknown hosts
+        request.get_host()
+        entry = api_cache.get_cache().get(key)
+        if entry is None:
+            page_stats.miss()
+            return None
+        page_stats.hit()
+        content, headers = entry
+        response = HttpResponse(content, headers=dict(headers))
+        response['X-Page-Cache'] = 'hit'
+        return get_conditional_response(request, etag=response['ETag'], response=response)
+
+    def store(self, key, response):
+        if is_cacheable(response):
+            set_response_etag(response)
+            patch_cache_control(response, public=True, max_age=settings.PAGE_CACHE['MAX_AGE'])
+            api_cache.get_cache().set(key, (response.content, list(response.items())), settings.PAGE_CACHE['TIMEOUT'])
+            response['X-Page-Cache'] = 'miss'
+        return response
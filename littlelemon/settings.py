@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -36,10 +39,26 @@ CSRF_TRUSTED_ORIGINS = [
 ]
 
 
+# Startup mode, from the LITTLELEMON_STARTUP environment variable: "lazy"
+# (default without DEBUG, for serverless cold starts) imports the URLconfs of
+# djoser, the admin and the login views, and registers admin models, only on
+# first use; "eager" (default with DEBUG) loads everything at startup. See
+# littlelemon/startup.py and the profile_startup command.
+STARTUP_MODES = ('eager', 'lazy')
+STARTUP_MODE = os.environ.get('LITTLELEMON_STARTUP') or ('eager' if DEBUG else 'lazy')
+if STARTUP_MODE not in STARTUP_MODES:
+    raise ImproperlyConfigured(f'LITTLELEMON_STARTUP must be one of {", ".join(STARTUP_MODES)}')
+
+# Optional packages that rest_framework.compat imports only to detect them;
+# in the lazy mode they load when first used (never, while serving the API)
+STARTUP_DEFERRED_IMPORTS = ['requests', 'yaml']
+
+
 # Application definition
 
 INSTALLED_APPS = [
-    'django.contrib.admin',
+    # SimpleAdminConfig skips admin.autodiscover(); littlelemon.admin_urls runs it
+    'django.contrib.admin' if STARTUP_MODE == 'eager' else 'django.contrib.admin.apps.SimpleAdminConfig',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -53,6 +72,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'littlelemon.instrumentation.RequestTimingMiddleware',
+    'littlelemon.compression.CompressionMiddleware',
+    'littlelemon.pagecache.PageCacheMiddleware',
+    'littlelemon.db.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -100,6 +123,176 @@ DATABASES = {
     }
 }
 
+# LITTLELEMON_DB=sqlite switches to a local SQLite file, e.g. for running the
+# test suite or benchmark_api offline without a MySQL server
+if os.environ.get('LITTLELEMON_DB') == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('LITTLELEMON_SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+        }
+    }
+
+# Read replicas: LITTLELEMON_DB_REPLICAS is a comma-separated list of MySQL
+# hosts (host or host:port, same credentials as the primary) or, with
+# LITTLELEMON_DB=sqlite, of SQLite file paths. Safe requests read from them,
+# see littlelemon/db.py. Tests use the primary for every alias.
+DATABASE_REPLICAS = []
+for number, replica in enumerate(filter(None, os.environ.get('LITTLELEMON_DB_REPLICAS', '').split(',')), 1):
+    settings_dict = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+    if settings_dict['ENGINE'] == 'django.db.backends.sqlite3':
+        settings_dict['NAME'] = replica.strip()
+    else:
+        host, _, port = replica.strip().partition(':')
+        settings_dict.update(HOST=host, PORT=port or settings_dict['PORT'])
+    DATABASES[f'replica{number}'] = settings_dict
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['littlelemon.db.PrimaryReplicaRouter']
+
+# After a successful write, a client reads from the primary for this many
+# seconds (None: until the browser session ends)
+DATABASE_PRIMARY_PIN_COOKIE = 'primary_pin'
+DATABASE_PRIMARY_PIN_SECONDS = None
+
+
+# Request instrumentation (see littlelemon/instrumentation.py)
+# Fraction of requests that get a Server-Timing header and a timing log line;
+# 0 disables it. Statements repeated DUPLICATE_QUERY_THRESHOLD times in one
+# request are flagged as a likely N+1 pattern.
+
+REQUEST_TIMING = {
+    'SAMPLE_RATE': float(os.environ.get('REQUEST_TIMING_SAMPLE_RATE', 0)),
+    'HEADER': True,
+    'DUPLICATE_QUERY_THRESHOLD': 3,
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'littlelemon.timing': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+#
+# Local memory is per process. Set REDIS_URL to share cached payloads and
+# invalidations across workers, or point CACHES at any other shared backend.
+
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+            'KEY_PREFIX': 'littlelemon',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'littlelemon',
+        }
+    }
+
+# Cache alias used by the API for versioned payloads (menu list, ETags, ...)
+API_CACHE_ALIAS = 'default'
+
+# Seconds a serialized menu list stays cached; writes invalidate it sooner
+MENU_CACHE_TIMEOUT = 60 * 60
+
+# Lifetime in seconds of cache version tokens when the API cache is local
+# memory: other workers cannot see a write's bump, so this bounds how long
+# they serve stale payloads and ETags. Shared backends keep tokens forever.
+API_VERSION_TTL = 30
+
+# Sessions
+# Where session data lives, from the SESSION_STORE environment variable:
+# "cache" (default when REDIS_URL is set, so the cache is shared by every
+# worker), "cached_db" (default otherwise: reads come from the local cache,
+# the database keeps sessions across workers and restarts), "db", or
+# "signed_cookies" (opt-in; no server-side storage for serverless hosts,
+# but sessions cannot be revoked). Database-backed stores need
+# prune_sessions run periodically.
+
+SESSION_ENGINES = {
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'db': 'django.contrib.sessions.backends.db',
+}
+SESSION_STORE = os.environ.get('SESSION_STORE') or ('cache' if os.environ.get('REDIS_URL') else 'cached_db')
+if SESSION_STORE not in SESSION_ENGINES:
+    raise ImproperlyConfigured(f'SESSION_STORE must be one of {", ".join(SESSION_ENGINES)}')
+SESSION_ENGINE = SESSION_ENGINES[SESSION_STORE]
+SESSION_CACHE_ALIAS = 'default'
+
+# Token -> user resolution cache used by CachedTokenAuthentication. Set
+# SHARED_ALIAS to a shared cache alias to add a cross-worker tier.
+TOKEN_CACHE = {
+    'MAX_SIZE': 10000,
+    'TTL': 300,
+    'SHARED_ALIAS': None,
+}
+
+# Upper bound on items per POST /api/menu/bulk/ request, and rows per SQL batch
+MENU_BULK_MAX_ITEMS = 1000
+MENU_BULK_BATCH_SIZE = 200
+
+
+# Booking capacity
+# Bookings are grouped into fixed-length slots, each seating at most
+# BOOKING_SLOT_CAPACITY guests. Opening hours are local time, [open, close).
+
+BOOKING_SLOT_MINUTES = 60
+BOOKING_SLOT_CAPACITY = 40
+BOOKING_OPENING_HOURS = (11, 23)
+
+# Longest date range accepted by GET /api/availability/
+AVAILABILITY_MAX_DAYS = 31
+
+# Rows fetched per database round trip by the streaming booking export
+EXPORT_CHUNK_SIZE = 2000
+
+# Rows per transaction when importing bookings, and rejected rows listed in
+# a POST /api/tables/import/ response
+IMPORT_BATCH_SIZE = 2000
+IMPORT_MAX_REPORTED_ERRORS = 100
+
+# The booking admin counts matching rows exactly up to this many; beyond it,
+# unfiltered lists use the database's row estimate
+ADMIN_COUNT_LIMIT = 10000
+
+
+# Response compression (see littlelemon/compression.py). Bodies smaller than
+# MIN_SIZE bytes are sent as they are. Compressed bodies of shareable
+# responses are cached per process: CACHE_SIZE entries for CACHE_TTL seconds.
+COMPRESSION = {
+    'MIN_SIZE': 512,
+    'GZIP_LEVEL': 6,
+    'ZSTD_LEVEL': 3,
+    'CACHE_SIZE': 256,
+    'CACHE_TTL': 300,
+}
+
+
+# Full-page cache (see littlelemon/pagecache.py). GET and HEAD requests for
+# PATHS, pages that are the same for every visitor, are served from the API
+# cache without running sessions, templates or queries. Pages stay cached for
+# TIMEOUT seconds or until purge_page_cache; browsers and CDNs may reuse one
+# for MAX_AGE seconds. Run warm_page_cache on deploy.
+PAGE_CACHE = {
+    'PATHS': ['/restaurant/', '/restaurant/about/'],
+    'TIMEOUT': 24 * 60 * 60,
+    'MAX_AGE': 5 * 60,
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -136,20 +329,51 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/4.2/howto/static-files/
 
 STATIC_URL = 'static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# collectstatic (run by build_assets) writes content-hashed copies and a
+# manifest, so collected files can be served with far-future cache headers
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'littlelemon.storage.StaticFilesStorage'},
+}
+
+# build_assets: widths (px) and JPEG quality of responsive image variants,
+# and which collected files get a pre-compressed .gz copy
+IMAGE_VARIANT_WIDTHS = (480, 960, 1440)
+IMAGE_VARIANT_QUALITY = 80
+STATIC_COMPRESS_EXTENSIONS = ('.css', '.js', '.svg', '.json')
+STATIC_COMPRESS_MIN_SIZE = 512
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
-REST_FRAMEWORK = {
-    'DEFAULT_RENDERER_CLASSES': [
+# API response formats, from the API_RENDERERS environment variable:
+# "full" (default with DEBUG) adds the browsable API and XML; "lean" (default
+# otherwise, for production) negotiates only between JSON and MessagePack.
+# MessagePack is always opt-in: Accept: application/msgpack or ?format=msgpack.
+API_RENDERER_PROFILES = {
+    'lean': [
+        'rest_framework.renderers.JSONRenderer',
+        'LittleLemonAPI.renderers.MessagePackRenderer',
+    ],
+    'full': [
         'rest_framework.renderers.JSONRenderer',
         'rest_framework.renderers.BrowsableAPIRenderer',
         'rest_framework_xml.renderers.XMLRenderer',
+        'LittleLemonAPI.renderers.MessagePackRenderer',
     ],
+}
+API_RENDERERS = os.environ.get('API_RENDERERS') or ('full' if DEBUG else 'lean')
+if API_RENDERERS not in API_RENDERER_PROFILES:
+    raise ImproperlyConfigured(f'API_RENDERERS must be one of {", ".join(API_RENDERER_PROFILES)}')
+
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': API_RENDERER_PROFILES[API_RENDERERS],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'LittleLemonAPI.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
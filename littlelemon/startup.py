@@ -0,0 +1,222 @@
+"""
+Cold start: lazy URLconf loading and startup profiling.
+
+With ``STARTUP_MODE = 'lazy'`` (``LITTLELEMON_STARTUP``, see settings) the
+root URLconf includes its sub-URLconfs with ``lazy_include``, and the admin
+registers its models only when the admin URLs are first used. A request for
+``/api/menu/`` then never imports djoser, the admin views or the login views.
+``configure`` (called by the WSGI and ASGI modules) also defers the optional
+packages DRF imports only to check that they are installed
+(``STARTUP_DEFERRED_IMPORTS``), until something actually uses them.
+
+``profile`` measures a cold start in fresh interpreters: the time to import
+``littlelemon.wsgi`` (which runs ``django.setup()``), the time from there to
+the end of the first response, and, with ``python -X importtime``, what each
+module import costs. See the ``profile_startup`` command.
+
+Run as ``python -X importtime -m littlelemon.startup PATH HOST`` this module
+is the measured process: it only uses the standard library until it imports
+``littlelemon.wsgi``, and prints its timings as JSON.
+"""
+import importlib.util
+import io
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import types
+from collections import defaultdict
+
+# Written to stderr, between -X importtime lines, to split them into phases
+PHASE_MARKER = 'littlelemon.startup phase: '
+PHASES = ('setup', 'first_request')
+
+
+class DeferredModule(types.ModuleType):
+    """
+    A module whose code runs when an attribute it does not have yet is looked up.
+
+    ``importlib.util.LazyLoader`` is no use here: the ``import`` statement
+    itself reads ``__spec__`` from modules found in ``sys.modules``, which
+    makes a ``LazyLoader`` module load. ``module_from_spec`` sets ``__spec__``,
+    ``__path__`` and the like, so only real attributes trigger loading.
+    """
+    _lock = threading.RLock()
+
+    def __getattr__(self, name):
+        with self._lock:
+            if type(self) is DeferredModule:
+                self.__class__ = types.ModuleType
+                self.__spec__.loader.exec_module(self)
+        return getattr(self, name)
+
+
+def defer_imports(names):
+    """Import each installed top-level module in ``names`` as a ``DeferredModule``."""
+    for name in names:
+        if name in sys.modules:
+            continue
+        spec = importlib.util.find_spec(name)
+        if spec is None or spec.loader is None:
+            continue  # not installed
+        module = importlib.util.module_from_spec(spec)
+        module.__class__ = DeferredModule
+        sys.modules[name] = module
+
+
+def configure():
+    """Apply the startup mode before ``django.setup()``."""
+    from django.conf import settings
+
+    if settings.STARTUP_MODE == 'lazy':
+        defer_imports(settings.STARTUP_DEFERRED_IMPORTS)
+
+
+def lazy_include(module, namespace=None, app_name=None):
+    """
+    Like ``include('module')``, but ``module`` is imported the first time a
+    URL under the prefix is resolved, or any URL is reversed.
+
+    ``include`` reads ``app_name`` from the imported module; here it must be
+    given along with ``namespace``.
+    """
+    return (module, app_name or namespace, namespace)
+
+
+def parse_importtime(stderr):
+    """
+    Parse ``-X importtime`` output into ``{phase: [(module, self_us, cumulative_us, depth)]}``.
+
+    Lines before the first phase marker (interpreter startup) are dropped.
+    """
+    phases = defaultdict(list)
+    phase = None
+    for line in stderr.splitlines():
+        if line.startswith(PHASE_MARKER):
+            phase = line[len(PHASE_MARKER):].strip()
+            continue
+        if phase is None or not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the column header
+        name = fields[2].rstrip()
+        module = name.lstrip()
+        depth = (len(name) - len(module) - 1) // 2
+        phases[phase].append((module, int(fields[0]), int(fields[1]), depth))
+    return dict(phases)
+
+
+def summarize_imports(imports, top=15):
+    """The ``top`` slowest modules by self time, and self time summed per top-level package."""
+    packages = defaultdict(int)
+    for module, self_us, _, _ in imports:
+        packages[module.partition('.')[0]] += self_us
+    slowest = sorted(imports, key=lambda entry: entry[1], reverse=True)[:top]
+    return {
+        'count': len(imports),
+        'total_ms': sum(entry[1] for entry in imports) / 1000,
+        'modules': [
+            {'module': module, 'self_ms': self_us / 1000, 'cumulative_ms': cumulative_us / 1000}
+            for module, self_us, cumulative_us, _ in slowest
+        ],
+        'packages': [
+            {'package': package, 'self_ms': self_us / 1000}
+            for package, self_us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+        ],
+    }
+
+
+def run_cold_start(path, host, env, importtime=False):
+    """Run one cold start in a new interpreter; returns its timings (and imports with ``importtime``)."""
+    from django.conf import settings
+
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-m', __spec__.name, path, host]
+    completed = subprocess.run(command, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+    output = completed.stdout.strip().splitlines()
+    if completed.returncode or not output:
+        raise RuntimeError(f'Cold start failed:\n{completed.stderr[-2000:]}')
+    result = json.loads(output[-1])
+    if importtime:
+        result['imports'] = parse_importtime(completed.stderr)
+    return result
+
+
+def profile(path='/api/menu/', host='127.0.0.1', runs=3, top=15, startup_mode=None):
+    """
+    Time ``runs`` cold starts, then one more under ``-X importtime``.
+
+    Timings are medians over the plain runs (``-X importtime`` slows imports
+    down); the module breakdown comes from the extra run.
+    """
+    import statistics
+
+    env = dict(os.environ)
+    if startup_mode:
+        env['LITTLELEMON_STARTUP'] = startup_mode
+    results = [run_cold_start(path, host, env) for _ in range(runs)]
+    traced = run_cold_start(path, host, env, importtime=True)
+    return {
+        'path': path,
+        'startup_mode': traced['startup_mode'],
+        'status': traced['status'],
+        'runs': runs,
+        'import_ms': statistics.median(result['import_ms'] for result in results),
+        'first_response_ms': statistics.median(result['first_response_ms'] for result in results),
+        'total_ms': statistics.median(result['total_ms'] for result in results),
+        'imports': {
+            phase: summarize_imports(traced['imports'].get(phase, []), top) for phase in PHASES
+        },
+    }
+
+
+def _mark(phase):
+    sys.stderr.write(f'{PHASE_MARKER}{phase}\n')
+    sys.stderr.flush()
+
+
+def _main(path, host):
+    _mark('setup')
+    started = time.perf_counter()
+    import littlelemon.wsgi
+    imported = time.perf_counter()
+
+    _mark('first_request')
+    path, _, query = path.partition('?')
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'SERVER_NAME': host,
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': host,
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.url_scheme': 'http',
+        'wsgi.multithread': False,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+        'wsgi.version': (1, 0),
+    }
+    status = []
+    response = littlelemon.wsgi.app(environ, lambda value, headers, exc_info=None: status.append(value))
+    size = sum(len(chunk) for chunk in response)
+    finished = time.perf_counter()
+    response.close()
+
+    from django.conf import settings
+    print(json.dumps({
+        'startup_mode': settings.STARTUP_MODE,
+        'status': int(status[0].split()[0]),
+        'bytes': size,
+        'import_ms': (imported - started) * 1000,
+        'first_response_ms': (finished - imported) * 1000,
+        'total_ms': (finished - started) * 1000,
+    }))
+
+
+if __name__ == '__main__':
+    _main(*sys.argv[1:3])
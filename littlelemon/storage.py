@@ -0,0 +1,19 @@
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+
+class StaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Content-hashed static file names once ``build_assets`` has run.
+
+    Before the first build (development, tests) or for a file added since,
+    there is no manifest entry and the plain name is used instead of raising.
+    """
+    manifest_strict = False
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            return name
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
@@ -14,14 +14,24 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
+from .startup import lazy_include
+
+# The lazy startup mode imports each sub-URLconf on first use, see littlelemon/startup.py
+if settings.STARTUP_MODE == 'lazy':
+    include_urls = lazy_include
+    admin_urls = lazy_include('littlelemon.admin_urls', namespace='admin')
+else:
+    include_urls = include
+    admin_urls = admin.site.urls
 
 urlpatterns = [
-    path('', include('LittleLemonAPI.urls')),
-    path('api-auth/', include('rest_framework.urls', namespace='rest_framework')),
-    path('admin/', admin.site.urls),
-    path('restaurant/', include('restaurant.urls')),
-    path('auth/', include('djoser.urls')),
-    path('auth/', include('djoser.urls.authtoken')),
+    path('', include_urls('LittleLemonAPI.urls')),
+    path('api-auth/', include_urls('rest_framework.urls', namespace='rest_framework')),
+    path('admin/', admin_urls),
+    path('restaurant/', include_urls('restaurant.urls')),
+    path('auth/', include_urls('djoser.urls')),
+    path('auth/', include_urls('djoser.urls.authtoken')),
 ]
@@ -10,7 +10,10 @@ https://docs.djangoproject.com/en/4.2/howto/deployment/wsgi/
 import os
 
 from django.core.wsgi import get_wsgi_application
+from littlelemon import startup
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'littlelemon.settings')
 
+startup.configure()
+
 app = get_wsgi_application()
@@ -1,28 +1,180 @@
+from django import forms
+from django.conf import settings
 from django.contrib import admin
-from . import models
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.contrib.auth.models import User
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import F, Max
+from django.db.models.functions import Lower
+from django.utils.functional import cached_property
+from . import export, models
+from .functions import filter_prefix
 
 # Register your models here.
 admin.site.register(models.Menu)
 
+
+def estimated_row_count(model, using):
+    """The database's estimate of a table's row count, without counting it."""
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+        elif connection.vendor == 'mysql':
+            cursor.execute(
+                'SELECT table_rows FROM information_schema.tables '
+                'WHERE table_schema = DATABASE() AND table_name = %s', [table]
+            )
+        else:
+            # No statistics to read; the highest id is one index lookup away
+            return model._default_manager.using(using).aggregate(estimate=Max('pk'))['estimate'] or 0
+        row = cursor.fetchone()
+    # PostgreSQL reports -1 for tables that were never analyzed
+    return max(row[0] or 0, 0) if row else 0
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that never runs a full ``COUNT(*)``.
+
+    Up to ``ADMIN_COUNT_LIMIT`` matching rows are counted exactly (the count
+    stops at the limit). Larger unfiltered lists use the table's row estimate;
+    larger filtered lists report the limit, and later pages are still
+    reachable by page number.
+    """
+
+    @cached_property
+    def count(self):
+        limit = settings.ADMIN_COUNT_LIMIT
+        queryset = self.object_list
+        bounded = queryset.order_by()[:limit + 1].count()
+        if bounded <= limit:
+            return bounded
+        if queryset.query.where:
+            return limit
+        return max(estimated_row_count(queryset.model, queryset.db), bounded)
+
+
+class UserAutocompleteFilter(admin.SimpleListFilter):
+    """
+    Filter by user, picked with the admin's autocomplete widget.
+
+    Unlike ``list_filter = ['user']`` it never lists every user: only the
+    selected one is loaded. Uses the same ``user__id__exact`` parameter, so
+    existing links keep working.
+    """
+    title = 'user'
+    parameter_name = 'user__id__exact'
+    template = 'admin/restaurant/booking/user_filter.html'
+
+    def lookups(self, request, model_admin):
+        value = self.value()
+        if not value or not value.isdigit():
+            return []
+        return list(User.objects.filter(pk=value).values_list('pk', 'username'))
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(user_id=self.value())
+        return queryset
+
+
+class PartySizeFilter(admin.SimpleListFilter):
+    """Fixed party-size ranges; filtering by each distinct value would scan the table to list them."""
+    title = 'party size'
+    parameter_name = 'party_size'
+    ranges = {'1-2': (1, 2), '3-4': (3, 4), '5-8': (5, 8), '9+': (9, None)}
+
+    def lookups(self, request, model_admin):
+        return [(key, f'{key} guests') for key in self.ranges]
+
+    def queryset(self, request, queryset):
+        if self.value() not in self.ranges:
+            return queryset
+        low, high = self.ranges[self.value()]
+        queryset = queryset.filter(no_of_guests__gte=low)
+        return queryset.filter(no_of_guests__lte=high) if high else queryset
+
+
 @admin.register(models.Booking)
 class BookingAdmin(admin.ModelAdmin):
+    """
+    Booking admin that stays usable with millions of rows.
+
+    The user filter and form field use autocomplete instead of listing every
+    user, counts are bounded (``EstimatedCountPaginator``), search only uses
+    indexed lookups and the date hierarchy probes the ``(booking_date, id)``
+    index (``templatetags/booking_admin.py``).
+    """
     list_display = ['id', 'user', 'name', 'no_of_guests', 'booking_date', 'formatted_date']
-    list_filter = ['user', 'booking_date', 'no_of_guests']
-    search_fields = ['name', 'user__username', 'user__email']
+    list_filter = [UserAutocompleteFilter, 'booking_date', PartySizeFilter]
+    list_select_related = ['user']
+    search_fields = ['=id', '^name', '=user__username', '=user__email']
+    search_help_text = 'Booking id, start of the booking name, or the exact username or email of its user'
+    autocomplete_fields = ['user']
     readonly_fields = ['id', 'formatted_date']
     date_hierarchy = 'booking_date'
     ordering = ['-booking_date']
     list_per_page = 25
-    
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ['export_csv', 'export_ndjson']
+
     fieldsets = (
         ('Booking Information', {
             'fields': ('id', 'user', 'name', 'no_of_guests', 'booking_date', 'formatted_date')
         }),
     )
-    
+
+    @property
+    def media(self):
+        # The user filter's autocomplete select
+        user_select = AutocompleteSelect(models.Booking._meta.get_field('user'), self.admin_site)
+        return super().media + user_select.media + forms.Media(js=['restaurant/js/admin_user_filter.js'])
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Match ids, name prefixes and exact user names or emails.
+
+        Django's default ``icontains`` search cannot use an index, and
+        neither can an OR across the user join. Each branch is an indexed
+        lookup on bookings alone (matching users are resolved first) and
+        the branches are combined with a UNION of ids.
+        """
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        user_ids = list(
+            User.objects.filter(username=term).values_list('pk', flat=True).union(
+                # auth_user_email_lower_idx, created by migration 0011
+                User.objects.alias(email_lower=Lower('email')).filter(email_lower=term.lower())
+                .values_list('pk', flat=True)
+            )
+        )
+        bookings = models.Booking.objects.values('pk')
+        branches = [filter_prefix(bookings, F('name'), term)]
+        if user_ids:
+            branches.append(bookings.filter(user_id__in=user_ids))
+        if term.isdigit() and int(term) <= models.MAX_INTEGER:
+            branches.append(bookings.filter(pk=term))
+        return queryset.filter(pk__in=branches[0].union(*branches[1:])), False
+
     def formatted_date(self, obj):
         """Display formatted booking date"""
         if obj.booking_date:
             return obj.booking_date.strftime('%Y-%m-%d %H:%M')
         return '-'
-    formatted_date.short_description = 'Formatted Date'
\ No newline at end of file
+    formatted_date.short_description = 'Formatted Date'
+
+    @admin.action(description='Export selected bookings as CSV')
+    def export_csv(self, request, queryset):
+        return export.streaming_response(queryset, 'csv')
+
+    @admin.action(description='Export selected bookings as NDJSON')
+    def export_ndjson(self, request, queryset):
+        return export.streaming_response(queryset, 'ndjson')
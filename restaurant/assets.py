@@ -0,0 +1,100 @@
+"""
+Build-time static asset processing, see the ``build_assets`` command.
+
+Photos under ``static/img`` are resized into a few smaller JPEG variants in
+``static/img/variants`` (generated, not committed). ``variants.json`` records
+each source image's size and variant widths for the ``responsive_img``
+template tag. Resizing needs Pillow; everything else only the standard
+library.
+"""
+import functools
+import gzip
+import json
+import os
+import shutil
+from pathlib import Path
+
+from django.conf import settings
+
+STATIC_DIR = Path(__file__).resolve().parent / 'static'
+VARIANTS_DIR = STATIC_DIR / 'img' / 'variants'
+VARIANTS_MANIFEST = VARIANTS_DIR / 'variants.json'
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg')
+
+
+def variant_name(name, width):
+    """Static path of the ``width`` pixels wide variant of static file ``name``."""
+    stem, extension = os.path.splitext(os.path.relpath(name, 'img'))
+    return f'img/variants/{stem}-{width}w{extension}'
+
+
+def build_image_variants(widths, quality):
+    """
+    Write resized copies of every photo in ``static/img`` and the manifest.
+
+    Only widths smaller than the original are produced. Returns the manifest,
+    ``{name: {"width": w, "height": h, "variants": [widths]}}``.
+    """
+    from PIL import Image, ImageOps
+
+    if VARIANTS_DIR.exists():
+        shutil.rmtree(VARIANTS_DIR)
+    manifest = {}
+    for path in sorted((STATIC_DIR / 'img').rglob('*')):
+        if path.suffix.lower() not in IMAGE_EXTENSIONS or VARIANTS_DIR in path.parents:
+            continue
+        name = path.relative_to(STATIC_DIR).as_posix()
+        with Image.open(path) as image:
+            image = ImageOps.exif_transpose(image).convert('RGB')
+            made = []
+            for width in sorted(widths):
+                if width >= image.width:
+                    continue
+                height = round(image.height * width / image.width)
+                target = VARIANTS_DIR / Path(variant_name(name, width)).relative_to('img/variants')
+                target.parent.mkdir(parents=True, exist_ok=True)
+                image.resize((width, height), Image.LANCZOS).save(
+                    target, 'JPEG', quality=quality, optimize=True, progressive=True
+                )
+                made.append(width)
+            manifest[name] = {'width': image.width, 'height': image.height, 'variants': made}
+    VARIANTS_DIR.mkdir(parents=True, exist_ok=True)
+    VARIANTS_MANIFEST.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    load_variants.cache_clear()
+    return manifest
+
+
+@functools.lru_cache(maxsize=None)
+def load_variants():
+    """The variants manifest, or ``{}`` if ``build_assets`` has not run."""
+    try:
+        return json.loads(VARIANTS_MANIFEST.read_text())
+    except FileNotFoundError:
+        return {}
+
+
+def compress_static(root=None, extensions=None, min_size=None):
+    """
+    Write a gzipped ``.gz`` copy next to each compressible file under ``root``.
+
+    Copies that would not be smaller are skipped. Returns ``(files, bytes
+    saved)``.
+    """
+    root = Path(root or settings.STATIC_ROOT)
+    extensions = extensions or settings.STATIC_COMPRESS_EXTENSIONS
+    min_size = settings.STATIC_COMPRESS_MIN_SIZE if min_size is None else min_size
+    files = saved = 0
+    for path in root.rglob('*'):
+        if path.suffix not in extensions or not path.is_file():
+            continue
+        data = path.read_bytes()
+        if len(data) < min_size:
+            continue
+        # mtime=0 keeps the output identical between builds
+        compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        if len(compressed) >= len(data):
+            continue
+        path.with_name(path.name + '.gz').write_bytes(compressed)
+        files += 1
+        saved += len(data) - len(compressed)
+    return files, saved
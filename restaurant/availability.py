@@ -0,0 +1,150 @@
+"""
+Table capacity per booking time slot.
+
+Bookings fall into fixed-length slots of ``BOOKING_SLOT_MINUTES`` that seat at
+most ``BOOKING_SLOT_CAPACITY`` guests ("covers"). ``SlotOccupancy`` holds the
+number of covers already booked in each slot. It is kept up to date
+incrementally as bookings are created, moved and deleted (see ``signals.py``),
+so availability is read from a few precomputed rows instead of aggregating
+bookings.
+
+Covers are only ever added with a conditional ``UPDATE ... WHERE covers <=
+capacity - n``, which makes the capacity check and the increment a single
+atomic statement: two concurrent bookings can never both take the last seats.
+"""
+import datetime
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Booking, SlotOccupancy
+
+
+class SlotFull(Exception):
+    def __init__(self, slot):
+        self.slot = slot
+        super().__init__(
+            f'Not enough tables left at {timezone.localtime(slot).strftime("%Y-%m-%d %H:%M")}.'
+        )
+
+
+def slot_start(value, tz=None):
+    """Return the start of the slot containing the aware datetime ``value``.
+
+    ``tz`` defaults to the current time zone; pass it when converting many
+    values to look it up only once.
+    """
+    local = timezone.localtime(value, tz)
+    minutes = local.hour * 60 + local.minute
+    minutes -= minutes % settings.BOOKING_SLOT_MINUTES
+    return local.replace(hour=minutes // 60, minute=minutes % 60, second=0, microsecond=0)
+
+
+def reserve(slot, covers):
+    """Add ``covers`` to ``slot`` or raise ``SlotFull`` if it would exceed capacity."""
+    if covers <= 0:
+        # Reserving no or negative covers would free seats others could overbook
+        raise ValueError(f'Covers to reserve must be positive, got {covers}')
+    capacity = settings.BOOKING_SLOT_CAPACITY
+    if covers > capacity:
+        raise SlotFull(slot)
+    SlotOccupancy.objects.get_or_create(slot_start=slot)
+    updated = SlotOccupancy.objects.filter(
+        slot_start=slot, covers__lte=capacity - covers
+    ).update(covers=F('covers') + covers)
+    if not updated:
+        raise SlotFull(slot)
+
+
+def release(slot, covers):
+    SlotOccupancy.objects.filter(slot_start=slot).update(covers=F('covers') - covers)
+
+
+def move(old_slot, old_covers, new_slot, new_covers):
+    """Move a booking's covers, reserving the new seats before freeing the old."""
+    if old_slot == new_slot:
+        delta = new_covers - old_covers
+        if delta > 0:
+            reserve(new_slot, delta)
+        elif delta < 0:
+            release(new_slot, -delta)
+    else:
+        reserve(new_slot, new_covers)
+        release(old_slot, old_covers)
+
+
+def check(booking):
+    """Raise ``SlotFull`` if saving ``booking`` would exceed its slot's capacity.
+
+    Advisory only: use it for form validation; ``reserve`` is the binding check.
+    """
+    slot = slot_start(booking.booking_date)
+    needed = booking.no_of_guests
+    if not booking._state.adding:
+        previous = Booking.objects.filter(pk=booking.pk).values_list('booking_date', 'no_of_guests').first()
+        if previous and slot_start(previous[0]) == slot:
+            needed -= previous[1]
+    booked = SlotOccupancy.objects.filter(slot_start=slot).values_list('covers', flat=True).first() or 0
+    if needed > 0 and booked + needed > settings.BOOKING_SLOT_CAPACITY:
+        raise SlotFull(slot)
+
+
+def day_slots(day):
+    """Return the slot start times within opening hours on ``day``."""
+    opens, closes = settings.BOOKING_OPENING_HOURS
+    start = timezone.make_aware(datetime.datetime.combine(day, datetime.time(opens)))
+    step = datetime.timedelta(minutes=settings.BOOKING_SLOT_MINUTES)
+    count = (closes - opens) * 60 // settings.BOOKING_SLOT_MINUTES
+    return [start + step * i for i in range(count)]
+
+
+def open_slots(first_day, last_day):
+    """
+    Return the slots with free capacity between two dates (inclusive).
+
+    Reads only the ``SlotOccupancy`` rows in the range; slots without a row
+    have no bookings yet.
+    """
+    slots = []
+    day = first_day
+    while day <= last_day:
+        slots.extend(day_slots(day))
+        day += datetime.timedelta(days=1)
+    if not slots:
+        return []
+
+    booked = dict(
+        SlotOccupancy.objects.filter(slot_start__gte=slots[0], slot_start__lte=slots[-1])
+        .values_list('slot_start', 'covers')
+    )
+    capacity = settings.BOOKING_SLOT_CAPACITY
+    result = []
+    for slot in slots:
+        covers = booked.get(slot, 0)
+        if covers < capacity:
+            result.append({'slot_start': slot, 'capacity': capacity, 'booked': covers, 'available': capacity - covers})
+    return result
+
+
+def rebuild(chunk_size=5000):
+    """
+    Recompute every slot's occupancy from the bookings table.
+
+    Needed after writes that bypass model signals, such as ``bulk_create`` or
+    queryset ``update()`` on bookings.
+    """
+    counts = Counter()
+    tz = timezone.get_current_timezone()
+    bookings = Booking.objects.values_list('booking_date', 'no_of_guests').iterator(chunk_size=chunk_size)
+    for booking_date, guests in bookings:
+        counts[slot_start(booking_date, tz)] += guests
+    with transaction.atomic():
+        SlotOccupancy.objects.all().delete()
+        SlotOccupancy.objects.bulk_create(
+            [SlotOccupancy(slot_start=slot, covers=covers) for slot, covers in counts.items()],
+            batch_size=chunk_size,
+        )
+    return len(counts)
@@ -0,0 +1,77 @@
+"""
+Streaming export of bookings as CSV or NDJSON.
+
+Rows are read as tuples straight from the database and written out one at a
+time, so memory use does not grow with the size of the export. Filtering is
+left to the caller's queryset, i.e. done in SQL.
+
+``QuerySet.iterator()`` uses a server-side cursor on PostgreSQL and streams
+from the cursor on SQLite. MySQLdb, however, buffers the whole result set on
+the client, so on MySQL the export walks the primary key in chunks instead.
+"""
+import csv
+import json
+
+from django.conf import settings
+from django.db import connections
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+COLUMNS = ('id', 'user_id', 'username', 'name', 'no_of_guests', 'booking_date')
+_VALUES = ('id', 'user_id', 'user__username', 'name', 'no_of_guests', 'booking_date')
+
+
+def iter_rows(queryset, chunk_size=None):
+    """Yield ``COLUMNS`` tuples for the bookings in ``queryset``, ordered by id."""
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    queryset = queryset.order_by('id').values_list(*_VALUES)
+    if connections[queryset.db].vendor != 'mysql':
+        yield from queryset.iterator(chunk_size=chunk_size)
+        return
+    last_id = 0
+    while True:
+        chunk = list(queryset.filter(id__gt=last_id)[:chunk_size])
+        yield from chunk
+        if len(chunk) < chunk_size:
+            return
+        last_id = chunk[-1][0]
+
+
+def _localized(rows):
+    tz = timezone.get_current_timezone()
+    for row in rows:
+        yield row[:-1] + (timezone.localtime(row[-1], tz).isoformat(),)
+
+
+class _Echo:
+    """File-like object whose ``write`` returns the line instead of buffering it."""
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(COLUMNS)
+    for row in _localized(rows):
+        yield writer.writerow(row)
+
+
+def ndjson_lines(rows):
+    for row in _localized(rows):
+        yield json.dumps(dict(zip(COLUMNS, row)), ensure_ascii=False) + '\n'
+
+
+FORMATS = {
+    'csv': (csv_lines, 'text/csv; charset=utf-8'),
+    'ndjson': (ndjson_lines, 'application/x-ndjson'),
+}
+
+
+def streaming_response(queryset, fmt, filename='bookings'):
+    """Return a ``StreamingHttpResponse`` writing ``queryset`` in format ``fmt``."""
+    lines, content_type = FORMATS[fmt]
+    return StreamingHttpResponse(
+        lines(iter_rows(queryset)),
+        content_type=content_type,
+        headers={'Content-Disposition': f'attachment; filename="{filename}.{fmt}"'},
+    )
@@ -0,0 +1,53 @@
+"""
+Database functions for index-served prefix matching.
+
+``LIKE 'prefix%'`` cannot always use an index (MySQL compiles ``startswith``
+to ``LIKE BINARY``, which skips functional indexes, and SQLite only uses an
+index for ``LIKE`` under special settings), while a range on the indexed
+expression always can. A range is only correct in an order where every
+string starting with the prefix sorts between the prefix and the prefix
+with its last character incremented: code point order. ``ByteOrder`` puts
+an expression in that order, and the index must be built on the same
+expression, see ``filter_prefix``.
+"""
+from django.db.models import Func
+
+# Code points that cannot be stored: the next character after 0xd7ff is 0xe000
+SURROGATES = range(0xd800, 0xe000)
+MAX_CODE_POINT = 0x10ffff
+
+
+class ByteOrder(Func):
+    """``expression`` compared in code point order, whatever its column's collation."""
+
+    template = '%(expressions)s'
+    arity = 1
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template='%(expressions)s COLLATE utf8mb4_bin', **extra_context)
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        # UTF-8 bytes sort in code point order
+        return self.as_sql(compiler, connection, template='%(expressions)s COLLATE "C"', **extra_context)
+
+
+def prefix_bounds(prefix):
+    """
+    Return ``(low, high)``: in code point order, the strings starting with
+    ``prefix`` are exactly those ``>= low`` and ``< high``. ``high`` is None
+    when nothing sorts after them.
+    """
+    stem = prefix.rstrip(chr(MAX_CODE_POINT))
+    if not stem:
+        return prefix, None
+    following = ord(stem[-1]) + 1
+    if following in SURROGATES:
+        following = SURROGATES.stop
+    return prefix, stem[:-1] + chr(following)
+
+
+def filter_prefix(queryset, expression, prefix):
+    """Filter ``queryset`` to rows whose ``ByteOrder(expression)`` starts with ``prefix``."""
+    low, high = prefix_bounds(prefix)
+    queryset = queryset.alias(prefix_key=ByteOrder(expression)).filter(prefix_key__gte=low)
+    return queryset if high is None else queryset.filter(prefix_key__lt=high)
@@ -0,0 +1,64 @@
+"""
+Django management command to build optimized static assets for deployment.
+
+Usage:
+    python manage.py build_assets
+    python manage.py build_assets --widths 400,800,1200 --quality 75
+    python manage.py build_assets --skip-images
+
+Steps:
+    1. Resize the photos in restaurant/static/img into responsive variants
+       (needs Pillow: pip install Pillow)
+    2. collectstatic into STATIC_ROOT with content-hashed names and a manifest
+    3. Write pre-compressed .gz copies of CSS and other text assets
+"""
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from restaurant import assets
+
+
+def width_list(value):
+    try:
+        widths = sorted({int(part) for part in value.split(',') if part})
+    except ValueError:
+        raise CommandError(f'Expected a comma-separated list of widths, got "{value}"')
+    if not widths or widths[0] < 1:
+        raise CommandError(f'Expected positive widths, got "{value}"')
+    return widths
+
+
+class Command(BaseCommand):
+    help = 'Builds responsive image variants, hashed static files and pre-compressed copies'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--widths',
+            type=width_list,
+            default=None,
+            help='Comma-separated variant widths in pixels (default IMAGE_VARIANT_WIDTHS)',
+        )
+        parser.add_argument(
+            '--quality', type=int, default=None, help='JPEG quality of variants (default IMAGE_VARIANT_QUALITY)'
+        )
+        parser.add_argument('--skip-images', action='store_true', help='Keep the existing image variants')
+
+    def handle(self, *args, **options):
+        if not options['skip_images']:
+            try:
+                import PIL  # noqa: F401
+            except ImportError:
+                raise CommandError('Resizing images needs Pillow (pip install Pillow), or pass --skip-images')
+            widths = options['widths'] or settings.IMAGE_VARIANT_WIDTHS
+            quality = options['quality'] or settings.IMAGE_VARIANT_QUALITY
+            manifest = assets.build_image_variants(widths, quality)
+            variants = sum(len(entry['variants']) for entry in manifest.values())
+            self.stdout.write(f'Wrote {variants} variant(s) of {len(manifest)} image(s).')
+
+        call_command('collectstatic', interactive=False, verbosity=0)
+        self.stdout.write(f'Collected static files into {settings.STATIC_ROOT}.')
+
+        files, saved = assets.compress_static()
+        self.stdout.write(f'Pre-compressed {files} file(s), saving {saved / 1024:.0f} KiB.')
+        self.stdout.write(self.style.SUCCESS('Static assets built.'))
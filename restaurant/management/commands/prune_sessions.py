@@ -0,0 +1,44 @@
+"""
+Django management command to delete expired database sessions in batches.
+
+Usage:
+    python manage.py prune_sessions
+    python manage.py prune_sessions --batch-size 5000 --pause 0.1
+
+Unlike ``clearsessions``, which deletes every expired row in one statement,
+this deletes a batch at a time so the table is never locked for long. Run it
+periodically (e.g. from cron) when SESSION_STORE is "db" or "cached_db", or
+once after switching to another store to drop the leftover rows.
+"""
+
+import time
+
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = 'Deletes expired rows from the django_session table in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per DELETE (default 1000)')
+        parser.add_argument('--pause', type=float, default=0, help='Seconds to sleep between batches (default 0)')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be positive')
+
+        now = timezone.now()
+        expired = Session.objects.filter(expire_date__lt=now)
+        total = 0
+        while True:
+            # Served by the expire_date index; deleting by primary key keeps each statement small
+            keys = list(expired.values_list('session_key', flat=True)[:batch_size])
+            if not keys:
+                break
+            total += Session.objects.filter(session_key__in=keys).delete()[0]
+            if options['pause']:
+                time.sleep(options['pause'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {total} expired session(s).'))
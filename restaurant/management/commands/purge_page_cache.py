@@ -0,0 +1,38 @@
+"""
+Django management command to empty the full-page cache.
+
+Usage:
+    python manage.py purge_page_cache
+    python manage.py purge_page_cache --path /restaurant/about/
+
+Purged pages are rendered again on their next request. Run it after changing
+a cached page's template without a deploy, or use warm_page_cache, which
+purges first. It needs a shared cache (REDIS_URL): with the default
+local-memory cache every server process keeps its own pages, out of reach of
+this command, so it fails instead.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from LittleLemonAPI import cache as api_cache
+from littlelemon import pagecache
+
+
+class Command(BaseCommand):
+    help = 'Drops every page, or the given pages, from the full-page cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', action='append', help='Purge only this path (repeatable; default all pages)')
+
+    def handle(self, *args, **options):
+        if api_cache.is_process_local():
+            raise CommandError(
+                'The page cache is in local memory, so the server processes\' pages are out of reach. '
+                'Restart them to purge, or set REDIS_URL to share the cache.'
+            )
+        paths = options['path']
+        unknown = [path for path in paths or () if path not in settings.PAGE_CACHE['PATHS']]
+        if unknown:
+            raise CommandError(f'Not in PAGE_CACHE["PATHS"]: {", ".join(unknown)}')
+        pagecache.purge(paths)
+        self.stdout.write(self.style.SUCCESS(f'Purged {len(paths) if paths else "all"} cached page(s).'))
@@ -0,0 +1,20 @@
+"""
+Django management command to recompute booked covers per slot from bookings.
+
+Usage:
+    python manage.py rebuild_availability
+
+Run it after writes that bypass model signals (bulk imports, raw SQL), or to
+repair the counts after changing BOOKING_SLOT_MINUTES.
+"""
+
+from django.core.management.base import BaseCommand
+from restaurant import availability
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the per-slot occupancy counts used for booking availability'
+
+    def handle(self, *args, **options):
+        slots = availability.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt occupancy for {slots} slot(s).'))
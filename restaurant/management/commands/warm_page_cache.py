@@ -0,0 +1,46 @@
+"""
+Django management command to fill the full-page cache.
+
+Usage:
+    python manage.py warm_page_cache
+    python manage.py warm_page_cache --host littlelemon.vercel.app
+
+Purges the page cache, then renders every page in PAGE_CACHE['PATHS'] through
+the full middleware stack, so the first visitor after a deploy already gets a
+cached page. Run it on deploy, after build_assets. Other processes only see
+the result through a shared cache (REDIS_URL); with the default local-memory
+cache each process renders its pages once.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from LittleLemonAPI import cache as api_cache
+from littlelemon import pagecache
+
+
+def default_host():
+    return next((host for host in settings.ALLOWED_HOSTS if host != '*' and not host.startswith('.')), 'localhost')
+
+
+class Command(BaseCommand):
+    help = 'Purges the full-page cache and renders every cached page into it'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', help='Host header of the requests (default the first plain ALLOWED_HOSTS entry)')
+
+    def handle(self, *args, **options):
+        if api_cache.is_process_local():
+            self.stderr.write(
+                'The page cache is in local memory: only this process is warmed. Set REDIS_URL to share it.'
+            )
+
+        failed = []
+        for path, response in pagecache.warm(options['host'] or default_host()).items():
+            cached = response.get('X-Page-Cache') == 'miss'
+            self.stdout.write(f'{path:<30}{response.status_code:>5}{len(response.content):>9} bytes  '
+                              f'{"cached" if cached else "NOT cached"}')
+            if not cached:
+                failed.append(path)
+        if failed:
+            raise CommandError(f'Could not cache {", ".join(failed)}: not a 200, or the page sets or varies on cookies')
+        self.stdout.write(self.style.SUCCESS(f'Warmed {len(settings.PAGE_CACHE["PATHS"])} page(s).'))
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0004_rename_menuitem_menu'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['user', 'booking_date', 'id'], name='booking_user_date_id_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:29
+
+from collections import Counter
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_occupancy(apps, schema_editor):
+    Booking = apps.get_model('restaurant', 'Booking')
+    SlotOccupancy = apps.get_model('restaurant', 'SlotOccupancy')
+    counts = Counter()
+    for booking_date, guests in Booking.objects.values_list('booking_date', 'no_of_guests').iterator():
+        local = timezone.localtime(booking_date)
+        minutes = local.hour * 60 + local.minute
+        minutes -= minutes % settings.BOOKING_SLOT_MINUTES
+        counts[local.replace(hour=minutes // 60, minute=minutes % 60, second=0, microsecond=0)] += guests
+    SlotOccupancy.objects.bulk_create(
+        [SlotOccupancy(slot_start=slot, covers=covers) for slot, covers in counts.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0005_booking_user_date_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotOccupancy',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('slot_start', models.DateTimeField(unique=True)),
+                ('covers', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(backfill_occupancy, migrations.RunPython.noop),
+    ]
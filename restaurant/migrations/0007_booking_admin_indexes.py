@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0006_slotoccupancy'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='booking',
+            name='name',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['booking_date', 'id'], name='booking_date_id_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:49
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0007_booking_admin_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='menu',
+            index=models.Index(django.db.models.functions.text.Lower('title'), name='menu_title_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='menu',
+            index=models.Index(fields=['price'], name='menu_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='menu',
+            index=models.Index(fields=['inventory'], name='menu_inventory_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:02
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0008_menu_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='booking',
+            name='no_of_guests',
+            field=models.IntegerField(validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=models.CheckConstraint(check=models.Q(('no_of_guests__gte', 1)), name='booking_guests_positive'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:31
+
+from django.db import migrations, models
+import django.db.models.functions.text
+import restaurant.functions
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0009_booking_guests_positive'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='menu',
+            name='menu_title_lower_idx',
+        ),
+        migrations.AddIndex(
+            model_name='menu',
+            index=models.Index(restaurant.functions.ByteOrder(django.db.models.functions.text.Lower('title')), name='menu_title_lower_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:33
+
+from django.db import migrations, models
+import django.db.models.functions.text
+import restaurant.functions
+
+# auth_user belongs to django.contrib.auth, so the index the admin's email
+# search needs is created here, outside the migration state
+USER_EMAIL_INDEX = models.Index(django.db.models.functions.text.Lower('email'), name='auth_user_email_lower_idx')
+
+
+def add_user_email_index(apps, schema_editor):
+    schema_editor.add_index(apps.get_model('auth', 'User'), USER_EMAIL_INDEX)
+
+
+def remove_user_email_index(apps, schema_editor):
+    schema_editor.remove_index(apps.get_model('auth', 'User'), USER_EMAIL_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('restaurant', '0010_menu_title_byte_order_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='booking',
+            name='name',
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(restaurant.functions.ByteOrder('name'), name='booking_name_idx'),
+        ),
+        migrations.RunPython(add_user_email_index, remove_user_email_index),
+    ]
@@ -1,11 +1,27 @@
+from django.core.exceptions import ValidationError
+from django.core.validators import MinValueValidator
 from django.db import models
+from django.db.models.functions import Lower
 from django.contrib.auth.models import User
+from .functions import ByteOrder
+
+# Largest value of an IntegerField or AutoField column on every backend
+MAX_INTEGER = 2 ** 31 - 1
 
 class Menu(models.Model):
     id = models.AutoField(primary_key=True)
     title = models.CharField(max_length=255)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     inventory = models.IntegerField()
+
+    class Meta:
+        indexes = [
+            # Serve the menu list's filters, see LittleLemonAPI.filters.filter_menu
+            models.Index(ByteOrder(Lower('title')), name='menu_title_lower_idx'),
+            models.Index(fields=['price'], name='menu_price_idx'),
+            models.Index(fields=['inventory'], name='menu_inventory_idx'),
+        ]
+
     def __str__(self):
         return f'{self.title} (${self.price})'
 
@@ -13,7 +29,40 @@ class Booking(models.Model):
     id = models.AutoField(primary_key=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='bookings')
     name = models.CharField(max_length=255)
-    no_of_guests = models.IntegerField()
+    no_of_guests = models.IntegerField(validators=[MinValueValidator(1)])
     booking_date = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            # Serves the per-user booking list: filter by user, keyset-paginate by date
+            models.Index(fields=['user', 'booking_date', 'id'], name='booking_user_date_id_idx'),
+            # Serves date ordering and ranges across all users (staff lists, the admin)
+            models.Index(fields=['booking_date', 'id'], name='booking_date_id_idx'),
+            # Serves the admin's name prefix search, see restaurant.functions
+            models.Index(ByteOrder('name'), name='booking_name_idx'),
+        ]
+        constraints = [
+            # A booking of no guests would give covers back to its slot
+            models.CheckConstraint(check=models.Q(no_of_guests__gte=1), name='booking_guests_positive'),
+        ]
+
+    def __str__(self):
+        return f'Booking for {self.name} on {self.booking_date.strftime("%Y-%m-%d %H:%M")} for {self.no_of_guests} guest(s)'
+
+    def clean(self):
+        # Friendly capacity check for forms (e.g. the admin). The binding,
+        # race-free check happens when the booking is saved.
+        from . import availability
+        if self.booking_date and self.no_of_guests:
+            try:
+                availability.check(self)
+            except availability.SlotFull as exc:
+                raise ValidationError({'booking_date': str(exc)})
+
+class SlotOccupancy(models.Model):
+    """Running total of booked covers per booking slot, see ``availability``."""
+    id = models.AutoField(primary_key=True)
+    slot_start = models.DateTimeField(unique=True)
+    covers = models.IntegerField(default=0)
     def __str__(self):
-        return f'Booking for {self.name} on {self.booking_date.strftime("%Y-%m-%d %H:%M")} for {self.no_of_guests} guest(s)'
\ No newline at end of file
+        return f'{self.slot_start.strftime("%Y-%m-%d %H:%M")}: {self.covers} cover(s)'
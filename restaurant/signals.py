@@ -0,0 +1,27 @@
+from django.db.models.signals import post_delete, pre_save
+from django.dispatch import receiver
+from .models import Booking
+from . import availability
+
+
+@receiver(pre_save, sender=Booking)
+def reserve_booking_covers(sender, instance, raw, **kwargs):
+    # Runs before the row is written so a full slot aborts the save; callers
+    # should save inside a transaction so a failed insert rolls this back too.
+    if raw:
+        return
+    new_slot = availability.slot_start(instance.booking_date)
+    previous = None
+    if not instance._state.adding:
+        previous = Booking.objects.filter(pk=instance.pk).values_list('booking_date', 'no_of_guests').first()
+    if previous is None:
+        availability.reserve(new_slot, instance.no_of_guests)
+    else:
+        availability.move(
+            availability.slot_start(previous[0]), previous[1], new_slot, instance.no_of_guests
+        )
+
+
+@receiver(post_delete, sender=Booking)
+def release_booking_covers(sender, instance, **kwargs):
+    availability.release(availability.slot_start(instance.booking_date), instance.no_of_guests)
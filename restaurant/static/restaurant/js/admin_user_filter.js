@@ -0,0 +1,17 @@
+'use strict';
+// Booking admin: reload the change list filtered by the user picked in the
+// sidebar autocomplete (admin/restaurant/booking/user_filter.html).
+{
+    const $ = django.jQuery;
+    $(function() {
+        $('select.booking-user-filter').on('change', function() {
+            if (!this.value) {
+                return;
+            }
+            const params = new URLSearchParams(window.location.search);
+            params.set(this.dataset.parameter, this.value);
+            params.delete('p');
+            window.location.search = params.toString();
+        });
+    });
+}
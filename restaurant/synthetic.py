@@ -0,0 +1,130 @@
+"""
+Seeded synthetic data for load testing.
+
+Generates production-sized menus, users and bookings with batched
+``bulk_create`` calls: one INSERT per batch instead of a query or two per
+row. The same seed always produces the same rows.
+
+``bulk_create`` skips model signals, so callers must refresh anything kept
+up to date by signals afterwards (slot occupancy, API cache versions).
+
+Bookings respect ``BOOKING_SLOT_CAPACITY``: they are spread over enough days
+to fill slots to ``TARGET_FILL`` on average, and never overfill one, so a
+load test's new bookings mostly find room rather than hitting full slots.
+"""
+import datetime
+import itertools
+import math
+from collections import Counter
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from .models import Menu, Booking
+
+ADJECTIVES = [
+    'Grilled', 'Roasted', 'Lemon', 'Spiced', 'Crispy', 'Smoked', 'Herbed', 'Stuffed',
+    'Braised', 'Marinated', 'Garlic', 'Honey', 'Charred', 'Seasonal', 'Classic', 'Rustic',
+]
+DISHES = [
+    'Greek Salad', 'Bruschetta', 'Fish', 'Pasta', 'Lamb Kebab', 'Moussaka', 'Baklava',
+    'Souvlaki', 'Spanakopita', 'Risotto', 'Tiramisu', 'Halloumi', 'Falafel', 'Octopus',
+    'Dolmades', 'Flatbread', 'Shakshuka', 'Kofta', 'Calamari', 'Gelato',
+]
+# Average share of a slot's capacity taken by generated bookings
+TARGET_FILL = 0.5
+MAX_GUESTS = 8
+
+GUEST_NAMES = [
+    'Adrian', 'Mario', 'Tilly', 'Sofia', 'Yusuf', 'Elena', 'Marco', 'Leila', 'Nikos', 'Aylin',
+    'Giulia', 'Omar', 'Daphne', 'Kerem', 'Rosa', 'Petros', 'Ines', 'Luca', 'Selin', 'Theo',
+]
+
+
+def insert_batches(model, objects, total, batch_size, progress=None, **kwargs):
+    """``bulk_create`` ``objects`` (any iterable) ``batch_size`` rows at a time."""
+    done = 0
+    objects = iter(objects)
+    while True:
+        batch = list(itertools.islice(objects, batch_size))
+        if not batch:
+            break
+        model.objects.bulk_create(batch, batch_size=batch_size, **kwargs)
+        done += len(batch)
+        if progress:
+            progress(model._meta.verbose_name_plural, done, total)
+    return done
+
+
+def generate_menu(count, rng, batch_size, progress=None):
+    def items():
+        for i in range(count):
+            title = f'{rng.choice(ADJECTIVES)} {rng.choice(DISHES)} #{i + 1}'
+            price = Decimal(rng.randrange(399, 3999)) / 100
+            yield Menu(title=title, price=price, inventory=rng.randrange(0, 200))
+
+    return insert_batches(Menu, items(), count, batch_size, progress)
+
+
+def generate_users(count, rng, batch_size, prefix, progress=None):
+    """Create ``count`` users named ``<prefix><n>``; existing names are skipped."""
+    # Hashing is deliberately slow, so every synthetic user shares one
+    # unusable password hash
+    password = make_password(None)
+
+    def users():
+        for i in range(count):
+            username = f'{prefix}{i:07d}'
+            yield User(username=username, email=f'{username}@example.com', password=password)
+
+    insert_batches(User, users(), count, batch_size, progress, ignore_conflicts=True)
+    return list(User.objects.filter(username__startswith=prefix).values_list('id', flat=True))
+
+
+def slots_per_day():
+    opens, closes = settings.BOOKING_OPENING_HOURS
+    return (closes - opens) * 60 // settings.BOOKING_SLOT_MINUTES
+
+
+def booking_days(count, days):
+    """The days ``count`` bookings are spread over: ``days``, or more if slots would fill beyond ``TARGET_FILL``."""
+    max_guests = min(MAX_GUESTS, settings.BOOKING_SLOT_CAPACITY)
+    covers = count * (1 + max_guests) / 2
+    return max(days, math.ceil(covers / (settings.BOOKING_SLOT_CAPACITY * TARGET_FILL * slots_per_day())))
+
+
+def generate_bookings(count, user_ids, first_day, days, rng, batch_size, progress=None):
+    """Create ``count`` bookings for ``user_ids`` spread over ``booking_days(count, days)`` days of opening hours."""
+    opens, _ = settings.BOOKING_OPENING_HOURS
+    slot_minutes = settings.BOOKING_SLOT_MINUTES
+    capacity = settings.BOOKING_SLOT_CAPACITY
+    per_day = slots_per_day()
+    days = booking_days(count, days)
+    start = timezone.make_aware(datetime.datetime.combine(first_day, datetime.time(opens)))
+
+    def bookings():
+        covers = Counter()
+        for _ in range(count):
+            guests = rng.randint(1, min(MAX_GUESTS, capacity))
+            # Slots are half full on average, so a free one turns up quickly
+            while True:
+                slot = rng.randrange(days * per_day)
+                if covers[slot] + guests <= capacity:
+                    break
+            covers[slot] += guests
+            day, index = divmod(slot, per_day)
+            booking_date = start + datetime.timedelta(
+                days=day,
+                minutes=index * slot_minutes + rng.choice((0, 15, 30, 45)) % slot_minutes,
+            )
+            yield Booking(
+                user_id=rng.choice(user_ids),
+                name=f'{rng.choice(GUEST_NAMES)} {rng.choice(GUEST_NAMES)}',
+                no_of_guests=guests,
+                booking_date=booking_date,
+            )
+
+    return insert_batches(Booking, bookings(), count, batch_size, progress)
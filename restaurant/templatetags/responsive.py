@@ -0,0 +1,41 @@
+from urllib.parse import quote
+
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from restaurant import assets
+
+register = template.Library()
+
+
+def srcset_url(name):
+    # Whitespace and commas delimit srcset candidates, so they must be escaped
+    return quote(static(name), safe="/:%?#=&@+$!~*'();")
+
+
+@register.simple_tag
+def responsive_img(name, alt='', sizes='100vw', **attrs):
+    """
+    Render an ``<img>`` for static file ``name`` with a ``srcset`` of its
+    ``build_assets`` variants, so browsers download the smallest one that
+    fits. Extra keyword arguments become attributes, e.g. ``loading="lazy"``.
+    Without variants (before a build) this is a plain ``<img>``.
+    """
+    entry = assets.load_variants().get(name)
+    if entry:
+        candidates = [(srcset_url(assets.variant_name(name, width)), width) for width in entry['variants']]
+        candidates.append((srcset_url(name), entry['width']))
+        attrs = {
+            'srcset': ', '.join(f'{url} {width}w' for url, width in candidates),
+            'sizes': sizes,
+            'width': entry['width'],
+            'height': entry['height'],
+            **attrs,
+        }
+    return format_html(
+        '<img src="{}" alt="{}"{}>',
+        static(name),
+        alt,
+        format_html_join('', ' {}="{}"', attrs.items()),
+    )
@@ -0,0 +1,70 @@
+from datetime import datetime
+
+from django.contrib.admin import site
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from restaurant.admin import EstimatedCountPaginator
+from restaurant.models import Booking
+
+CHANGELIST = '/admin/restaurant/booking/'
+
+
+class BookingAdminTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', password='adminpass123')
+        self.guest = User.objects.create_user(username='guest', email='guest@example.com')
+        self.other = User.objects.create_user(username='bystander')
+        self.client.force_login(self.admin)
+        for year, month, user in [(2024, 5, self.guest), (2024, 7, self.guest), (2025, 1, self.other)]:
+            Booking.objects.create(
+                user=user, name=f'Party {year}-{month}', no_of_guests=2,
+                booking_date=timezone.make_aware(datetime(year, month, 3, 19, 0)),
+            )
+
+    def results(self, query=''):
+        response = self.client.get(CHANGELIST + query)
+        self.assertEqual(response.status_code, 200)
+        return response, sorted(booking.name for booking in response.context['cl'].result_list)
+
+    def test_user_filter_loads_only_selected_user(self):
+        response, names = self.results(f'?user__id__exact={self.guest.pk}')
+        self.assertEqual(names, ['Party 2024-5', 'Party 2024-7'])
+        self.assertContains(response, 'booking-user-filter')
+        self.assertNotContains(response, 'bystander')
+
+    def test_search_uses_prefix_and_exact_matches(self):
+        self.assertEqual(self.results('?q=Party 2025')[1], ['Party 2025-1'])
+        self.assertEqual(self.results('?q=GUEST@example.com')[1], ['Party 2024-5', 'Party 2024-7'])
+        self.assertEqual(self.results('?q=arty')[1], [])
+
+    def test_search_only_uses_indexes(self):
+        request = RequestFactory().get(CHANGELIST)
+        request.user = self.admin
+        booking_admin = site._registry[Booking]
+        for term in ('Party 2025', 'guest@example.com', '1'):
+            # One query resolves the matching users, then one reads the bookings
+            with CaptureQueriesContext(connection) as queries:
+                queryset, _ = booking_admin.get_search_results(request, Booking.objects.all(), term)
+            self.assertEqual(len(queries), 1)
+            with connection.cursor() as cursor:
+                cursor.execute(f'{connection.ops.explain_query_prefix()} {queries[0]["sql"]}')
+                self.assertNotIn('SCAN', str(cursor.fetchall()), term)
+            plan = queryset.explain()
+            self.assertNotIn('SCAN restaurant_booking', plan, term)
+            self.assertNotIn('SCAN auth_user', plan, term)
+        self.assertIn('booking_name_idx', plan)
+
+    def test_date_hierarchy_probes_periods(self):
+        response, _ = self.results()
+        self.assertEqual([choice['title'] for choice in response.context['choices']], ['2024', '2025'])
+        response, _ = self.results('?booking_date__year=2024')
+        self.assertEqual([choice['title'] for choice in response.context['choices']], ['May 2024', 'July 2024'])
+
+    @override_settings(ADMIN_COUNT_LIMIT=2)
+    def test_counts_stop_at_limit(self):
+        self.assertEqual(EstimatedCountPaginator(Booking.objects.order_by('id'), 25).count, Booking.objects.last().pk)
+        self.assertEqual(EstimatedCountPaginator(Booking.objects.filter(no_of_guests=2).order_by('id'), 25).count, 2)
+        self.assertEqual(EstimatedCountPaginator(Booking.objects.filter(user=self.other).order_by('id'), 25).count, 1)
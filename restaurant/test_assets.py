@@ -0,0 +1,74 @@
+import gzip
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock, skipUnless
+
+from django.core.management import call_command
+from django.template import Context, Template
+from django.templatetags.static import static
+from django.test import SimpleTestCase, override_settings
+from restaurant import assets
+
+try:
+    import PIL
+except ImportError:
+    PIL = None
+
+
+class BuildAssetsTest(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+
+    def test_collects_hashed_and_compressed_files(self):
+        with override_settings(STATIC_ROOT=self.root):
+            call_command('build_assets', skip_images=True, stdout=StringIO())
+            url = static('css/style.css')
+        self.assertRegex(url, r'css/style\.[0-9a-f]{12}\.css$')
+        hashed = self.root / url.split('/static/', 1)[1]
+        compressed = hashed.with_name(hashed.name + '.gz')
+        self.assertEqual(gzip.decompress(compressed.read_bytes()), hashed.read_bytes())
+        self.assertTrue((self.root / 'staticfiles.json').exists())
+
+    def test_compress_skips_small_files(self):
+        (self.root / 'tiny.css').write_text('a{}')
+        (self.root / 'big.css').write_text('body { color: #333; }\n' * 100)
+        (self.root / 'photo.jpg').write_bytes(b'\0' * 2048)
+        self.assertEqual(assets.compress_static(self.root, ('.css',), 512)[0], 1)
+        self.assertEqual(sorted(path.name for path in self.root.iterdir() if path.suffix == '.gz'), ['big.css.gz'])
+
+    def test_plain_static_names_before_build(self):
+        with override_settings(STATIC_ROOT=self.root):
+            self.assertEqual(static('css/style.css'), '/static/css/style.css')
+
+    @skipUnless(PIL, 'Pillow is not installed')
+    def test_image_variants(self):
+        with mock.patch.object(assets, 'VARIANTS_DIR', self.root / 'variants'), \
+                mock.patch.object(assets, 'VARIANTS_MANIFEST', self.root / 'variants' / 'variants.json'):
+            manifest = assets.build_image_variants([480, 100000], 70)
+        self.addCleanup(assets.load_variants.cache_clear)
+        self.assertEqual(manifest['img/restaurant_inside.jpg']['variants'], [480])
+        self.assertTrue((self.root / 'variants' / 'restaurant_inside-480w.jpg').exists())
+
+
+class ResponsiveImgTagTest(SimpleTestCase):
+    def render(self, source):
+        return Template('{% load responsive %}' + source).render(Context())
+
+    def test_plain_img_without_variants(self):
+        with mock.patch.object(assets, 'load_variants', return_value={}):
+            html = self.render("{% responsive_img 'img/salad.jpg' alt='Salad' %}")
+        self.assertEqual(html, '<img src="/static/img/salad.jpg" alt="Salad">')
+
+    def test_srcset_lists_variants(self):
+        manifest = {'img/Grilled fish.jpg': {'width': 1600, 'height': 1200, 'variants': [480, 960]}}
+        with mock.patch.object(assets, 'load_variants', return_value=manifest):
+            html = self.render("{% responsive_img 'img/Grilled fish.jpg' alt='Fish' sizes='50vw' loading='lazy' %}")
+        self.assertIn(
+            'srcset="/static/img/variants/Grilled%20fish-480w.jpg 480w, '
+            '/static/img/variants/Grilled%20fish-960w.jpg 960w, /static/img/Grilled%20fish.jpg 1600w"',
+            html,
+        )
+        self.assertIn('sizes="50vw" width="1600" height="1200" loading="lazy"', html)
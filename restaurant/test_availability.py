@@ -0,0 +1,88 @@
+from datetime import date, datetime
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from restaurant import availability
+from restaurant.models import Booking, SlotOccupancy
+
+
+@override_settings(BOOKING_SLOT_MINUTES=60, BOOKING_SLOT_CAPACITY=10, BOOKING_OPENING_HOURS=(18, 22))
+class AvailabilityTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpass123")
+        self.slot = timezone.make_aware(datetime(2024, 12, 25, 19, 0))
+
+    def book(self, guests, when=None):
+        return Booking.objects.create(
+            user=self.user,
+            name="Party",
+            no_of_guests=guests,
+            booking_date=when or timezone.make_aware(datetime(2024, 12, 25, 19, 30))
+        )
+
+    def covers(self, slot=None):
+        return SlotOccupancy.objects.get(slot_start=slot or self.slot).covers
+
+    def test_slot_start_floors_to_slot(self):
+        """Test booking times are grouped into their slot"""
+        self.assertEqual(availability.slot_start(timezone.make_aware(datetime(2024, 12, 25, 19, 59))), self.slot)
+
+    def test_create_update_delete_adjust_covers(self):
+        """Test occupancy follows bookings as they are created, changed and deleted"""
+        booking = self.book(4)
+        self.assertEqual(self.covers(), 4)
+        booking.no_of_guests = 6
+        booking.save()
+        self.assertEqual(self.covers(), 6)
+        booking.booking_date = timezone.make_aware(datetime(2024, 12, 25, 20, 15))
+        booking.save()
+        self.assertEqual(self.covers(), 0)
+        self.assertEqual(self.covers(timezone.make_aware(datetime(2024, 12, 25, 20, 0))), 6)
+        booking.delete()
+        self.assertEqual(self.covers(timezone.make_aware(datetime(2024, 12, 25, 20, 0))), 0)
+
+    def test_overbooking_is_rejected(self):
+        """Test a booking that would exceed slot capacity is not saved"""
+        self.book(8)
+        with self.assertRaises(availability.SlotFull):
+            self.book(3)
+        self.assertEqual(Booking.objects.count(), 1)
+        self.assertEqual(self.covers(), 8)
+
+    def test_non_positive_guests_are_rejected(self):
+        """Test zero or negative covers never lower a slot's occupancy"""
+        self.book(8)
+        for guests in (0, -5):
+            with self.assertRaises(ValueError):
+                availability.reserve(self.slot, guests)
+            with self.assertRaises(ValueError):
+                self.book(guests)
+        self.assertEqual(self.covers(), 8)
+        with self.assertRaises(ValidationError):
+            Booking(user=self.user, name="Nobody", no_of_guests=0, booking_date=self.slot).full_clean()
+
+    def test_clean_reports_full_slot(self):
+        """Test model validation (used by admin forms) flags a full slot"""
+        self.book(8)
+        booking = Booking(user=self.user, name="Late", no_of_guests=3, booking_date=self.slot)
+        with self.assertRaises(ValidationError):
+            booking.full_clean()
+
+    def test_open_slots_reads_precomputed_counts(self):
+        """Test open_slots excludes full slots without touching bookings"""
+        self.book(10)
+        self.book(4, timezone.make_aware(datetime(2024, 12, 25, 20, 0)))
+        with self.assertNumQueries(1):
+            slots = availability.open_slots(date(2024, 12, 25), date(2024, 12, 25))
+        self.assertEqual([slot['slot_start'].hour for slot in slots], [18, 20, 21])
+        self.assertEqual(slots[1]['available'], 6)
+
+    def test_rebuild_matches_incremental_counts(self):
+        """Test rebuild recomputes the same occupancy from bookings"""
+        self.book(4)
+        self.book(2)
+        SlotOccupancy.objects.update(covers=0)
+        availability.rebuild()
+        self.assertEqual(self.covers(), 6)
@@ -0,0 +1,87 @@
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.test import TestCase
+from restaurant import synthetic
+from restaurant.models import Menu, Booking, SlotOccupancy
+
+
+class GenerateLoadDataTest(TestCase):
+    def generate(self, **options):
+        call_command('generate_load_data', stdout=StringIO(), **options)
+
+    def test_generates_requested_volumes(self):
+        """Test the command creates the requested number of rows in batches"""
+        self.generate(menu_items=250, users=5, bookings=1000, batch_size=100, start_date=None)
+        self.assertEqual(Menu.objects.count(), 250)
+        self.assertEqual(User.objects.filter(username__startswith='loaduser').count(), 5)
+        self.assertEqual(Booking.objects.count(), 1000)
+
+    def test_occupancy_rebuilt_after_bulk_insert(self):
+        """Test slot occupancy accounts for every generated guest"""
+        self.generate(menu_items=0, users=3, bookings=300)
+        total_covers = sum(SlotOccupancy.objects.values_list('covers', flat=True))
+        total_guests = sum(Booking.objects.values_list('no_of_guests', flat=True))
+        self.assertEqual(total_covers, total_guests)
+
+    def test_bookings_stay_within_slot_capacity(self):
+        """Test generated bookings never fill a slot beyond capacity, however few days are asked for"""
+        self.generate(menu_items=0, users=3, bookings=300, days=1)
+        covers = SlotOccupancy.objects.values_list('covers', flat=True)
+        self.assertLessEqual(max(covers), settings.BOOKING_SLOT_CAPACITY)
+        self.assertGreater(len(covers), synthetic.slots_per_day())
+
+    def test_same_seed_same_data(self):
+        """Test generation is reproducible for a given seed"""
+        self.generate(menu_items=20, users=0, bookings=0, seed=7)
+        first = list(Menu.objects.order_by('id').values_list('title', 'price', 'inventory'))
+        Menu.objects.all().delete()
+        self.generate(menu_items=20, users=0, bookings=0, seed=7)
+        second = list(Menu.objects.order_by('id').values_list('title', 'price', 'inventory'))
+        self.assertEqual(first, second)
+
+    def test_bookings_without_users_rejected_before_writing(self):
+        """Test asking for bookings without users fails before any row is inserted"""
+        with self.assertRaisesMessage(CommandError, 'Bookings need users'):
+            self.generate(menu_items=20, users=0, bookings=10)
+        self.assertFalse(Menu.objects.exists())
+
+
+class PruneSessionsTest(TestCase):
+    def test_deletes_only_expired_sessions(self):
+        """Test expired sessions are deleted across several batches"""
+        for expiry in (-60, -60, -60, 3600):
+            session = SessionStore()
+            session['auth_token'] = 'abc'
+            session.set_expiry(expiry)
+            session.save()
+        out = StringIO()
+        call_command('prune_sessions', batch_size=2, stdout=out)
+        self.assertIn('Deleted 3 expired session(s).', out.getvalue())
+        self.assertEqual(Session.objects.count(), 1)
+
+
+class PageCacheCommandsTest(TestCase):
+    def test_warm_then_purge(self):
+        """Test warm_page_cache stores every page and purge_page_cache drops them"""
+        out = StringIO()
+        call_command('warm_page_cache', stdout=out, stderr=StringIO())
+        self.assertIn('Warmed 2 page(s).', out.getvalue())
+        self.assertEqual(self.client.get('/restaurant/about/')['X-Page-Cache'], 'hit')
+        # As if the cache were shared, like Redis
+        with mock.patch('LittleLemonAPI.cache.is_process_local', return_value=False):
+            call_command('purge_page_cache', stdout=StringIO())
+            self.assertEqual(self.client.get('/restaurant/about/')['X-Page-Cache'], 'miss')
+            with self.assertRaisesMessage(CommandError, '/api/menu/'):
+                call_command('purge_page_cache', path=['/api/menu/'], stdout=StringIO())
+
+    def test_purge_fails_with_local_memory_cache(self):
+        """Test purge_page_cache fails rather than purging only its own process"""
+        with self.assertRaisesMessage(CommandError, 'local memory'):
+            call_command('purge_page_cache', stdout=StringIO())
@@ -0,0 +1,57 @@
+import csv
+import io
+import json
+from datetime import datetime
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+from restaurant import export
+from restaurant.models import Booking
+
+
+class BookingExportTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='exporter', password='testpass123')
+        for day in range(1, 6):
+            Booking.objects.create(
+                user=self.user,
+                name=f"Party, {day}",
+                no_of_guests=day,
+                booking_date=timezone.make_aware(datetime(2024, 12, day, 19, 0))
+            )
+
+    def test_csv_lines(self):
+        """Test CSV output has a header and one quoted row per booking"""
+        content = ''.join(export.csv_lines(export.iter_rows(Booking.objects.all())))
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(tuple(rows[0]), export.COLUMNS)
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[1][2:], ['exporter', 'Party, 1', '1', '2024-12-01T19:00:00+00:00'])
+
+    def test_ndjson_lines(self):
+        """Test NDJSON output is one JSON object per line"""
+        lines = list(export.ndjson_lines(export.iter_rows(Booking.objects.filter(no_of_guests__gte=4))))
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(json.loads(lines[0])['no_of_guests'], 4)
+
+    def test_keyset_chunks_on_mysql(self):
+        """Test the primary-key chunking used on MySQL returns every row once"""
+        with mock.patch.object(connection, 'vendor', 'mysql'), self.assertNumQueries(3):
+            rows = list(export.iter_rows(Booking.objects.all(), chunk_size=2))
+        self.assertEqual([row[0] for row in rows], list(Booking.objects.order_by('id').values_list('id', flat=True)))
+
+    def test_admin_action_streams_selection(self):
+        """Test the admin export action streams only the selected bookings"""
+        admin_user = User.objects.create_superuser(username='admin', password='adminpass123')
+        self.client.force_login(admin_user)
+        selected = list(Booking.objects.order_by('id').values_list('id', flat=True)[:2])
+        response = self.client.post('/admin/restaurant/booking/', {
+            'action': 'export_csv',
+            '_selected_action': selected,
+        })
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="bookings.csv"')
+        content = b''.join(response.streaming_content).decode()
+        self.assertEqual(len(content.splitlines()), 3)
@@ -1,8 +1,26 @@
-from django.test import TestCase
+import json
+
+from asgiref.sync import iscoroutinefunction
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sessions.serializers import JSONSerializer
+from django.core import signing
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from littlelemon import pagecache
+from rest_framework.authtoken.models import Token
+from restaurant.models import Menu
 
 
 class RestaurantViewsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
     def test_index_view_renders(self):
         response = self.client.get(reverse("home"))
         self.assertEqual(response.status_code, 200)
@@ -18,9 +36,143 @@ class RestaurantViewsTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, "menu.html")
 
+    def test_menu_view_renders_items(self):
+        Menu.objects.create(title="Greek <Salad>", price='12.5', inventory=0)
+        response = self.client.get(reverse("menu"))
+        self.assertContains(response, "Greek &lt;Salad&gt;")
+        self.assertContains(response, "$12.50")
+        self.assertContains(response, "Currently unavailable")
+
+    def test_menu_fragment_cached_until_menu_changes(self):
+        item = Menu.objects.create(title="Greek Salad", price=12, inventory=5)
+        self.client.get(reverse("menu"))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("menu"))
+        self.assertContains(response, "Greek Salad")
+        item.title = "Lemon Dessert"
+        item.save()
+        response = self.client.get(reverse("menu"))
+        self.assertContains(response, "Lemon Dessert")
+        self.assertNotContains(response, "Greek Salad")
+
     def test_book_view_renders(self):
         response = self.client.get(reverse("book"))
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, "book.html")
 
+    def post_book(self, data):
+        return self.client.post(reverse("book"), json.dumps(data), content_type="application/json")
+
+    def make_token(self, username="ana"):
+        return Token.objects.create(user=User.objects.create_user(username=username, password="testpass123")).key
+
+    def test_book_stores_and_clears_token(self):
+        token = self.make_token()
+        self.assertEqual(self.post_book({"action": "store_token", "token": token}).json(), {"status": "success"})
+        self.assertContains(self.client.get(reverse("book")), token)
+        self.post_book({"action": "clear_token"})
+        self.assertFalse(self.client.get(reverse("book")).context["is_authenticated"])
+
+    def test_book_rejects_unknown_token(self):
+        response = self.post_book({"action": "store_token", "token": "abc"})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(self.client.get(reverse("book")).context["is_authenticated"])
+
+    @override_settings(SESSION_ENGINE="django.contrib.sessions.backends.signed_cookies")
+    def test_book_keeps_token_out_of_session_cookie(self):
+        token = self.make_token()
+        response = self.post_book({"action": "store_token", "token": token})
+        session = signing.loads(
+            response.cookies[settings.SESSION_COOKIE_NAME].value,
+            salt="django.contrib.sessions.backends.signed_cookies", serializer=JSONSerializer,
+        )
+        self.assertNotIn(token, json.dumps(session))
+        self.assertContains(self.client.get(reverse("book")), token)
+        # Logging out deletes the token, and with it what the cookie refers to
+        Token.objects.filter(key=token).delete()
+        self.assertFalse(self.client.get(reverse("book")).context["is_authenticated"])
+
+    def test_warm_book_page_queries_nothing(self):
+        token = self.make_token()
+        for engine in ("cache", "signed_cookies"):
+            with self.subTest(engine), override_settings(SESSION_ENGINE=f"django.contrib.sessions.backends.{engine}"):
+                self.client.cookies.clear()
+                self.post_book({"action": "store_token", "token": token})
+                self.client.get(reverse("book"))
+                with self.assertNumQueries(0):
+                    response = self.client.get(reverse("book"))
+                self.assertContains(response, token)
+
+    def test_book_skips_session_write_for_same_token(self):
+        token = self.make_token()
+        self.post_book({"action": "store_token", "token": token})
+        response = self.post_book({"action": "store_token", "token": token})
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+        response = self.post_book({"action": "store_token", "token": self.make_token("bo")})
+        self.assertIn(settings.SESSION_COOKIE_NAME, response.cookies)
+
+    @override_settings(SESSION_ENGINE="django.contrib.sessions.backends.db")
+    def test_book_reads_db_session_without_writing(self):
+        token = self.make_token()
+        self.post_book({"action": "store_token", "token": token})
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("book"))
+            self.post_book({"action": "store_token", "token": token})
+        self.assertFalse([q for q in queries if not q["sql"].startswith("SELECT")])
+
+    @override_settings(REQUEST_TIMING={'SAMPLE_RATE': 1.0, 'HEADER': True, 'DUPLICATE_QUERY_THRESHOLD': 3})
+    def test_page_reports_template_time(self):
+        with self.assertLogs('littlelemon.timing', 'INFO'):
+            response = self.client.get(reverse("about"))
+        self.assertIn('template;dur=', response['Server-Timing'])
+
+
+class PageCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_paths_are_the_static_pages(self):
+        self.assertEqual(settings.PAGE_CACHE['PATHS'], [reverse("home"), reverse("about")])
+
+    def test_hit_skips_templates_and_queries(self):
+        first = self.client.get(reverse("home"))
+        self.assertEqual(first['X-Page-Cache'], 'miss')
+        self.assertTemplateUsed(first, "index.html")
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("home"))
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.assertFalse(response.templates)
+        self.assertEqual(response.content, first.content)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=300')
+        self.assertEqual(response['X-Frame-Options'], first['X-Frame-Options'])
+        response = self.client.get(reverse("home"), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_purge(self):
+        self.client.get(reverse("home"))
+        self.client.get(reverse("about"))
+        pagecache.purge([reverse("about")])
+        self.assertEqual(self.client.get(reverse("home"))['X-Page-Cache'], 'hit')
+        self.assertEqual(self.client.get(reverse("about"))['X-Page-Cache'], 'miss')
+        pagecache.purge()
+        self.assertEqual(self.client.get(reverse("home"))['X-Page-Cache'], 'miss')
+
+    def test_pages_using_the_session_not_stored(self):
+        paths = [reverse("book")]
+        with override_settings(PAGE_CACHE={**settings.PAGE_CACHE, 'PATHS': paths}):
+            self.client.get(reverse("book"))
+            response = self.client.get(reverse("book"))
+        self.assertNotIn('X-Page-Cache', response)
+        self.assertTemplateUsed(response, "book.html")
 
+    async def test_async_stack_served_natively(self):
+        async def view(request):
+            return HttpResponse()
+        self.assertTrue(iscoroutinefunction(pagecache.PageCacheMiddleware(view)))
+        # Django only logs middleware adapted to the other mode when DEBUG is on
+        with override_settings(DEBUG=True), self.assertNoLogs('django.request', 'DEBUG'):
+            first = await self.async_client.get(reverse("home"))
+            response = await self.async_client.get(reverse("home"))
+        self.assertEqual(first['X-Page-Cache'], 'miss')
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.assertEqual(response.content, first.content)
@@ -1,15 +1,53 @@
-from django.shortcuts import render
+from django.conf import settings
+from django.template.response import TemplateResponse
 from django.http import JsonResponse
+from django.utils.crypto import constant_time_compare, salted_hmac
+from rest_framework.authtoken.models import Token
+from LittleLemonAPI import cache as api_cache
+from LittleLemonAPI.authentication import get_token_cache
+from littlelemon import db
+from .models import Menu
 import json
 
+# The session refers to the user's API token instead of holding it: session
+# data may live in a client cookie (SESSION_STORE=signed_cookies), and a
+# reference stops working as soon as logout deletes the token
+TOKEN_REFERENCE_SALT = 'restaurant.views.book'
+
+def token_reference(token):
+    return {'user_id': token.user_id, 'digest': salted_hmac(TOKEN_REFERENCE_SALT, token.key).hexdigest()}
+
+def session_token(session):
+    """Return the key of the API token the session refers to, or None if it was revoked."""
+    reference = session.get('auth_token')
+    if not isinstance(reference, dict):
+        return None
+    # Cached like the API's token lookups, and revoked by the same signals
+    key = get_token_cache().user_key(reference['user_id'])
+    if key is None or not constant_time_compare(
+        reference['digest'], salted_hmac(TOKEN_REFERENCE_SALT, key).hexdigest()
+    ):
+        return None
+    return key
+
 def index(request):
-    return render(request, 'index.html', {})
+    return TemplateResponse(request, 'index.html', {})
 
 def about(request):
-    return render(request, 'about.html', {})
+    return TemplateResponse(request, 'about.html', {})
 
 def menu(request):
-    return render(request, 'menu.html', {})
+    # The item list is a cached template fragment keyed on the menu's cache
+    # version, so any Menu write invalidates it; the lazy queryset is only
+    # evaluated when the fragment has to be rendered again, from the primary
+    # so a lagging replica is never cached under the new version
+    context = {
+        'menu_items': Menu.objects.using(db.PRIMARY).order_by('id'),
+        'menu_version': api_cache.get_version(api_cache.MENU_SCOPE),
+        'menu_cache_timeout': settings.MENU_CACHE_TIMEOUT,
+        'menu_cache_alias': settings.API_CACHE_ALIAS,
+    }
+    return TemplateResponse(request, 'menu.html', context)
 
 def book(request):
     # Handle POST requests for token management
@@ -21,7 +59,14 @@ def book(request):
             if action == 'store_token':
                 token = data.get('token')
                 if token:
-                    request.session['auth_token'] = token
+                    token = Token.objects.filter(key=token).first()
+                    if token is None:
+                        return JsonResponse({'status': 'error', 'message': 'Invalid token'}, status=400)
+                    # Assigning marks the session modified, which costs a
+                    # write (or a new cookie); skip it when nothing changed
+                    reference = token_reference(token)
+                    if request.session.get('auth_token') != reference:
+                        request.session['auth_token'] = reference
                     return JsonResponse({'status': 'success'})
             
             elif action == 'clear_token':
@@ -32,9 +77,9 @@ def book(request):
             return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
     
     # Check if user has auth token in session
-    auth_token = request.session.get('auth_token')
+    auth_token = session_token(request.session)
     context = {
         'is_authenticated': bool(auth_token),
         'auth_token': auth_token if auth_token else None
     }
-    return render(request, 'book.html', context)
\ No newline at end of file
+    return TemplateResponse(request, 'book.html', context)
\ No newline at end of file